@@ -3,7 +3,7 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from alembic import context
 from app.database import Base
-from app.models import GenerationJob, Track, UserSettings
+from app.models import GenerationJob, Track, UserSettings, CacheEntry, Tag, track_tags, job_tags, TranscriptionJob, Rendition
 
 config = context.config
 if config.config_file_name is not None:
@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     model_path: str = "./models"
     model_version: str = "3B"
     lazy_load: bool = True  # Required for 12GB VRAM
+    model_idle_unload_s: int = 300  # Idle time before weights leave the GPU (0 = after every job, -1 = never)
+    model_host_cache: bool = True  # Park idle weights in pinned host RAM instead of reloading from disk
 
     # Generation defaults
     default_max_length_ms: int = 60000  # 60s (safe for 12GB VRAM with seq_len=1024)
@@ -20,10 +22,68 @@ class Settings(BaseSettings):
     default_topk: int = 50
     default_cfg_scale: float = 1.0  # 1.0 for 12GB VRAM (cfg>1 doubles batch size)
 
+    # Generation worker
+    generation_devices: str = "auto"  # auto = every CUDA device (or cpu); or a list like "cuda:0,cuda:1" / "cpu,cpu"
+    postprocess_workers: int = 2  # Encode/probe/DB jobs overlapping the next GPU job
+    progress_interval_ms: int = 250  # At most one job:progress event per job per interval
+
+    # Batched generation (compatible pending jobs share one forward pass)
+    max_batch_size: int = 1  # 1 disables batching
+    batch_length_bucket_ms: int = 30000  # Jobs batch together within the same length bucket
+    batch_vram_per_job_gb: float = 2.0  # Estimated KV cache + activations per batch row
+
+    # VRAM scheduler: generation and transcription share the GPU within a budget
+    vram_budget_gb: float = 0  # 0 = total VRAM minus vram_headroom_gb
+    vram_headroom_gb: float = 1.0  # Left free for the CUDA context and fragmentation
+    vram_generation_gb: float = 6.5  # HeartMuLa weights
+    vram_codec_gb: float = 1.5  # HeartCodec weights
+    vram_transcriptor_gb: float = 3.0  # HeartTranscriptor weights
+    vram_transcription_working_gb: float = 1.0  # Activations per file in a transcription batch
+
+    # Transcription queue
+    transcription_max_batch_size: int = 8  # Queued uploads transcribed in one batched pass
+    transcription_max_pending: int = 100  # Further uploads are rejected with 429 until the queue drains
+
+    # Server-sent events
+    sse_replay_size: int = 1000  # Recent events kept for Last-Event-ID resume
+    sse_client_buffer: int = 500  # Pending events before a lagging client is dropped
+
+    # Live streaming: frames decoded per chunk for /api/jobs/{id}/stream (0 disables)
+    stream_chunk_frames: int = 64  # 80ms per frame -> ~5s chunks
+
+    # Generation cache (opt-in): identical requests reuse an earlier output
+    generation_cache_enabled: bool = False
+    generation_cache_max_mb: int = 2048
+    generation_cache_max_age_days: int = 30
+
     # Storage
+    output_format: str = "flac"  # Master format for generated tracks (flac = lossless; mp3 = 192k as before)
     output_dir: str = "data/outputs"
     upload_dir: str = "data/uploads"
+    cache_dir: str = "data/cache"
     max_upload_size_mb: int = 50
+    upload_dedupe: bool = True  # Hash uploads so a repeated file reuses its transcription
+
+    # Storage backend: where finished outputs are served from. Generation always
+    # writes locally first; "s3" also copies them to an S3-compatible bucket
+    storage_backend: str = "local"  # local | s3 (needs the s3 extra: boto3)
+    s3_bucket: str = ""
+    s3_prefix: str = "outputs/"
+    s3_endpoint_url: str = ""  # For MinIO, R2, a moto server, ...; empty = AWS
+    s3_region: str = ""
+    s3_url_mode: str = "presign"  # presign = redirect to a signed URL | proxy = stream through this server
+    s3_presign_ttl_s: int = 3600
+    s3_multipart_chunk_mb: int = 8  # Part size for streamed multipart uploads
+
+    # Renditions: lossy copies of masters transcoded on request, LRU by total size
+    rendition_dir: str = "data/renditions"
+    rendition_cache_max_mb: int = 4096
+    rendition_workers: int = 2  # Concurrent ffmpeg transcodes
+
+    # Storage reconciler: removes orphaned outputs/uploads and temp files in the background
+    reconcile_interval_s: int = 21600  # Between passes (0 disables)
+    reconcile_grace_s: int = 3600  # Files younger than this are never touched (may still be in flight)
+    reconcile_files_per_s: int = 500  # I/O budget, so a pass never competes with serving
 
     class Config:
         env_prefix = "HEARTMULA_"
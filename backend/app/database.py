@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import event
+from sqlalchemy import event, inspect, text
 from app.config import get_settings
+from app.utils.search import create_search_index
+from app.utils.tags import create_tag_links
 
 
 class Base(DeclarativeBase):
@@ -26,6 +28,28 @@ async def get_db():
         yield session
 
 
+def _add_missing_columns(sync_conn) -> None:
+    """create_all never alters existing tables, so add nullable columns added later."""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                col_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+
+
+def _create_missing_indexes(sync_conn) -> None:
+    """create_all skips existing tables, so add indexes added to them later."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.run_sync(create_search_index)
+        await conn.run_sync(create_tag_links)
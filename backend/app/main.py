@@ -2,18 +2,23 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from app.config import get_settings
 from app.database import init_db, async_session_factory
 from app.services.event_broadcaster import EventBroadcaster
-from app.services.gpu_manager import GPUManager
+from app.services.gpu_manager import GPUManager, detect_devices
 from app.services.storage_service import StorageService
 from app.services.pipeline_manager import PipelineManager
 from app.services.job_queue import JobQueue
 from app.services.generation_worker import GenerationWorker
-from app.services.transcription_service import TranscriptionService
-from app.routers import events, system, settings as settings_router, generation, tracks, transcription
+from app.services.generation_cache import GenerationCache
+from app.services.rendition_cache import RenditionCache
+from app.services.storage_reconciler import StorageReconciler
+from app.services.audio_stream import AudioStreamHub
+from app.services.transcription_queue import TranscriptionQueue
+from app.services.transcription_worker import TranscriptionWorker
+from app.utils.body_limit import BodySizeLimit, MULTIPART_OVERHEAD_BYTES
+from app.routers import events, system, settings as settings_router, generation, tracks, tags, transcription, audio
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -27,18 +32,40 @@ async def lifespan(app: FastAPI):
     await init_db()
 
     # Initialize core services
-    app.state.broadcaster = EventBroadcaster()
-    app.state.gpu_manager = GPUManager()
+    app.state.broadcaster = EventBroadcaster(
+        replay_size=settings.sse_replay_size,
+        client_buffer=settings.sse_client_buffer,
+    )
+    app.state.audio_streams = AudioStreamHub()
+    # One scheduler and pipeline per generation device; the first also serves
+    # transcription and is what /api/health and /api/gpu report on
+    devices = detect_devices(settings.generation_devices)
+    app.state.gpu_managers = [
+        GPUManager(budget_gb=settings.vram_budget_gb or None, headroom_gb=settings.vram_headroom_gb, device=device)
+        for device in devices
+    ]
+    app.state.gpu_manager = app.state.gpu_managers[0]
     app.state.storage = StorageService(settings)
 
     # Detect GPU
-    await app.state.gpu_manager.initialize()
+    for gpu in app.state.gpu_managers:
+        await gpu.initialize()
     await app.state.broadcaster.broadcast("gpu:status", app.state.gpu_manager.get_status())
 
     # Initialize pipeline services
-    app.state.pipeline = PipelineManager(settings)
+    app.state.pipelines = [PipelineManager(settings, device=device) for device in devices]
+    app.state.pipeline = app.state.pipelines[0]
     app.state.job_queue = JobQueue(async_session_factory)
-    app.state.transcription_service = TranscriptionService(app.state.pipeline)
+    for i, (pipeline, gpu) in enumerate(zip(app.state.pipelines, app.state.gpu_managers)):
+        pipeline.register_gpu_models(gpu, transcriptor=i == 0)
+    app.state.transcription_queue = TranscriptionQueue(
+        async_session_factory, max_pending=settings.transcription_max_pending,
+    )
+    app.state.generation_cache = GenerationCache(async_session_factory, app.state.storage, settings)
+    if app.state.generation_cache.enabled:
+        await app.state.generation_cache.evict()
+    app.state.renditions = RenditionCache(async_session_factory, app.state.storage, settings)
+    await app.state.renditions.evict()
 
     # Load model and broadcast status
     try:
@@ -49,31 +76,82 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Model load failed: {e}")
         await app.state.broadcaster.broadcast("model:error", {"error": str(e)})
+    # The other devices load from the files the first one downloaded
+    for pipeline in app.state.pipelines[1:]:
+        try:
+            await pipeline.load_generation_model()
+        except Exception as e:
+            logger.error(f"Model load failed on {pipeline.device}: {e}")
 
     # Recover stale jobs from crash
     recovered = await app.state.job_queue.recover_stale_jobs()
     if recovered:
         logger.info(f"Recovered {recovered} stale jobs")
-
-    # Start generation worker
-    app.state.worker = GenerationWorker(
-        job_queue=app.state.job_queue,
+    await app.state.transcription_queue.recover_stale_jobs()
+
+    # Start one generation worker per device whose model loaded; a device
+    # that failed would only fail every job it claims. If none loaded, the
+    # first still runs so jobs fail with the load error instead of hanging.
+    ready = [
+        (pipeline, gpu) for pipeline, gpu in zip(app.state.pipelines, app.state.gpu_managers)
+        if pipeline.get_state() == "ready"
+    ] or [(app.state.pipeline, app.state.gpu_manager)]
+    app.state.workers = [
+        GenerationWorker(
+            job_queue=app.state.job_queue,
+            pipeline=pipeline,
+            gpu=gpu,
+            broadcaster=app.state.broadcaster,
+            storage=app.state.storage,
+            postprocess_workers=settings.postprocess_workers,
+            max_batch_size=settings.max_batch_size,
+            batch_length_bucket_ms=settings.batch_length_bucket_ms,
+            batch_vram_per_job_gb=settings.batch_vram_per_job_gb,
+            cache=app.state.generation_cache,
+            streams=app.state.audio_streams,
+            progress_interval_s=settings.progress_interval_ms / 1000,
+            device=gpu.device,
+        )
+        for pipeline, gpu in ready
+    ]
+    for worker in app.state.workers:
+        await worker.start()
+
+    app.state.transcription_worker = TranscriptionWorker(
+        queue=app.state.transcription_queue,
         pipeline=app.state.pipeline,
         gpu=app.state.gpu_manager,
         broadcaster=app.state.broadcaster,
         storage=app.state.storage,
+        max_batch_size=settings.transcription_max_batch_size,
+        working_gb_per_file=settings.vram_transcription_working_gb,
     )
-    await app.state.worker.start()
+    await app.state.transcription_worker.start()
+
+    app.state.reconciler = StorageReconciler(async_session_factory, app.state.storage, settings)
+    await app.state.reconciler.start()
 
     yield
 
     # Shutdown
-    await app.state.worker.stop()
-    await app.state.pipeline.unload()
+    await app.state.reconciler.stop()
+    await app.state.transcription_worker.stop()
+    for worker in app.state.workers:
+        await worker.stop()
+    app.state.renditions.close()
+    for pipeline in app.state.pipelines:
+        await pipeline.unload()
 
 
 app = FastAPI(title="HeartMuLa Studio", version="0.1.0", lifespan=lifespan)
 
+# Middleware added last runs first: CORS wraps the body limit, so its 413s
+# reach the browser with CORS headers
+app.add_middleware(
+    BodySizeLimit,
+    max_bytes=settings.max_upload_size_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+    paths=("/api/transcribe",),
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -82,15 +160,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for audio output
-output_path = Path(settings.output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-app.mount("/outputs", StaticFiles(directory=str(output_path)), name="outputs")
-
 # Include routers
 app.include_router(events.router)
 app.include_router(system.router)
 app.include_router(settings_router.router)
 app.include_router(generation.router)
 app.include_router(tracks.router)
+app.include_router(tags.router)
 app.include_router(transcription.router)
+app.include_router(audio.router)
@@ -1,5 +1,12 @@
 from app.models.job import GenerationJob
 from app.models.track import Track
 from app.models.settings import UserSettings
+from app.models.cache import CacheEntry
+from app.models.tag import Tag, track_tags, job_tags
+from app.models.transcription import TranscriptionJob
+from app.models.rendition import Rendition
 
-__all__ = ["GenerationJob", "Track", "UserSettings"]
+__all__ = [
+    "GenerationJob", "Track", "UserSettings", "CacheEntry", "Tag", "track_tags", "job_tags",
+    "TranscriptionJob", "Rendition",
+]
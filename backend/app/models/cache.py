@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from app.database import Base
+
+
+class CacheEntry(Base):
+    __tablename__ = "generation_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of normalized request parameters
+    path = Column(String(500), nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    seed = Column(Integer, nullable=True)  # Seed that reproduces the output; NULL if none does (batched)
+    size_bytes = Column(Integer, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_used_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, Float, DateTime, func
+from sqlalchemy import Column, String, Text, Integer, Float, Boolean, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
@@ -15,13 +15,26 @@ class GenerationJob(Base):
     temperature = Column(Float, nullable=False, default=1.0)
     topk = Column(Integer, nullable=False, default=50)
     cfg_scale = Column(Float, nullable=False, default=1.5)
+    # NULL for jobs queued before seeds existed and for batched jobs, whose
+    # output depends on the whole batch rather than on any one seed
+    seed = Column(Integer, nullable=True)
+    seed_source = Column(String(10), nullable=True)  # "user" | "server" (chosen because none was given)
+    reuse_cached = Column(Boolean, nullable=True)  # Unseeded job may take an earlier cached output
 
     output_path = Column(String(500), nullable=True)
     duration_ms = Column(Integer, nullable=True)
     error = Column(Text, nullable=True)
+    device = Column(String(20), nullable=True)  # Worker device that claimed it, e.g. "cuda:1"
 
     created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
     track = relationship("Track", back_populates="job", uselist=False)
+
+    __table_args__ = (
+        # Queue order: pending jobs by (created_at, id) without a table scan
+        Index("ix_generation_jobs_queue_order", "status", "created_at", "id"),
+        # Keyset pagination of the unfiltered job list
+        Index("ix_generation_jobs_created_at_id", "created_at", "id"),
+    )
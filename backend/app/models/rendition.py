@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, func
+from app.database import Base
+
+
+class Rendition(Base):
+    __tablename__ = "renditions"
+
+    key = Column(String(100), primary_key=True)  # track_id:format:bitrate
+    track_id = Column(String(36), ForeignKey("tracks.id", ondelete="CASCADE"), nullable=False, index=True)
+    format = Column(String(10), nullable=False)
+    bitrate = Column(String(10), nullable=False)
+    path = Column(String(500), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_used_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Table, Index
+from app.database import Base
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False, unique=True)  # normalized: trimmed, lowercase
+
+
+# Link tables are kept in sync with the tags strings by database triggers
+# (see app.utils.tags)
+track_tags = Table(
+    "track_tags",
+    Base.metadata,
+    Column("track_id", String(36), ForeignKey("tracks.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_track_tags_tag_id", "tag_id", "track_id"),
+)
+
+job_tags = Table(
+    "job_tags",
+    Base.metadata,
+    Column("job_id", String(36), ForeignKey("generation_jobs.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_job_tags_tag_id", "tag_id", "job_id"),
+)
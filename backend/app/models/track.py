@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
@@ -17,8 +17,18 @@ class Track(Base):
     duration_ms = Column(Integer, nullable=False)
     file_size_bytes = Column(Integer, nullable=True)
     favorite = Column(Boolean, nullable=False, default=False)
+    # Stable integer key for the tracks_fts search index, set by its insert
+    # trigger (see app.utils.search)
+    search_rowid = Column(Integer, nullable=True, unique=True, index=True)
 
     created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
 
     job = relationship("GenerationJob", back_populates="track")
+
+    __table_args__ = (
+        # Keyset pagination for each library sort order
+        Index("ix_tracks_created_at_id", "created_at", "id"),
+        Index("ix_tracks_title_id", "title", "id"),
+        Index("ix_tracks_duration_ms_id", "duration_ms", "id"),
+    )
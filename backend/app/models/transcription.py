@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index, func
+from app.database import Base
+import uuid
+
+
+class TranscriptionJob(Base):
+    __tablename__ = "transcription_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    filename = Column(String(500), nullable=True)  # As uploaded, for display
+    audio_path = Column(String(500), nullable=False)  # Saved upload; deleted once transcribed
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of the upload, when deduplicating
+    duration_ms = Column(Integer, nullable=True)  # Of the upload; None if its headers couldn't be read
+
+    lyrics = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Queue order: pending jobs by (created_at, id) without a table scan
+        Index("ix_transcription_jobs_queue_order", "status", "created_at", "id"),
+    )
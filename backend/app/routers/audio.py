@@ -0,0 +1,63 @@
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from app.services.storage_backends import output_key
+from app.utils.audio_response import AUDIO_MEDIA_TYPES, IMMUTABLE, audio_etag, audio_file_response, etag_matches
+
+router = APIRouter(tags=["audio"])
+
+
+@router.api_route("/outputs/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_output_audio(file_path: str, request: Request):
+    """Generated audio by its output URL (see StorageService.get_output_url).
+
+    Outputs are never rewritten, so responses are cacheable forever and
+    revalidate by an ETag built from the file name (the job id). Only audio
+    files are served: peaks and partial writes in the same directories are not.
+
+    With a remote storage backend the URL stays the same: in presign mode it
+    redirects to a short-lived signed URL on the object store, in proxy mode
+    the local copy is served if there is one, else the object is streamed
+    through (Range passed along).
+    """
+    storage = request.app.state.storage
+    relative = Path(file_path)
+    if relative.is_absolute() or ".." in relative.parts or relative.suffix not in AUDIO_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    backend = storage.backend
+    if backend.remote and storage.url_mode == "presign":
+        return RedirectResponse(backend.presigned_url(output_key(relative)), status_code=307)
+    try:
+        return audio_file_response(request, storage.output_dir / relative, relative.name)
+    except (FileNotFoundError, NotADirectoryError):
+        if not backend.remote:
+            raise HTTPException(status_code=404, detail="Not found")
+    return await _proxy(request, backend, relative)
+
+
+async def _proxy(request: Request, backend, relative: Path) -> Response:
+    key = output_key(relative)
+    headers = {"Cache-Control": IMMUTABLE, "Accept-Ranges": "bytes"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        size = await backend.size(key)
+        if size is not None and etag_matches(if_none_match, audio_etag(relative.name, size)):
+            return Response(status_code=304, headers={**headers, "ETag": audio_etag(relative.name, size)})
+
+    try:
+        stream = await backend.open(key, request.headers.get("range"))
+    except ValueError as e:
+        raise HTTPException(status_code=416, detail=str(e))
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    headers["ETag"] = audio_etag(relative.name, stream.total)
+    headers["Content-Length"] = str(stream.size)
+    if stream.content_range:
+        headers["Content-Range"] = stream.content_range
+    return StreamingResponse(
+        stream,
+        status_code=206 if stream.content_range else 200,
+        media_type=AUDIO_MEDIA_TYPES[relative.suffix],
+        headers=headers,
+    )
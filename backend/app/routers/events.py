@@ -1,32 +1,52 @@
-import asyncio
-import json
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query
 from starlette.responses import StreamingResponse
 from app.dependencies import get_broadcaster
-from app.services.event_broadcaster import EventBroadcaster
+from app.services.event_broadcaster import EventBroadcaster, encode_frame
 
 router = APIRouter(prefix="/api", tags=["events"])
 
+_CONNECTED = encode_frame({"event": "system:connected", "data": {}})
+_HEARTBEAT = encode_frame({"event": "heartbeat", "data": {}})
+
+
+def _parse_list(value: Optional[str]) -> Optional[list[str]]:
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
 
 @router.get("/events")
-async def event_stream(broadcaster: EventBroadcaster = Depends(get_broadcaster)):
-    queue = broadcaster.subscribe()
+async def event_stream(
+    broadcaster: EventBroadcaster = Depends(get_broadcaster),
+    last_event_id: Optional[str] = Header(None),
+    last_event_id_param: Optional[str] = Query(None, alias="last_event_id"),
+    jobs: Optional[str] = Query(None, description="Comma-separated job ids; job events for other jobs are skipped"),
+    types: Optional[str] = Query(None, description="Comma-separated event types, e.g. job:*,gpu:status"),
+):
+    # Browsers send Last-Event-ID on automatic reconnects; clients that
+    # reconnect with a fresh EventSource pass it as a query parameter instead
+    resume_from = _parse_event_id(last_event_id or last_event_id_param)
+    subscriber = broadcaster.subscribe(resume_from, types=_parse_list(types), jobs=_parse_list(jobs))
 
     async def generate():
         try:
-            # Send initial connected event
-            yield f"data: {json.dumps({'event': 'system:connected', 'data': {}})}\n\n"
-            while True:
-                try:
-                    message = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(message)}\n\n"
-                except asyncio.TimeoutError:
-                    # Send heartbeat
-                    yield f"data: {json.dumps({'event': 'heartbeat', 'data': {}})}\n\n"
-        except asyncio.CancelledError:
-            pass
+            yield _CONNECTED
+            while not subscriber.closed:
+                chunk = await subscriber.get(timeout=30.0)
+                if chunk is None:
+                    yield _HEARTBEAT
+                elif chunk:
+                    yield chunk
         finally:
-            broadcaster.unsubscribe(queue)
+            broadcaster.unsubscribe(subscriber)
 
     return StreamingResponse(
         generate(),
@@ -1,5 +1,11 @@
-from fastapi import APIRouter, HTTPException, Request
-from app.schemas.job import GenerationRequest, GenerationResponse, JobResponse, JobListResponse
+import secrets
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse
+from starlette.responses import StreamingResponse
+from app.schemas.job import (
+    GenerationRequest, GenerationResponse, BatchGenerationRequest, BatchGenerationResponse,
+    JobResponse, JobListResponse, QueueEntry, QueueResponse,
+)
 from typing import Optional
 
 router = APIRouter(prefix="/api", tags=["generation"])
@@ -13,25 +19,11 @@ async def submit_generation(
     job_queue = request.app.state.job_queue
     broadcaster = request.app.state.broadcaster
 
-    job = await job_queue.enqueue({
-        "lyrics": params.lyrics,
-        "tags": params.tags,
-        "max_length_ms": params.max_length_ms,
-        "temperature": params.temperature,
-        "topk": params.topk,
-        "cfg_scale": params.cfg_scale,
-    })
+    job = await job_queue.enqueue(_job_data(params))
 
     position = await job_queue.get_queue_position(job.id)
 
-    await broadcaster.broadcast("job:queued", {
-        "job_id": job.id,
-        "status": job.status,
-        "lyrics": job.lyrics,
-        "tags": job.tags,
-        "queue_position": position,
-        "created_at": job.created_at.isoformat(),
-    })
+    await broadcaster.broadcast("job:queued", _queued_payload(job, position))
 
     return GenerationResponse(
         job_id=job.id,
@@ -41,18 +33,67 @@ async def submit_generation(
     )
 
 
+@router.post("/generate/batch", response_model=BatchGenerationResponse)
+async def submit_generation_batch(
+    params: BatchGenerationRequest,
+    request: Request,
+):
+    job_queue = request.app.state.job_queue
+    broadcaster = request.app.state.broadcaster
+
+    jobs = await job_queue.enqueue_many([_job_data(p) for p in params.jobs])
+
+    # One snapshot of the queue: a worker may claim some of the batch before
+    # it is read, so positions can't be counted on from the first job's
+    pending = {job_id: i for i, job_id in enumerate(await job_queue.get_pending_job_ids())}
+    positions = [pending.get(job.id, -1) for job in jobs]
+
+    await broadcaster.broadcast("jobs:queued", {
+        "job_ids": [job.id for job in jobs],  # Lets job-filtered subscribers match it
+        "jobs": [_queued_payload(job, position) for job, position in zip(jobs, positions)],
+    })
+
+    return BatchGenerationResponse(jobs=[
+        GenerationResponse(
+            job_id=job.id,
+            status=job.status,
+            queue_position=position,
+            created_at=job.created_at,
+        )
+        for job, position in zip(jobs, positions)
+    ])
+
+
+@router.get("/queue", response_model=QueueResponse)
+async def get_queue(request: Request):
+    job_queue = request.app.state.job_queue
+    job_ids = await job_queue.get_pending_job_ids()
+    return QueueResponse(
+        jobs=[QueueEntry(job_id=job_id, position=i) for i, job_id in enumerate(job_ids)],
+        total=len(job_ids),
+    )
+
+
 @router.get("/jobs", response_model=JobListResponse)
 async def list_jobs(
     request: Request,
     status: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    offset: int = 0,  # Deprecated: use cursor (ignored when a cursor is given)
+    with_total: bool = True,
 ):
     job_queue = request.app.state.job_queue
-    jobs, total = await job_queue.get_jobs(status=status, limit=limit, offset=offset)
+    try:
+        jobs, total, next_cursor = await job_queue.get_jobs(
+            status=status, limit=limit, cursor=cursor, offset=offset, with_total=with_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return JobListResponse(
         jobs=[JobResponse.model_validate(j) for j in jobs],
         total=total,
+        next_cursor=next_cursor,
     )
 
 
@@ -65,12 +106,79 @@ async def get_job(job_id: str, request: Request):
     return JobResponse.model_validate(job)
 
 
+@router.get("/jobs/{job_id}/stream")
+async def stream_job_audio(job_id: str, request: Request):
+    """Progressive WAV of a job's audio while it generates.
+
+    Listeners get everything decoded so far, then each new chunk as it is
+    produced; once generation ends the buffered audio stays available
+    until the job is saved. Finished jobs redirect to their saved output.
+    """
+    job_queue = request.app.state.job_queue
+    job = await job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "completed":
+        return RedirectResponse(JobResponse.model_validate(job).output_url)
+    if job.status not in ("pending", "processing"):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    streams = request.app.state.audio_streams
+    # Only a pending job gets a new stream to wait on; a processing job's
+    # stream exists until the job finishes
+    stream = streams.attach(job_id, create=job.status == "pending")
+    if stream is None:
+        job = await job_queue.get_job(job_id)  # It may have finished since we looked
+        if job is not None and job.status == "completed":
+            return RedirectResponse(JobResponse.model_validate(job).output_url)
+        raise HTTPException(status_code=409, detail="Job has no live audio stream")
+    if stream.closed and stream.header is None:
+        # Nobody listened while it generated, so nothing was decoded early
+        raise HTTPException(status_code=409, detail="Job audio was not streamed; fetch it once the job completes")
+    return StreamingResponse(
+        streams.listen(job_id, stream),
+        media_type="audio/wav",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.delete("/jobs/{job_id}")
 async def cancel_job(job_id: str, request: Request):
     job_queue = request.app.state.job_queue
     broadcaster = request.app.state.broadcaster
     cancelled = await job_queue.cancel(job_id)
     if cancelled:
+        request.app.state.audio_streams.discard(job_id)
         await broadcaster.broadcast("job:cancelled", {"job_id": job_id})
         return {"success": True, "message": "Job cancelled"}
     return {"success": False, "message": "Job not found or already processing"}
+
+
+def _job_data(params: GenerationRequest) -> dict:
+    return {
+        "lyrics": params.lyrics,
+        "tags": params.tags,
+        "max_length_ms": params.max_length_ms,
+        "temperature": params.temperature,
+        "topk": params.topk,
+        "cfg_scale": params.cfg_scale,
+        # Record a seed even when none is given so the job is reproducible;
+        # seed_source tells the cache and the batcher which ones were asked for
+        "seed": params.seed if params.seed is not None else secrets.randbelow(2**32),
+        "seed_source": "user" if params.seed is not None else "server",
+        "reuse_cached": params.reuse_cached,
+    }
+
+
+def _queued_payload(job, position: int) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "lyrics": job.lyrics,
+        "tags": job.tags,
+        "queue_position": position,
+        "created_at": job.created_at.isoformat(),
+    }
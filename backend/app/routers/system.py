@@ -1,7 +1,10 @@
+from dataclasses import asdict
 from fastapi import APIRouter, Depends, Request
 from app.dependencies import get_gpu_manager
 from app.services.gpu_manager import GPUManager
-from app.schemas.system import HealthResponse, GpuStatusResponse
+from app.schemas.system import (
+    HealthResponse, GpuStatusResponse, CacheStatsResponse, ReconcileRun, StorageStatusResponse,
+)
 
 router = APIRouter(prefix="/api", tags=["system"])
 
@@ -14,6 +17,7 @@ async def health(request: Request):
         status="ok",
         model_state=pipeline.get_state(),
         gpu_available=gpu.info.cuda_available,
+        residency=pipeline.get_residency(),
     )
 
 
@@ -21,3 +25,26 @@ async def health(request: Request):
 async def gpu_status(gpu: GPUManager = Depends(get_gpu_manager)):
     status = gpu.get_status()
     return GpuStatusResponse(**status)
+
+
+@router.get("/gpus", response_model=list[GpuStatusResponse])
+async def gpus_status(request: Request):
+    """Every generation device, in worker order."""
+    return [GpuStatusResponse(**gpu.get_status()) for gpu in request.app.state.gpu_managers]
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+async def cache_stats(request: Request):
+    stats = await request.app.state.generation_cache.get_stats()
+    return CacheStatsResponse(**stats)
+
+
+@router.get("/storage", response_model=StorageStatusResponse)
+async def storage_status(request: Request):
+    reconciler = request.app.state.reconciler
+    last_run = reconciler.last_run
+    return StorageStatusResponse(
+        running=reconciler.running,
+        interval_s=reconciler.interval_s,
+        last_run=ReconcileRun(**asdict(last_run)) if last_run else None,
+    )
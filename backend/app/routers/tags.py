@@ -0,0 +1,35 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db
+from app.models.tag import Tag, track_tags, job_tags
+from app.schemas.tag import TagCount, TagListResponse
+from app.utils.tags import normalize_tags
+
+router = APIRouter(prefix="/api", tags=["tags"])
+
+
+@router.get("/tags", response_model=TagListResponse)
+async def list_tags(
+    db: AsyncSession = Depends(get_db),
+    scope: Literal["tracks", "jobs"] = "tracks",
+    prefix: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Tag facets: how many tracks (or jobs) carry each tag, most used first."""
+    links = track_tags if scope == "tracks" else job_tags
+    count = func.count().label("count")
+    query = (
+        select(Tag.name, count)
+        .join(links, links.c.tag_id == Tag.id)
+        .group_by(Tag.id)
+        .order_by(count.desc(), Tag.name.asc())
+        .limit(limit)
+    )
+    prefix_names = normalize_tags(prefix) if prefix else []
+    if prefix_names:
+        query = query.where(Tag.name.startswith(prefix_names[0], autoescape=True))
+
+    result = await db.execute(query)
+    return TagListResponse(tags=[TagCount(name=name, count=n) for name, n in result.all()])
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.dependencies import get_db
 from app.models.track import Track
+from app.models.tag import Tag, track_tags
 from app.schemas.track import TrackResponse, TrackUpdateRequest, TrackListResponse
+from app.services.rendition_cache import BITRATES, RENDITION_FORMATS
+from app.utils.audio_response import audio_file_response
+from app.utils.pagination import page_results, paginate
+from app.utils.peaks import peaks_path, read_peaks
+from app.utils.search import match_expression, ranked_matches
+from app.utils.tags import normalize_tags
 from pathlib import Path
 from typing import Optional
 
@@ -16,42 +24,67 @@ async def list_tracks(
     search: Optional[str] = None,
     tags: Optional[str] = None,
     favorite: Optional[bool] = None,
-    sort: str = "created_at",
-    limit: int = 20,
-    offset: int = 0,
+    sort: str = "created_at",  # created_at | title | duration_ms | relevance (with search)
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    offset: int = 0,  # Deprecated: use cursor (ignored when a cursor is given)
+    with_total: bool = True,
 ):
     query = select(Track)
     count_query = select(func.count()).select_from(Track)
 
+    matches = None
     if search:
-        search_filter = Track.title.ilike(f"%{search}%") | Track.lyrics.ilike(f"%{search}%")
-        query = query.where(search_filter)
-        count_query = count_query.where(search_filter)
-    if tags:
-        query = query.where(Track.tags.ilike(f"%{tags}%"))
-        count_query = count_query.where(Track.tags.ilike(f"%{tags}%"))
+        expression = match_expression(search)
+        if expression is None:
+            return TrackListResponse(tracks=[], total=0 if with_total else None)
+        matches = ranked_matches(expression)
+        on_match = matches.c.rowid == Track.search_rowid
+        query = query.join(matches, on_match)
+        count_query = count_query.join(matches, on_match)
+    tag_names = normalize_tags(tags) if tags else []
+    if tag_names:
+        # Tracks carrying every listed tag, via the (tag_id, track_id) index
+        tagged = (
+            select(track_tags.c.track_id)
+            .join(Tag, Tag.id == track_tags.c.tag_id)
+            .where(Tag.name.in_(tag_names))
+            .group_by(track_tags.c.track_id)
+            .having(func.count() == len(tag_names))
+        )
+        query = query.where(Track.id.in_(tagged))
+        count_query = count_query.where(Track.id.in_(tagged))
     if favorite is not None:
         query = query.where(Track.favorite == favorite)
         count_query = count_query.where(Track.favorite == favorite)
 
-    # Sort
-    if sort == "title":
-        query = query.order_by(Track.title.asc())
+    # Sort: keyset on (sort key, id), served by the matching composite index
+    if sort == "relevance" and matches is not None:
+        keys, descending = [matches.c.rank, Track.id], False
+    elif sort == "title":
+        keys, descending = [Track.title, Track.id], False
     elif sort == "duration_ms":
-        query = query.order_by(Track.duration_ms.desc())
+        keys, descending = [Track.duration_ms, Track.id], True
     else:
-        query = query.order_by(Track.created_at.desc())
+        keys, descending = [Track.created_at, Track.id], True
 
-    query = query.limit(limit).offset(offset)
+    try:
+        query = paginate(query, keys, descending, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if offset and not cursor:
+        query = query.offset(offset)
 
     result = await db.execute(query)
-    tracks = list(result.scalars().all())
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
+    tracks, next_cursor = page_results(result.all(), limit, len(keys))
+    total = None
+    if with_total:
+        total = (await db.execute(count_query)).scalar() or 0
 
     return TrackListResponse(
         tracks=[TrackResponse.model_validate(t) for t in tracks],
         total=total,
+        next_cursor=next_cursor,
     )
 
 
@@ -64,6 +97,86 @@ async def get_track(track_id: str, db: AsyncSession = Depends(get_db)):
     return TrackResponse.model_validate(track)
 
 
+@router.get("/tracks/{track_id}/peaks")
+async def get_track_peaks(
+    track_id: str,
+    request: Request,
+    resolution: int = Query(1000, ge=16, le=65536),
+    db: AsyncSession = Depends(get_db),
+):
+    """Waveform peaks as raw int8 (min, max) pairs, one per bucket, scaled to +-127.
+
+    Far smaller than the audio a player would otherwise download and decode
+    just to draw the waveform. 404 when the track has no peaks file yet
+    (see scripts/backfill_peaks.py).
+    """
+    result = await db.execute(select(Track.output_path).where(Track.id == track_id))
+    output_path = result.scalar_one_or_none()
+    if output_path is None:
+        raise HTTPException(status_code=404, detail="Track not found")
+    path = peaks_path(Path(output_path))
+    if not await request.app.state.storage.ensure_local(path):
+        raise HTTPException(status_code=404, detail="Peaks not available")
+    peaks = await asyncio.to_thread(read_peaks, path, resolution)
+    if peaks is None:
+        raise HTTPException(status_code=404, detail="Peaks not available")
+    pairs, sample_rate, total_samples = peaks
+    return Response(
+        content=pairs.tobytes(),
+        media_type="application/octet-stream",
+        headers={
+            "X-Peaks-Buckets": str(len(pairs)),
+            "X-Duration-Ms": str(total_samples * 1000 // sample_rate if sample_rate else 0),
+            # Peaks never change for a given track
+            "Cache-Control": "public, max-age=31536000, immutable",
+        },
+    )
+
+
+@router.get("/tracks/{track_id}/audio")
+async def get_track_audio(
+    track_id: str,
+    request: Request,
+    audio_format: Optional[str] = Query(None, alias="format"),  # mp3 | opus | aac; master when omitted
+    bitrate: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """The track's audio: its master, or a lossy rendition transcoded on first request."""
+    result = await db.execute(select(Track.output_path).where(Track.id == track_id))
+    output_path = result.scalar_one_or_none()
+    if output_path is None:
+        raise HTTPException(status_code=404, detail="Track not found")
+    master = Path(output_path)
+    if not await request.app.state.storage.ensure_local(master):
+        raise HTTPException(status_code=404, detail="Audio file missing")
+
+    master_format = master.suffix.lstrip(".")
+    if audio_format is None or (audio_format == master_format and bitrate is None):
+        try:
+            return audio_file_response(request, master, f"{track_id}.{master_format}")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Audio file missing")
+
+    spec = RENDITION_FORMATS.get(audio_format)
+    if spec is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Allowed: {sorted(RENDITION_FORMATS)}")
+    bitrate = bitrate or spec.default_bitrate
+    if bitrate not in BITRATES:
+        raise HTTPException(status_code=400, detail=f"Unsupported bitrate. Allowed: {list(BITRATES)}")
+
+    for _ in range(2):
+        try:
+            path = await request.app.state.renditions.get(track_id, master, audio_format, bitrate)
+        except RuntimeError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        try:
+            return audio_file_response(request, path, f"{track_id}.{audio_format}.{bitrate}", spec.media_type)
+        except FileNotFoundError:
+            # Evicted after the lookup; get() drops the stale row and renders it again
+            continue
+    raise HTTPException(status_code=404, detail="Audio file missing")
+
+
 @router.patch("/tracks/{track_id}", response_model=TrackResponse)
 async def update_track(
     track_id: str,
@@ -95,11 +208,17 @@ async def delete_track(
     if not track:
         raise HTTPException(status_code=404, detail="Track not found")
 
-    # Delete file
-    storage = request.app.state.storage
-    if track.output_path:
-        await storage.delete_file(Path(track.output_path))
+    # Renditions before the track: deleting the track cascades to their rows,
+    # after which drop_track could no longer find their files. They are only
+    # a cache, so losing them to a failed delete costs a re-transcode.
+    await request.app.state.renditions.drop_track(track_id)
 
+    # Row before its files: if deleting a file fails, what's left is an orphan
+    # the storage reconciler removes, never a track pointing at nothing
+    output_path = track.output_path
     await db.delete(track)
     await db.commit()
+
+    if output_path:
+        await request.app.state.storage.delete_output(Path(output_path))
     return {"success": True}
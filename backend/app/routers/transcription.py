@@ -1,11 +1,13 @@
+from pathlib import Path
 from fastapi import APIRouter, UploadFile, File, Request, HTTPException
-import asyncio
-import uuid
+from app.schemas.transcription import TranscriptionResponse, TranscriptionJobResponse
+from app.services.storage_service import UploadTooLarge
+from app.utils.audio import probe_duration_ms
 
 router = APIRouter(prefix="/api", tags=["transcription"])
 
 
-@router.post("/transcribe")
+@router.post("/transcribe", response_model=TranscriptionResponse)
 async def transcribe_audio(
     request: Request,
     file: UploadFile = File(...),
@@ -18,28 +20,63 @@ async def transcribe_audio(
 
     storage = request.app.state.storage
     broadcaster = request.app.state.broadcaster
-    transcription_service = request.app.state.transcription_service
-
-    # Save upload
-    upload_path = await storage.save_upload(file)
-    job_id = str(uuid.uuid4())
-
-    # Run transcription (async - broadcast result via SSE)
-    async def run_transcription():
-        try:
-            result = await transcription_service.transcribe(upload_path)
-            await broadcaster.broadcast("transcription:completed", {
-                "job_id": job_id,
-                "lyrics": result["lyrics"],
-            })
-        except Exception as e:
-            await broadcaster.broadcast("transcription:failed", {
-                "job_id": job_id,
-                "error": str(e),
-            })
-        finally:
-            # Clean up uploaded file
-            await storage.delete_file(upload_path)
-
-    asyncio.create_task(run_transcription())
-    return {"job_id": job_id}
+    queue = request.app.state.transcription_queue
+
+    # Backpressure: refuse before saving another upload
+    if await queue.is_full():
+        raise HTTPException(status_code=429, detail="Transcription queue is full, try again later")
+
+    try:
+        saved = await storage.save_upload(file, hash_content=storage.dedupe_uploads)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if saved.sha256 is not None:
+        existing = await queue.find_reusable(saved.sha256)
+        if existing is not None:
+            return await _reuse(existing, saved.path, storage, broadcaster, queue)
+
+    # Header parse for MP3/WAV/FLAC; ffprobe, off the event loop, for the rest
+    duration_ms = await probe_duration_ms(saved.path)
+    job = await queue.enqueue(str(saved.path), file.filename, saved.sha256, duration_ms)
+    position = await queue.get_queue_position(job.id)
+
+    await broadcaster.broadcast("transcription:queued", {
+        "job_id": job.id,
+        "filename": job.filename,
+        "queue_position": position,
+    })
+
+    return TranscriptionResponse(
+        job_id=job.id,
+        status=job.status,
+        queue_position=position,
+        created_at=job.created_at,
+    )
+
+
+async def _reuse(job, upload_path: Path, storage, broadcaster, queue) -> TranscriptionResponse:
+    """Answer a repeated upload with the job already holding (or producing) its lyrics."""
+    # An active job still needs the file at its own path; anything else is a spare copy
+    if job.status == "completed" or Path(job.audio_path) != upload_path:
+        await storage.delete_file(upload_path)
+    if job.status == "completed":
+        # The uploader is waiting for this event; the original went out long ago
+        await broadcaster.broadcast("transcription:completed", {
+            "job_id": job.id,
+            "lyrics": job.lyrics,
+        })
+    return TranscriptionResponse(
+        job_id=job.id,
+        status=job.status,
+        queue_position=await queue.get_queue_position(job.id),
+        created_at=job.created_at,
+    )
+
+
+@router.get("/transcriptions/{job_id}", response_model=TranscriptionJobResponse)
+async def get_transcription(job_id: str, request: Request):
+    job = await request.app.state.transcription_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Transcription not found")
+    return TranscriptionJobResponse.model_validate(job)
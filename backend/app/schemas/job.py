@@ -1,15 +1,23 @@
 from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from datetime import datetime
+from pathlib import Path
+from app.utils.tags import TAGS_PATTERN
 
 
 class GenerationRequest(BaseModel):
     lyrics: str = Field(..., min_length=1, description="Song lyrics with optional section markers")
-    tags: str = Field(..., min_length=1, description="Comma-separated style tags")
+    tags: str = Field(..., min_length=1, pattern=TAGS_PATTERN, description="Comma-separated style tags")
     max_length_ms: int = Field(240000, ge=30000, le=360000)
     temperature: float = Field(1.0, ge=0.1, le=2.0)
     topk: int = Field(50, ge=1, le=500)
     cfg_scale: float = Field(1.5, ge=1.0, le=10.0)
+    seed: Optional[int] = Field(None, ge=0, le=2**32 - 1, description="RNG seed; chosen by the server when omitted")
+    reuse_cached: bool = Field(
+        False,
+        description="Without a seed, reuse an earlier unseeded output of the same request from the generation "
+                    "cache instead of generating a new variation",
+    )
 
 
 class GenerationResponse(BaseModel):
@@ -19,6 +27,14 @@ class GenerationResponse(BaseModel):
     created_at: datetime
 
 
+class BatchGenerationRequest(BaseModel):
+    jobs: list[GenerationRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchGenerationResponse(BaseModel):
+    jobs: list[GenerationResponse]
+
+
 class JobResponse(BaseModel):
     id: str
     status: str
@@ -28,10 +44,14 @@ class JobResponse(BaseModel):
     temperature: float
     topk: int
     cfg_scale: float
+    seed: Optional[int] = None  # Reproduces the output; None for batched jobs
+    seed_source: Optional[str] = None  # "user" or "server"
+    reuse_cached: Optional[bool] = None
     output_path: Optional[str] = None
     output_url: Optional[str] = None
     duration_ms: Optional[int] = None
     error: Optional[str] = None
+    device: Optional[str] = None  # Worker device that ran the job
     progress: Optional[float] = None
     created_at: datetime
     started_at: Optional[datetime] = None
@@ -43,15 +63,23 @@ class JobResponse(BaseModel):
     @model_validator(mode="after")
     def compute_output_url(self):
         if self.output_path and not self.output_url:
-            # Convert "data/outputs/2026-02-14/abc.mp3" -> "/outputs/2026-02-14/abc.mp3"
-            path = self.output_path
-            if "outputs/" in path:
-                self.output_url = "/" + path.split("outputs/", 1)[0] + "outputs/" + path.split("outputs/", 1)[1]
-                # Simplify: just replace data/outputs/ with /outputs/
-                self.output_url = path.replace("data/outputs/", "/outputs/")
+            # "data/outputs/2026-02-14/abc.flac" -> "/outputs/2026-02-14/abc.flac", wherever
+            # output_dir is (same as StorageService.get_output_url)
+            self.output_url = "/outputs/" + "/".join(Path(self.output_path).parts[-2:])
         return self
 
 
 class JobListResponse(BaseModel):
     jobs: list[JobResponse]
+    total: Optional[int] = None  # Omitted when the request sets with_total=false
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
+
+
+class QueueEntry(BaseModel):
+    job_id: str
+    position: int
+
+
+class QueueResponse(BaseModel):
+    jobs: list[QueueEntry]
     total: int
@@ -1,22 +1,90 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 
 
+class ResidencyStatus(BaseModel):
+    state: str  # device | host | disk | mixed
+    modules: dict[str, str]
+    in_use: bool
+    idle_for_s: Optional[float] = None
+    idle_unload_s: Optional[float] = None
+    last_reload_ms: Optional[float] = None
+    last_reload_source: Optional[str] = None  # host | disk
+    reloads_from_disk: int
+    reloads_from_host: int
+    offloads: int
+
+
 class HealthResponse(BaseModel):
     status: str = "ok"
     model_state: str
     gpu_available: bool
+    residency: Optional[ResidencyStatus] = None  # None until the generation model is loaded
+
+
+class ScheduledModel(BaseModel):
+    size_gb: float
+    resident: bool
+    in_use: bool
+
+
+class GpuSchedule(BaseModel):
+    budget_gb: Optional[float] = None  # None = unlimited (no CUDA)
+    reserved_gb: float
+    running: list[str]
+    queued: int
+    evictions: int
+    models: dict[str, ScheduledModel]
 
 
 class GpuStatusResponse(BaseModel):
+    device: str = "cuda:0"
     name: str
     vram_total_gb: float
     vram_used_gb: float
     vram_free_gb: float
     use_mmgp: bool
+    scheduler: Optional[GpuSchedule] = None
 
 
 class ModelStatusResponse(BaseModel):
     state: str  # unloaded | downloading | loading | ready | generating | error
     progress: Optional[float] = None
     message: Optional[str] = None
+
+
+class CacheStatsResponse(BaseModel):
+    enabled: bool
+    hits: int
+    misses: int
+    hit_rate: float
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+class DiskUsage(BaseModel):
+    files: int
+    bytes: int
+
+
+class ReconcileRun(BaseModel):
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    files_scanned: int
+    orphans_removed: int
+    temp_removed: int
+    bytes_freed: int
+    dirs_removed: int
+    missing_outputs: int  # Tracks whose audio file is gone
+    errors: int
+    outputs_by_date: dict[str, DiskUsage]  # Output directory usage by date, after cleanup
+    uploads: DiskUsage
+    renditions: DiskUsage  # Rendition cache usage, after cleanup
+
+
+class StorageStatusResponse(BaseModel):
+    running: bool
+    interval_s: int  # 0 = reconciler disabled
+    last_run: Optional[ReconcileRun] = None  # None until the first pass finishes
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class TagCount(BaseModel):
+    name: str
+    count: int
+
+
+class TagListResponse(BaseModel):
+    tags: list[TagCount]
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from app.utils.tags import TAGS_PATTERN
 
 
 class TrackResponse(BaseModel):
@@ -22,10 +23,11 @@ class TrackResponse(BaseModel):
 
 class TrackUpdateRequest(BaseModel):
     title: Optional[str] = Field(None, max_length=200)
-    tags: Optional[str] = None
+    tags: Optional[str] = Field(None, pattern=TAGS_PATTERN)
     favorite: Optional[bool] = None
 
 
 class TrackListResponse(BaseModel):
     tracks: list[TrackResponse]
-    total: int
+    total: Optional[int] = None  # Omitted when the request sets with_total=false
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
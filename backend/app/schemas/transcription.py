@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class TranscriptionResponse(BaseModel):
+    job_id: str
+    status: str
+    queue_position: int
+    created_at: datetime
+
+
+class TranscriptionJobResponse(BaseModel):
+    id: str
+    status: str  # pending | processing | completed | failed
+    filename: Optional[str] = None
+    duration_ms: Optional[int] = None  # Of the upload; None if it couldn't be probed
+    lyrics: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
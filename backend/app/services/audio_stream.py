@@ -0,0 +1,127 @@
+import asyncio
+import struct
+from typing import AsyncIterator, Optional
+from app.utils.audio import DecodedAudio
+
+# RIFF/data sizes for a stream whose final length is unknown
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def wav_stream_header(sample_rate: int, channels: int) -> bytes:
+    """16-bit PCM WAV header with open-ended sizes, for progressive playback."""
+    byte_rate = sample_rate * channels * 2
+    return (
+        b"RIFF" + struct.pack("<I", _UNKNOWN_SIZE) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * 2, 16)
+        + b"data" + struct.pack("<I", _UNKNOWN_SIZE)
+    )
+
+
+class AudioStream:
+    """Progressive audio for one in-flight job.
+
+    Chunks are written from the generation thread and handed to the event
+    loop; listeners replay everything buffered so far, then follow along.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._chunks: list[bytes] = []
+        self._changed = asyncio.Event()
+        self.header: Optional[bytes] = None
+        self.listeners = 0
+        self.opened = False
+        self.started = False
+        self.closed = False
+
+    @property
+    def active(self) -> bool:
+        """Whether chunks should be decoded: someone is (or was) listening."""
+        return self.started or self.listeners > 0
+
+    def write(self, audio: DecodedAudio) -> None:
+        """Queue decoded audio for listeners. Safe to call from any thread."""
+        self.started = True
+        pcm = (audio.samples.clip(-1.0, 1.0) * 32767).astype("<i2").tobytes()
+        header = wav_stream_header(audio.sample_rate, audio.channels)
+        self._loop.call_soon_threadsafe(self._append, header, pcm)
+
+    def _append(self, header: bytes, pcm: bytes) -> None:
+        if self.header is None:
+            self.header = header
+        self._chunks.append(pcm)
+        self._notify()
+
+    def close(self) -> None:
+        self.closed = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        sent = 0
+        header_sent = False
+        while True:
+            changed = self._changed
+            if not header_sent and self.header is not None:
+                header_sent = True
+                yield self.header
+            while sent < len(self._chunks):
+                yield self._chunks[sent]
+                sent += 1
+            if self.closed:
+                return
+            await changed.wait()
+
+
+class AudioStreamHub:
+    """Registry of AudioStreams by job id.
+
+    A stream outlives the generation that fed it: once closed it keeps its
+    buffered audio until the job is completed or failed (discard), so a
+    listener arriving during encoding and upload still gets the whole track.
+    """
+
+    def __init__(self):
+        self._streams: dict[str, AudioStream] = {}
+
+    def attach(self, job_id: str, create: bool = True) -> Optional[AudioStream]:
+        """The job's stream, for listen; with create, a new one to wait on if there is none."""
+        stream = self._streams.get(job_id)
+        if stream is None and create:
+            stream = AudioStream(asyncio.get_running_loop())
+            self._streams[job_id] = stream
+        return stream
+
+    def open(self, job_id: str) -> AudioStream:
+        """Stream for a job that is about to start generating."""
+        stream = self.attach(job_id)
+        stream.opened = True
+        return stream
+
+    def close(self, job_id: str) -> None:
+        """End the job's audio; listeners drain what was buffered, then stop."""
+        stream = self._streams.get(job_id)
+        if stream is not None:
+            stream.close()
+
+    def discard(self, job_id: str) -> None:
+        """Forget the job's stream once it has finished (or will never start)."""
+        stream = self._streams.pop(job_id, None)
+        if stream is not None:
+            stream.close()
+
+    async def listen(self, job_id: str, stream: AudioStream) -> AsyncIterator[bytes]:
+        """Yield the job's audio as a WAV byte stream, waiting for it to start."""
+        stream.listeners += 1
+        try:
+            async for chunk in stream.iter_bytes():
+                yield chunk
+        finally:
+            stream.listeners -= 1
+            # Drop streams that only existed because someone waited on a
+            # job that never started (cancelled, or listener went away)
+            if stream.listeners == 0 and not stream.opened and self._streams.get(job_id) is stream:
+                del self._streams[job_id]
@@ -1,33 +1,229 @@
 import asyncio
 import time
 import json
-from typing import Any
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Iterable, Optional, Sequence
+
+# Events where only the latest value matters, mapped to the data field that
+# identifies what they describe (None: one value for the whole event type)
+COALESCED_EVENTS: dict[str, Optional[str]] = {
+    "job:progress": "job_id",
+    "model:loading_progress": None,
+}
+
+
+def event_job_ids(data: dict[str, Any]) -> tuple[str, ...]:
+    """Jobs an event is about: its job_id, or the job_ids of an aggregated event."""
+    if data.get("job_id") is not None:
+        return (data["job_id"],)
+    return tuple(data.get("job_ids") or ())
+
+
+def encode_frame(message: dict[str, Any], event_id: Optional[int] = None) -> bytes:
+    """Serialize one SSE message frame."""
+    frame = f"data: {json.dumps(message)}\n\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n{frame}"
+    return frame.encode()
+
+
+class Subscriber:
+    """Pending frames for one connected client.
+
+    Superseded coalescable events are replaced, so a slow client only ever
+    holds the latest progress per job. If it still falls more than
+    max_pending frames behind it is closed; the client reconnects with
+    Last-Event-ID and catches up from the broadcaster's replay buffer.
+
+    types and jobs narrow what the client receives: event types are exact
+    names or "prefix*" patterns, and the job filter applies to events about
+    jobs (see event_job_ids), passing those about any of its jobs. None
+    means no filter.
+    """
+
+    def __init__(
+        self,
+        max_pending: int,
+        types: Optional[Iterable[str]] = None,
+        jobs: Optional[Iterable[str]] = None,
+    ):
+        self.max_pending = max_pending
+        self._pending: OrderedDict[Any, bytes] = OrderedDict()
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.types: Optional[frozenset[str]] = None
+        self.type_prefixes: tuple[str, ...] = ()
+        if types is not None:
+            types = list(types)
+        if types is not None and "*" not in types:
+            self.types = frozenset(t for t in types if not t.endswith("*"))
+            self.type_prefixes = tuple(t[:-1] for t in types if t.endswith("*"))
+        self.jobs: Optional[frozenset[str]] = frozenset(jobs) if jobs is not None else None
+
+    def wants_type(self, event_type: str) -> bool:
+        return self.types is None or event_type in self.types or event_type.startswith(self.type_prefixes)
+
+    def wants_jobs(self, job_ids: tuple[str, ...]) -> bool:
+        return not job_ids or self.jobs is None or not self.jobs.isdisjoint(job_ids)
+
+    def wants(self, event_type: str, job_ids: tuple[str, ...]) -> bool:
+        return self.wants_jobs(job_ids) and self.wants_type(event_type)
+
+    def replay(self, frames: Sequence[tuple[int, bytes]]) -> None:
+        """Queue missed frames; they don't count against the lag allowance."""
+        self._pending.update(frames)
+        self.max_pending += len(frames)
+
+    def push(self, key: Any, frame: bytes) -> None:
+        if self.closed:
+            return
+        # A superseding frame goes to the back, after everything sent since
+        # the one it replaces, so event ids stay in order
+        self._pending.pop(key, None)
+        self._pending[key] = frame
+        if len(self._pending) > self.max_pending:
+            self.close()
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._pending.clear()
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Everything pending as one chunk; None if nothing arrived within timeout."""
+        if not self._pending and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._ready.clear()
+        chunk = b"".join(self._pending.values())
+        self._pending.clear()
+        return chunk
 
 
 class EventBroadcaster:
-    """Fan-out SSE events to all connected clients."""
+    """Fan-out SSE events to connected clients.
+
+    Each event is serialized once into a shared frame, and the most recent
+    frames are kept so reconnecting clients can resume from Last-Event-ID.
+    Clients are indexed by the types and jobs they asked for, so an event is
+    only offered to subscribers that can want it.
+    """
+
+    def __init__(self, replay_size: int = 1000, client_buffer: int = 500):
+        self._clients: set[Subscriber] = set()
+        # Topic index: by exact type, by type prefix, and by job
+        self._any_type: set[Subscriber] = set()
+        self._by_type: dict[str, set[Subscriber]] = defaultdict(set)
+        self._by_prefix: dict[str, set[Subscriber]] = defaultdict(set)
+        self._any_job: set[Subscriber] = set()
+        self._by_job: dict[str, set[Subscriber]] = defaultdict(set)
+        self._history: deque[tuple[int, str, tuple[str, ...], bytes]] = deque(maxlen=replay_size)
+        self._client_buffer = client_buffer
+        self._last_id = 0
+
+    def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        types: Optional[Iterable[str]] = None,
+        jobs: Optional[Iterable[str]] = None,
+    ) -> Subscriber:
+        """Register a client, queueing any matching buffered events after last_event_id."""
+        sub = Subscriber(self._client_buffer, types=types, jobs=jobs)
+        if last_event_id is not None:
+            sub.replay([
+                (event_id, frame)
+                for event_id, event_type, job_ids, frame in self._history
+                if event_id > last_event_id and sub.wants(event_type, job_ids)
+            ])
+        self._index(sub)
+        return sub
 
-    def __init__(self):
-        self._clients: set[asyncio.Queue] = set()
+    def unsubscribe(self, sub: Subscriber) -> None:
+        if sub not in self._clients:
+            return
+        self._clients.discard(sub)
+        if sub.types is None:
+            self._any_type.discard(sub)
+        else:
+            for t in sub.types:
+                self._discard(self._by_type, t, sub)
+            for prefix in sub.type_prefixes:
+                self._discard(self._by_prefix, prefix, sub)
+        if sub.jobs is None:
+            self._any_job.discard(sub)
+        else:
+            for job_id in sub.jobs:
+                self._discard(self._by_job, job_id, sub)
 
-    def subscribe(self) -> asyncio.Queue:
-        q = asyncio.Queue(maxsize=100)
-        self._clients.add(q)
-        return q
+    def _index(self, sub: Subscriber) -> None:
+        self._clients.add(sub)
+        if sub.types is None:
+            self._any_type.add(sub)
+        else:
+            for t in sub.types:
+                self._by_type[t].add(sub)
+            for prefix in sub.type_prefixes:
+                self._by_prefix[prefix].add(sub)
+        if sub.jobs is None:
+            self._any_job.add(sub)
+        else:
+            for job_id in sub.jobs:
+                self._by_job[job_id].add(sub)
 
-    def unsubscribe(self, q: asyncio.Queue) -> None:
-        self._clients.discard(q)
+    @staticmethod
+    def _discard(index: dict[str, set[Subscriber]], key: str, sub: Subscriber) -> None:
+        subs = index.get(key)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del index[key]
+
+    def _recipients(self, event_type: str, job_ids: tuple[str, ...]) -> Iterable[Subscriber]:
+        """Subscribers interested in an event, found via the topic index."""
+        by_type = [self._any_type]
+        if event_type in self._by_type:
+            by_type.append(self._by_type[event_type])
+        by_type.extend(subs for prefix, subs in self._by_prefix.items() if event_type.startswith(prefix))
+        if not job_ids:
+            return set().union(*by_type) if len(by_type) > 1 else by_type[0]
+
+        by_job = [self._any_job]
+        by_job.extend(self._by_job[job_id] for job_id in job_ids if job_id in self._by_job)
+        # Walk whichever side is smaller and check the other with a predicate
+        if sum(map(len, by_job)) <= sum(map(len, by_type)):
+            if len(job_ids) == 1:
+                return [sub for subs in by_job for sub in subs if sub.wants_type(event_type)]
+            # A subscriber to several of the jobs is in several sets
+            return [sub for sub in set().union(*by_job) if sub.wants_type(event_type)]
+        return [sub for sub in set().union(*by_type) if sub.wants_jobs(job_ids)]
 
     async def broadcast(self, event_type: str, data: dict[str, Any]) -> None:
+        self._last_id += 1
+        event_id = self._last_id
         message = {"event": event_type, "data": data, "timestamp": time.time()}
+        frame = encode_frame(message, event_id)
+        job_ids = event_job_ids(data)
+        self._history.append((event_id, event_type, job_ids, frame))
+
+        key: Any = event_id
+        if event_type in COALESCED_EVENTS:
+            field = COALESCED_EVENTS[event_type]
+            key = (event_type, data.get(field) if field else None)
+
         dead = []
-        for q in self._clients:
-            try:
-                q.put_nowait(message)
-            except asyncio.QueueFull:
-                dead.append(q)
-        for q in dead:
-            self._clients.discard(q)
+        for sub in self._recipients(event_type, job_ids):
+            sub.push(key, frame)
+            if sub.closed:
+                dead.append(sub)
+        for sub in dead:
+            self.unsubscribe(sub)
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
 
     @property
     def client_count(self) -> int:
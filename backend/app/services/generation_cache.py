@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import Settings
+from app.models.cache import CacheEntry
+from app.services.storage_service import StorageService
+from app.utils.peaks import peaks_path
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(job, model_version: str, seed: Optional[int] = None, output_format: str = "mp3") -> str:
+    """Hash the generation parameters that determine the output audio."""
+    normalized = {
+        "lyrics": "\n".join(line.strip() for line in job.lyrics.strip().splitlines()),
+        "tags": ",".join(t.strip().lower() for t in job.tags.split(",") if t.strip()),
+        "max_length_ms": job.max_length_ms,
+        "temperature": round(job.temperature, 4),
+        "topk": job.topk,
+        "cfg_scale": round(job.cfg_scale, 4),
+        "seed": seed,
+        "model_version": model_version,
+        "output_format": output_format,
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+class GenerationCache:
+    """Content-addressed cache of finished outputs, keyed by request parameters.
+
+    Cached files live under cache_dir as their own hard link (or copy) of the
+    output, so deleting a track never invalidates the cache and evicting an
+    entry never touches a track's file.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, storage: StorageService, settings: Settings):
+        self._session_factory = session_factory
+        self.storage = storage
+        self.enabled = settings.generation_cache_enabled
+        self.model_version = settings.model_version
+        self.output_format = settings.output_format
+        self.cache_dir = Path(settings.cache_dir)
+        self.max_bytes = settings.generation_cache_max_mb * 1024 * 1024
+        self.max_age = timedelta(days=settings.generation_cache_max_age_days)
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key_for(self, job) -> str:
+        """Jobs that asked for a seed are keyed on it; the rest share one "unseeded" key.
+
+        A server-chosen seed is different on every submission, so keying on it
+        would keep retries and double clicks from ever hitting. Unseeded jobs
+        only read that key when they ask to (see reusable).
+        """
+        seed = job.seed if job.seed_source == "user" else None
+        return cache_key(job, self.model_version, seed=seed, output_format=self.output_format)
+
+    @staticmethod
+    def reusable(job) -> bool:
+        """Whether job may be served an earlier output.
+
+        A seeded job always may: the seed fixes the output. Submitting the
+        same unseeded request again normally means "another variation", so
+        those only match with reuse_cached set.
+        """
+        return job.seed_source == "user" or bool(job.reuse_cached)
+
+    async def lookup(self, job) -> Optional[CacheEntry]:
+        """Return the entry for job's parameters if its file is still present."""
+        if not self.reusable(job):
+            return None
+        key = self.key_for(job)
+        async with self._session_factory() as db:
+            entry = await db.get(CacheEntry, key)
+            if entry is not None and not await asyncio.to_thread(Path(entry.path).exists):
+                await db.delete(entry)
+                await db.commit()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.hit_count += 1
+            entry.last_used_at = datetime.utcnow()
+            await db.commit()
+            self.hits += 1
+            logger.info(f"Cache hit for job {job.id} ({key[:12]})")
+            return entry
+
+    async def link_into(self, entry: CacheEntry, dest: Path) -> Optional[Path]:
+        """Materialize a cached output (and its peaks) at dest without re-encoding.
+
+        None, counted as a miss, if evict() removed the file since lookup.
+        """
+        if not await asyncio.to_thread(_link_with_peaks, Path(entry.path), dest):
+            self.hits -= 1
+            self.misses += 1
+            logger.info(f"Cache entry {entry.key[:12]} was evicted before it could be used")
+            return None
+        return dest
+
+    async def store(self, job, output_path: Path, duration_ms: int) -> None:
+        """Add a freshly generated output to the cache, then enforce limits."""
+        key = self.key_for(job)
+        cached_path = self.cache_dir / key[:2] / f"{key}{output_path.suffix}"
+        await asyncio.to_thread(_link_or_copy, output_path, cached_path)
+        if peaks_path(output_path).exists():
+            await asyncio.to_thread(_link_or_copy, peaks_path(output_path), peaks_path(cached_path))
+        size = self.storage.get_file_size(cached_path) or 0
+
+        async with self._session_factory() as db:
+            entry = await db.get(CacheEntry, key)
+            if entry is None:
+                db.add(CacheEntry(
+                    key=key, path=str(cached_path), duration_ms=duration_ms, seed=job.seed, size_bytes=size,
+                ))
+            else:
+                entry.path = str(cached_path)
+                entry.duration_ms = duration_ms
+                entry.seed = job.seed
+                entry.size_bytes = size
+                entry.last_used_at = datetime.utcnow()
+            await db.commit()
+
+        await self.evict()
+
+    async def evict(self) -> int:
+        """Drop entries idle longer than max_age, then LRU entries over max_bytes."""
+        evicted: list[CacheEntry] = []
+        async with self._session_factory() as db:
+            cutoff = datetime.utcnow() - self.max_age
+            result = await db.execute(select(CacheEntry).where(CacheEntry.last_used_at < cutoff))
+            evicted.extend(result.scalars().all())
+
+            total = (await db.execute(
+                select(func.coalesce(func.sum(CacheEntry.size_bytes), 0))
+                .where(CacheEntry.last_used_at >= cutoff)
+            )).scalar()
+            if total > self.max_bytes:
+                result = await db.execute(
+                    select(CacheEntry)
+                    .where(CacheEntry.last_used_at >= cutoff)
+                    .order_by(CacheEntry.last_used_at.asc())
+                )
+                for entry in result.scalars():
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append(entry)
+                    total -= entry.size_bytes
+
+            if evicted:
+                await db.execute(delete(CacheEntry).where(CacheEntry.key.in_([e.key for e in evicted])))
+                await db.commit()
+
+        for entry in evicted:
+            await self.storage.delete_file(Path(entry.path))
+            await self.storage.delete_file(peaks_path(Path(entry.path)))
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cache entries")
+        return len(evicted)
+
+    async def get_stats(self) -> dict:
+        async with self._session_factory() as db:
+            entries, size = (await db.execute(
+                select(func.count(), func.coalesce(func.sum(CacheEntry.size_bytes), 0))
+                .select_from(CacheEntry)
+            )).one()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _link_with_peaks(src: Path, dest: Path) -> bool:
+    """Link a cached output and, if it has one, its peaks; False if the output is gone."""
+    try:
+        _link_or_copy(src, dest)
+    except FileNotFoundError:
+        return False
+    try:
+        _link_or_copy(peaks_path(src), peaks_path(dest))
+    except FileNotFoundError:
+        pass  # Peaks are optional
+    return True
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Hard-link src to dest, copying when links aren't possible (e.g. across devices)."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from app.services.job_queue import JobQueue
@@ -8,13 +9,22 @@ from app.services.pipeline_manager import PipelineManager
 from app.services.gpu_manager import GPUManager
 from app.services.event_broadcaster import EventBroadcaster
 from app.services.storage_service import StorageService
-from app.utils.audio import get_audio_duration_ms
+from app.services.generation_cache import GenerationCache
+from app.services.audio_stream import AudioStreamHub
+from app.services.progress_channel import ProgressChannel
+from app.utils.audio import DecodedAudio
+from app.utils.peaks import peaks_path
 
 logger = logging.getLogger(__name__)
 
 
 class GenerationWorker:
-    """Background worker that processes generation jobs."""
+    """Background worker that processes generation jobs.
+
+    One runs per generation device, each with its own pipeline and GPU
+    scheduler; they share the JobQueue, whose claims keep any job from being
+    picked up twice.
+    """
 
     def __init__(
         self,
@@ -23,95 +33,92 @@ class GenerationWorker:
         gpu: GPUManager,
         broadcaster: EventBroadcaster,
         storage: StorageService,
+        postprocess_workers: int = 2,
+        max_batch_size: int = 1,
+        batch_length_bucket_ms: int = 30000,
+        batch_vram_per_job_gb: float = 2.0,
+        cache: Optional[GenerationCache] = None,
+        streams: Optional[AudioStreamHub] = None,
+        progress_interval_s: float = 0.25,
+        device: Optional[str] = None,
     ):
         self.job_queue = job_queue
+        self.device = device
         self.pipeline = pipeline
         self.gpu = gpu
         self.broadcaster = broadcaster
         self.storage = storage
+        self.cache = cache
+        self.streams = streams
+        self.progress = ProgressChannel(broadcaster, progress_interval_s)
         self._running = False
         self._task: Optional[asyncio.Task] = None
-        self._current_job_id: Optional[str] = None
+        self._current_job_ids: list[str] = []
+        self.max_batch_size = max_batch_size
+        self.batch_length_bucket_ms = batch_length_bucket_ms
+        self.batch_vram_per_job_gb = batch_vram_per_job_gb
+
+        postprocess_workers = max(1, postprocess_workers)
+        # Post-processing stage: encoding, probing, DB writes and broadcasts
+        # run here while the next job is already on the GPU. The semaphore
+        # bounds how many finished jobs may wait on this stage at once.
+        self._postprocess_pool = ThreadPoolExecutor(
+            max_workers=postprocess_workers, thread_name_prefix="postprocess"
+        )
+        self._postprocess_slots = asyncio.Semaphore(postprocess_workers)
+        self._postprocess_tasks: set[asyncio.Task] = set()
 
     async def start(self) -> None:
         self._running = True
         self._task = asyncio.create_task(self._run_loop())
-        logger.info("Generation worker started")
+        logger.info(f"Generation worker started on {self.device or 'default device'}")
 
     async def stop(self) -> None:
         self._running = False
         self.job_queue._notify.set()  # Wake up if waiting
         if self._task:
             await self._task
-        logger.info("Generation worker stopped")
+        if self._postprocess_tasks:
+            await asyncio.gather(*self._postprocess_tasks, return_exceptions=True)
+        self._postprocess_pool.shutdown(wait=True)
+        logger.info(f"Generation worker on {self.device or 'default device'} stopped")
 
     async def _run_loop(self) -> None:
         while self._running:
             try:
-                job = await self.job_queue.dequeue()
-                if job is None:
+                jobs = await self._dequeue_batch()
+                if not jobs:
                     await self.job_queue.wait_for_job()
                     continue
 
-                self._current_job_id = job.id
-                await self.broadcaster.broadcast("job:started", {"job_id": job.id})
+                if self.cache is not None and self.cache.enabled:
+                    jobs = await self._serve_from_cache(jobs)
+                    if not jobs:
+                        continue
 
-                try:
-                    gpu_lock = await self.gpu.gpu_lock()
-                    async with gpu_lock:
-                        output_path = await self._run_generation(job)
-
-                    # Get audio duration
-                    duration_ms = get_audio_duration_ms(output_path) or job.max_length_ms
-
-                    # Get output URL
-                    output_url = self.storage.get_output_url(output_path)
-                    file_size = self.storage.get_file_size(output_path)
-
-                    # Mark completed
-                    await self.job_queue.mark_completed(
-                        job.id, str(output_path), duration_ms
-                    )
-
-                    # Auto-create track
-                    from app.models.track import Track
-                    from app.database import async_session_factory
-
-                    # Generate title from first line of lyrics
-                    title = _extract_title(job.lyrics)
-
-                    async with async_session_factory() as db:
-                        track = Track(
-                            id=str(uuid.uuid4()),
-                            job_id=job.id,
-                            title=title,
-                            tags=job.tags,
-                            lyrics=job.lyrics,
-                            output_path=str(output_path),
-                            output_url=output_url,
-                            duration_ms=duration_ms,
-                            file_size_bytes=file_size,
-                        )
-                        db.add(track)
-                        await db.commit()
-                        await db.refresh(track)
-
-                    await self.broadcaster.broadcast("job:completed", {
-                        "job_id": job.id,
-                        "track_id": track.id,
-                        "output_url": output_url,
-                        "duration_ms": duration_ms,
-                    })
+                self._current_job_ids = [job.id for job in jobs]
+                for job in jobs:
+                    await self.broadcaster.broadcast("job:started", {"job_id": job.id})
 
+                rows_per_job = 2 if jobs[0].cfg_scale != 1.0 else 1
+                working_gb = self.batch_vram_per_job_gb * rows_per_job * len(jobs)
+                try:
+                    # GPU stage: the reservation is released as soon as frames are decoded
+                    async with self.gpu.reserve(["generation", "codec"], working_gb, label=f"generation:{jobs[0].id}"):
+                        audios = await self._run_generation(jobs)
                 except Exception as e:
-                    logger.error(f"Generation failed for job {job.id}: {e}")
-                    await self.job_queue.mark_failed(job.id, str(e))
-                    await self.broadcaster.broadcast("job:failed", {
-                        "job_id": job.id,
-                        "error": str(e),
-                    })
+                    for job in jobs:
+                        await self._fail_job(job, e)
+                    continue
                 finally:
-                    self._current_job_id = None
+                    self._current_job_ids = []
+                    for job in jobs:
+                        self.progress.close(job.id)
+                        if self.streams is not None:
+                            self.streams.close(job.id)
+
+                for job, audio in zip(jobs, audios):
+                    await self._submit_postprocess(job, audio)
 
             except asyncio.CancelledError:
                 break
@@ -119,36 +126,175 @@ class GenerationWorker:
                 logger.error(f"Worker loop error: {e}")
                 await asyncio.sleep(1)
 
-    async def _run_generation(self, job) -> Path:
-        """Run HeartMuLa pipeline with progress reporting via tqdm hook."""
-        output_path = self.storage.get_output_path(job.id)
-        loop = asyncio.get_running_loop()
-
-        def progress_callback(step: int, total: int):
-            """Called from generation thread by the tqdm ProgressHook."""
-            progress = step / total if total > 0 else 0
-            # Schedule the async broadcast from the worker thread
-            asyncio.run_coroutine_threadsafe(
-                self.broadcaster.broadcast("job:progress", {
-                    "job_id": job.id,
-                    "step": step,
-                    "total_steps": total,
-                    "progress": progress,
-                }),
-                loop,
+    async def _dequeue_batch(self) -> list:
+        """Claim the oldest pending job plus any compatible jobs that fit on the GPU."""
+        head = await self.job_queue.dequeue(self.device)
+        if head is None:
+            return []
+        rows_per_job = 2 if head.cfg_scale != 1.0 else 1
+        size = self.gpu.batch_size_for(self.batch_vram_per_job_gb, rows_per_job, self.max_batch_size)
+        extra = await self.job_queue.dequeue_compatible(
+            head, size - 1, self.batch_length_bucket_ms, self.device, prompt_length=self.pipeline.prompt_length,
+        )
+        return [head, *extra]
+
+    async def _serve_from_cache(self, jobs: list) -> list:
+        """Complete cache hits without the GPU; return the jobs still to generate."""
+        misses = []
+        for job in jobs:
+            entry = await self.cache.lookup(job)
+            if entry is None:
+                misses.append(job)
+                continue
+            served = True
+            try:
+                output_path = self.storage.get_output_path(job.id).with_suffix(Path(entry.path).suffix)
+                if await self.cache.link_into(entry, output_path) is None:
+                    served = False  # Evicted since the lookup: generate it after all
+                    continue
+                await self.broadcaster.broadcast("job:started", {"job_id": job.id})
+                if job.seed_source == "server" and job.seed != entry.seed:
+                    # The job asked for no seed; record the one behind the audio it gets
+                    await self.job_queue.set_seed(job.id, entry.seed)
+                await self._complete_job(job, output_path, entry.duration_ms)
+            except Exception as e:
+                await self._fail_job(job, e)
+            finally:
+                if not served:
+                    misses.append(job)
+                elif self.streams is not None:
+                    # Anyone waiting on a live stream should fetch the file instead
+                    self.streams.close(job.id)
+        return misses
+
+    async def _submit_postprocess(self, job, audio: DecodedAudio) -> None:
+        """Hand a decoded job to the CPU stage, waiting if it is saturated."""
+        await self._postprocess_slots.acquire()
+        task = asyncio.create_task(self._postprocess(job, audio))
+        self._postprocess_tasks.add(task)
+        task.add_done_callback(self._on_postprocess_done)
+
+    def _on_postprocess_done(self, task: asyncio.Task) -> None:
+        self._postprocess_tasks.discard(task)
+        self._postprocess_slots.release()
+
+    async def _postprocess(self, job, audio: DecodedAudio) -> None:
+        """Encode and persist a generated job, then announce it."""
+        try:
+            output_path = self.storage.get_output_path(job.id)
+            results = await asyncio.gather(
+                self.storage.save_audio(audio, output_path, executor=self._postprocess_pool),
+                self.storage.save_peaks(audio, output_path, executor=self._postprocess_pool),
+                return_exceptions=True,
+            )
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                # Don't leave a partial encode behind for a job that gets no track
+                await self.storage.delete_file(output_path)
+                await self.storage.delete_file(peaks_path(output_path))
+                raise errors[0]
+
+            # Exact from the decoded sample count; no need to probe the file
+            duration_ms = audio.duration_ms
+
+            await self._complete_job(job, output_path, duration_ms)
+        except Exception as e:
+            await self._fail_job(job, e)
+            return
+
+        if job.seed_source is not None and self.cache is not None and self.cache.enabled:
+            try:
+                await self.cache.store(job, output_path, duration_ms)
+            except Exception as e:
+                logger.warning(f"Could not cache output of job {job.id}: {e}")
+
+    async def _complete_job(self, job, output_path: Path, duration_ms: int) -> None:
+        """Mark the job completed, create its Track and broadcast the result."""
+        # Get output URL
+        output_url = self.storage.get_output_url(output_path)
+        file_size = self.storage.get_file_size(output_path)
+        await self.storage.publish(output_path)
+
+        # Mark completed
+        await self.job_queue.mark_completed(
+            job.id, str(output_path), duration_ms
+        )
+
+        # Auto-create track
+        from app.models.track import Track
+        from app.database import async_session_factory
+
+        # Generate title from first line of lyrics
+        title = _extract_title(job.lyrics)
+
+        async with async_session_factory() as db:
+            track = Track(
+                id=str(uuid.uuid4()),
+                job_id=job.id,
+                title=title,
+                tags=job.tags,
+                lyrics=job.lyrics,
+                output_path=str(output_path),
+                output_url=output_url,
+                duration_ms=duration_ms,
+                file_size_bytes=file_size,
+            )
+            db.add(track)
+            await db.commit()
+            await db.refresh(track)
+
+        await self.broadcaster.broadcast("job:completed", {
+            "job_id": job.id,
+            "track_id": track.id,
+            "output_url": output_url,
+            "duration_ms": duration_ms,
+        })
+        if self.streams is not None:
+            self.streams.discard(job.id)
+
+    async def _fail_job(self, job, error: Exception) -> None:
+        logger.error(f"Generation failed for job {job.id}: {error}")
+        await self.job_queue.mark_failed(job.id, str(error))
+        await self.broadcaster.broadcast("job:failed", {
+            "job_id": job.id,
+            "error": str(error),
+        })
+        if self.streams is not None:
+            self.streams.discard(job.id)
+
+    async def _run_generation(self, jobs: list) -> list[DecodedAudio]:
+        """Run HeartMuLa pipeline; progress flows through the ProgressChannel."""
+        slots = [self.progress.open(job.id) for job in jobs]
+        sinks = [self.streams.open(job.id) for job in jobs] if self.streams is not None else None
+
+        head = jobs[0]
+        if len(jobs) == 1:
+            audio = await self.pipeline.generate(
+                lyrics=head.lyrics,
+                tags=head.tags,
+                max_audio_length_ms=head.max_length_ms,
+                temperature=head.temperature,
+                topk=head.topk,
+                cfg_scale=head.cfg_scale,
+                seed=head.seed,
+                progress_slot=slots[0],
+                audio_sink=sinks[0] if sinks else None,
             )
+            return [audio]
 
-        await self.pipeline.generate(
-            lyrics=job.lyrics,
-            tags=job.tags,
-            save_path=output_path,
-            max_audio_length_ms=job.max_length_ms,
-            temperature=job.temperature,
-            topk=job.topk,
-            cfg_scale=job.cfg_scale,
-            progress_callback=progress_callback,
+        # Compatible jobs share sampling parameters (see JobQueue.dequeue_compatible)
+        return await self.pipeline.generate_batch(
+            requests=[
+                {"lyrics": job.lyrics, "tags": job.tags, "max_audio_length_ms": job.max_length_ms}
+                for job in jobs
+            ],
+            temperature=head.temperature,
+            topk=head.topk,
+            cfg_scale=head.cfg_scale,
+            seed=None,  # Batched jobs are unseeded (see JobQueue.dequeue_compatible)
+            progress_slots=slots,
+            audio_sinks=sinks,
         )
-        return output_path
 
 
 def _extract_title(lyrics: str) -> str:
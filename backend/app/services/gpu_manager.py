@@ -1,6 +1,11 @@
 import asyncio
 import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -15,19 +20,84 @@ class GPUInfo:
     use_mmgp: bool = False
 
 
+@dataclass
+class ModelSlot:
+    name: str
+    size_gb: float
+    evict: Callable[[], object]  # frees the model's VRAM; runs in a worker thread
+    is_loaded: Optional[Callable[[], bool]] = None  # ground truth, if the model can report it
+    resident: bool = False
+    users: int = 0
+    last_used: float = 0.0
+
+
+def detect_devices(spec: str = "auto") -> list[str]:
+    """Devices to run generation workers on, from HEARTMULA_GENERATION_DEVICES.
+
+    "auto" is every CUDA device, or a single "cpu" without CUDA. Otherwise a
+    comma-separated list of "cuda:N" (or just "N") and "cpu"; repeating
+    "cpu" simulates several devices on a CPU-only machine.
+    """
+    spec = spec.strip()
+    if spec == "auto":
+        try:
+            import torch
+            count = torch.cuda.device_count() if torch.cuda.is_available() else 0
+        except ImportError:
+            count = 0
+        return [f"cuda:{i}" for i in range(count)] or ["cpu"]
+    devices = []
+    for part in spec.split(","):
+        part = part.strip()
+        if part.isdigit():
+            part = f"cuda:{part}"
+        if part != "cpu" and not (part.startswith("cuda:") and part[5:].isdigit()):
+            raise ValueError(f"Invalid generation device {part!r} (use cuda:N or cpu)")
+        devices.append(part)
+    if not devices:
+        raise ValueError("No generation devices configured")
+    return devices
+
+
 class GPUManager:
-    def __init__(self):
+    """GPU detection plus a VRAM budget scheduler, for one device.
+
+    Work declares which registered models it needs and how much working
+    memory it takes on top; reserve() admits it once that fits the budget,
+    evicting the least recently used idle models to make room. Waiters are
+    admitted strictly in arrival order, so a transcription queued behind a
+    generation (or the other way round) is never overtaken. Work that fits
+    alongside what is already running runs concurrently.
+
+    Multi-GPU hosts get one manager per device (see detect_devices); "cpu"
+    managers skip detection and schedule against an unlimited budget.
+    """
+
+    def __init__(self, budget_gb: Optional[float] = None, headroom_gb: float = 1.0, device: str = "cuda:0"):
+        self.device = device
+        self._index = int(device[5:]) if device.startswith("cuda:") else None
         self.info = GPUInfo()
-        self._lock = asyncio.Lock()
+        self.headroom_gb = headroom_gb
+        # None: derived from total VRAM on initialize(); unlimited without CUDA
+        self.budget_gb = budget_gb if budget_gb is not None else math.inf
+        self._budget_from_device = budget_gb is None
+        self._models: dict[str, ModelSlot] = {}
+        self._working_gb = 0.0
+        self._running: list[str] = []
+        self._waiters: deque[object] = deque()
+        self._cond = asyncio.Condition()
+        self.evictions = 0
 
     async def initialize(self) -> GPUInfo:
         """Detect GPU capabilities."""
+        if self._index is None:
+            return self.info
         try:
             import torch
-            if torch.cuda.is_available():
-                props = torch.cuda.get_device_properties(0)
+            if torch.cuda.is_available() and self._index < torch.cuda.device_count():
+                props = torch.cuda.get_device_properties(self._index)
                 total = getattr(props, 'total_memory', getattr(props, 'total_mem', 0)) / (1024**3)
-                used = torch.cuda.memory_allocated(0) / (1024**3)
+                used = torch.cuda.memory_allocated(self._index) / (1024**3)
                 self.info = GPUInfo(
                     name=props.name,
                     vram_total_gb=round(total, 1),
@@ -36,8 +106,10 @@ class GPUManager:
                     cuda_available=True,
                     use_mmgp=total < 14,  # Use mmgp for GPUs < 14GB
                 )
+                if self._budget_from_device:
+                    self.budget_gb = max(0.0, total - self.headroom_gb)
             else:
-                logger.warning("CUDA not available")
+                logger.warning(f"CUDA device {self.device} not available")
         except ImportError:
             logger.warning("PyTorch not installed, GPU features disabled")
         return self.info
@@ -46,21 +118,157 @@ class GPUManager:
         """Return current GPU status as dict."""
         try:
             import torch
-            if torch.cuda.is_available():
-                used = torch.cuda.memory_allocated(0) / (1024**3)
-                reserved = torch.cuda.memory_reserved(0) / (1024**3)
+            if self.info.cuda_available:
+                used = torch.cuda.memory_allocated(self._index) / (1024**3)
                 self.info.vram_used_gb = round(used, 1)
                 self.info.vram_free_gb = round(self.info.vram_total_gb - used, 1)
         except (ImportError, RuntimeError):
             pass
         return {
+            "device": self.device,
             "name": self.info.name,
             "vram_total_gb": self.info.vram_total_gb,
             "vram_used_gb": self.info.vram_used_gb,
             "vram_free_gb": self.info.vram_free_gb,
             "use_mmgp": self.info.use_mmgp,
+            "scheduler": self.get_schedule(),
         }
 
-    async def gpu_lock(self):
-        """Acquire exclusive GPU access."""
-        return self._lock
+    def batch_size_for(self, vram_per_row_gb: float, rows_per_job: int, cap: int) -> int:
+        """How many jobs fit in one batched forward pass given free VRAM.
+
+        Without CUDA (CPU runs, fake models) only the configured cap applies.
+        """
+        if cap <= 1:
+            return 1
+        if not self.info.cuda_available:
+            return cap
+        try:
+            import torch
+            free_bytes, _ = torch.cuda.mem_get_info(self._index)
+        except (ImportError, RuntimeError):
+            return cap
+        free_gb = free_bytes / (1024**3)
+        fits = int(free_gb // (vram_per_row_gb * rows_per_job))
+        return max(1, min(cap, fits))
+
+    def register_model(
+        self,
+        name: str,
+        size_gb: float,
+        evict: Callable[[], object],
+        is_loaded: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """Track a model's VRAM footprint; evict() is called when its space is needed."""
+        resident = bool(is_loaded()) if is_loaded is not None else False
+        self._models[name] = ModelSlot(name=name, size_gb=size_gb, evict=evict, is_loaded=is_loaded, resident=resident)
+
+    @asynccontextmanager
+    async def reserve(
+        self, models: Sequence[str], working_gb: float = 0.0, label: str = "",
+    ) -> AsyncIterator[None]:
+        """Hold VRAM for models plus working_gb until exit.
+
+        Waits its turn behind earlier callers. The models are counted as
+        resident from admission on; the caller loads them lazily inside the
+        block. Unregistered names are ignored.
+        """
+        ticket = object()
+        needed = [self._models[n] for n in models if n in self._models]
+        async with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    if self._waiters[0] is ticket:
+                        victims = self._plan(needed, working_gb)
+                        if victims is not None:
+                            break
+                    await self._cond.wait()
+            except BaseException:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._waiters.popleft()
+            for slot in needed:
+                slot.users += 1
+            self._working_gb += working_gb
+            self._running.append(label)
+            try:
+                # Evicting under the condition's lock keeps the next waiter
+                # from counting memory that has not been freed yet
+                for slot in victims:
+                    await self._evict(slot)
+            except BaseException:
+                self._release(needed, working_gb, label)
+                raise
+            for slot in needed:
+                slot.resident = True
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._release(needed, working_gb, label)
+
+    def _release(self, needed: list[ModelSlot], working_gb: float, label: str) -> None:
+        now = time.monotonic()
+        for slot in needed:
+            slot.users -= 1
+            slot.last_used = now
+        self._working_gb -= working_gb
+        self._running.remove(label)
+        self._cond.notify_all()
+
+    def _plan(self, needed: list[ModelSlot], working_gb: float) -> Optional[list[ModelSlot]]:
+        """Idle models to evict so needed + working_gb fit, or None to keep waiting."""
+        self._refresh()
+        loading = sum(s.size_gb for s in needed if not s.resident)
+        free = self.budget_gb - self._working_gb - sum(s.size_gb for s in self._models.values() if s.resident)
+        if loading + working_gb <= free:
+            return []
+        names = {s.name for s in needed}
+        idle = sorted(
+            (s for s in self._models.values() if s.resident and s.users == 0 and s.name not in names),
+            key=lambda s: s.last_used,
+        )
+        victims = []
+        for slot in idle:
+            victims.append(slot)
+            free += slot.size_gb
+            if loading + working_gb <= free:
+                return victims
+        if not self._running:
+            # Bigger than the whole budget: run it alone rather than never
+            total = sum(s.size_gb for s in needed) + working_gb
+            logger.debug(f"{total:.1f}GB needed exceeds the {self.budget_gb:.1f}GB VRAM budget; running alone")
+            return victims
+        return None
+
+    def _refresh(self) -> None:
+        # Models can leave the GPU on their own (idle unload); trust them over our books
+        for slot in self._models.values():
+            if slot.is_loaded is not None and slot.users == 0:
+                slot.resident = bool(slot.is_loaded())
+
+    async def _evict(self, slot: ModelSlot) -> None:
+        try:
+            await asyncio.to_thread(slot.evict)
+        except Exception as e:
+            logger.warning(f"Evicting {slot.name} failed: {e}")
+        slot.resident = False
+        self.evictions += 1
+        logger.info(f"Evicted {slot.name} ({slot.size_gb:.1f}GB) from VRAM")
+
+    def get_schedule(self) -> dict:
+        used = self._working_gb + sum(s.size_gb for s in self._models.values() if s.resident)
+        return {
+            "budget_gb": None if math.isinf(self.budget_gb) else round(self.budget_gb, 1),
+            "reserved_gb": round(used, 1),
+            "running": list(self._running),
+            "queued": len(self._waiters),
+            "evictions": self.evictions,
+            "models": {
+                s.name: {"size_gb": s.size_gb, "resident": s.resident, "in_use": s.users > 0}
+                for s in self._models.values()
+            },
+        }
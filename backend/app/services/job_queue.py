@@ -1,13 +1,17 @@
 import asyncio
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Callable, Optional
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, func, and_, or_
 from app.models.job import GenerationJob
+from app.utils.pagination import page_results, paginate
 
 logger = logging.getLogger(__name__)
 
+# Pending jobs looked at per claim attempt; other workers may take some first
+CLAIM_CANDIDATES = 8
+
 
 class JobQueue:
     """SQLite-backed persistent job queue with crash recovery."""
@@ -15,11 +19,23 @@ class JobQueue:
     def __init__(self, session_factory: async_sessionmaker):
         self._session_factory = session_factory
         self._notify = asyncio.Event()
+        self._last_created_at = datetime.min
+
+    def _created_at(self, count: int = 1) -> list[datetime]:
+        """Queue timestamps for count new jobs, each later than any handed out before.
+
+        Both enqueue paths take created_at from here, at microsecond
+        resolution, so jobs keep their submission order and a batch's jobs
+        stay consecutive even when single jobs arrive in the same second.
+        """
+        start = max(datetime.utcnow(), self._last_created_at + timedelta(microseconds=1))
+        self._last_created_at = start + timedelta(microseconds=count - 1)
+        return [start + timedelta(microseconds=i) for i in range(count)]
 
     async def enqueue(self, job_data: dict) -> GenerationJob:
         """Insert a new pending job."""
         async with self._session_factory() as db:
-            job = GenerationJob(**job_data)
+            job = GenerationJob(**job_data, created_at=self._created_at()[0])
             db.add(job)
             await db.commit()
             await db.refresh(job)
@@ -27,26 +43,129 @@ class JobQueue:
             logger.info(f"Job {job.id} enqueued")
             return job
 
-    async def dequeue(self) -> Optional[GenerationJob]:
-        """Fetch oldest pending job and atomically set to processing."""
+    async def enqueue_many(self, jobs_data: list[dict]) -> list[GenerationJob]:
+        """Insert many pending jobs in a single transaction, consecutive in queue order."""
+        async with self._session_factory() as db:
+            jobs = [
+                GenerationJob(**data, created_at=created_at)
+                for data, created_at in zip(jobs_data, self._created_at(len(jobs_data)))
+            ]
+            db.add_all(jobs)
+            await db.commit()
+            self._notify.set()
+            logger.info(f"{len(jobs)} jobs enqueued")
+            return jobs
+
+    async def dequeue(self, device: Optional[str] = None) -> Optional[GenerationJob]:
+        """Claim the oldest pending job and set it to processing.
+
+        Safe with several workers: see _claim.
+        """
+        async with self._session_factory() as db:
+            while True:
+                result = await db.execute(
+                    select(GenerationJob.id)
+                    .where(GenerationJob.status == "pending")
+                    .order_by(GenerationJob.created_at.asc(), GenerationJob.id.asc())
+                    .limit(CLAIM_CANDIDATES)
+                )
+                candidates = list(result.scalars().all())
+                if not candidates:
+                    return None
+                for job_id in candidates:
+                    if await self._claim(db, job_id, device):
+                        await db.commit()
+                        job = (await db.execute(
+                            select(GenerationJob).where(GenerationJob.id == job_id)
+                        )).scalar_one()
+                        logger.info(f"Job {job.id} dequeued -> processing" + (f" on {device}" if device else ""))
+                        return job
+                # Every candidate went to another worker in the meantime; look again
+                await db.rollback()
+
+    @staticmethod
+    async def _claim(db: AsyncSession, job_id: str, device: Optional[str]) -> bool:
+        """Move one job from pending to processing, if it is still pending.
+
+        SQLite has no SELECT ... FOR UPDATE, so the select that found the job
+        guarantees nothing; the conditional UPDATE does. Only one worker's
+        update can match the pending row, the rest see rowcount 0.
+        """
+        result = await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.status == "pending")
+            .values(status="processing", started_at=datetime.utcnow(), device=device)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def dequeue_compatible(
+        self,
+        head: GenerationJob,
+        limit: int,
+        length_bucket_ms: int,
+        device: Optional[str] = None,
+        prompt_length: Optional[Callable[[str, str], int]] = None,
+    ) -> list[GenerationJob]:
+        """Claim up to `limit` more pending jobs that can share head's forward pass.
+
+        Compatible jobs sample with the same topk, temperature and cfg_scale
+        and fall into the same max_length_ms bucket as head. With
+        prompt_length(lyrics, tags), only jobs whose prompt has as many
+        tokens as head's are claimed; the rest stay pending for a pass of
+        their own instead of waiting on this one. A batch samples from one
+        RNG stream, so no seed reproduces a batched job's output: jobs with
+        a user-supplied seed never batch, and server-chosen seeds are
+        cleared on the jobs that do.
+        """
+        if limit <= 0 or head.seed_source != "server":
+            return []
+        bucket = head.max_length_ms // length_bucket_ms
+        head_length = prompt_length(head.lyrics, head.tags) if prompt_length is not None else None
         async with self._session_factory() as db:
-            # Note: with_for_update() is not supported by SQLite,
-            # but SQLite serializes writes via its own locking, which
-            # is sufficient for a single-worker queue.
             result = await db.execute(
-                select(GenerationJob)
-                .where(GenerationJob.status == "pending")
-                .order_by(GenerationJob.created_at.asc())
-                .limit(1)
+                select(GenerationJob.id, GenerationJob.lyrics, GenerationJob.tags)
+                .where(
+                    GenerationJob.status == "pending",
+                    GenerationJob.seed_source == "server",
+                    GenerationJob.topk == head.topk,
+                    GenerationJob.temperature == head.temperature,
+                    GenerationJob.cfg_scale == head.cfg_scale,
+                    GenerationJob.max_length_ms >= bucket * length_bucket_ms,
+                    GenerationJob.max_length_ms < (bucket + 1) * length_bucket_ms,
+                )
+                .order_by(GenerationJob.created_at.asc(), GenerationJob.id.asc())
+                .limit(limit if head_length is None else limit * CLAIM_CANDIDATES)
             )
-            job = result.scalar_one_or_none()
-            if job:
-                job.status = "processing"
-                job.started_at = datetime.utcnow()
+            # Jobs another worker claims first are simply left out of the batch
+            claimed = []
+            for job_id, lyrics, tags in result.all():
+                if len(claimed) == limit:
+                    break
+                if head_length is not None and prompt_length(lyrics, tags) != head_length:
+                    continue
+                if await self._claim(db, job_id, device):
+                    claimed.append(job_id)
+            if not claimed:
                 await db.commit()
-                await db.refresh(job)
-                logger.info(f"Job {job.id} dequeued -> processing")
-            return job
+                return []
+            await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id.in_([head.id, *claimed]))
+                .values(seed=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            head.seed = None
+            result = await db.execute(
+                select(GenerationJob)
+                .where(GenerationJob.id.in_(claimed))
+                .order_by(GenerationJob.created_at.asc(), GenerationJob.id.asc())
+            )
+            jobs = list(result.scalars().all())
+            if jobs:
+                logger.info(f"Batched {len(jobs)} jobs with {head.id} -> processing")
+            return jobs
 
     async def mark_completed(self, job_id: str, output_path: str, duration_ms: int) -> None:
         async with self._session_factory() as db:
@@ -63,6 +182,11 @@ class JobQueue:
             await db.commit()
             logger.info(f"Job {job_id} completed")
 
+    async def set_seed(self, job_id: str, seed: Optional[int]) -> None:
+        async with self._session_factory() as db:
+            await db.execute(update(GenerationJob).where(GenerationJob.id == job_id).values(seed=seed))
+            await db.commit()
+
     async def mark_failed(self, job_id: str, error: str) -> None:
         async with self._session_factory() as db:
             await db.execute(
@@ -99,35 +223,74 @@ class JobQueue:
             )
             return result.scalar_one_or_none()
 
-    async def get_jobs(self, status: Optional[str] = None, limit: int = 50, offset: int = 0) -> tuple[list[GenerationJob], int]:
-        """Get jobs with optional filter. Returns (jobs, total_count)."""
+    async def get_jobs(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        with_total: bool = True,
+    ) -> tuple[list[GenerationJob], Optional[int], Optional[str]]:
+        """Newest-first page of jobs after cursor. Returns (jobs, total_count, next_cursor).
+
+        total_count is None unless with_total is set. Raises ValueError for a
+        malformed cursor.
+        """
         async with self._session_factory() as db:
             query = select(GenerationJob)
             count_query = select(func.count()).select_from(GenerationJob)
             if status:
                 query = query.where(GenerationJob.status == status)
                 count_query = count_query.where(GenerationJob.status == status)
-            query = query.order_by(GenerationJob.created_at.desc()).limit(limit).offset(offset)
+            keys = [GenerationJob.created_at, GenerationJob.id]
+            query = paginate(query, keys, True, cursor, limit)
+            if offset and not cursor:
+                query = query.offset(offset)
 
             result = await db.execute(query)
-            jobs = list(result.scalars().all())
-            count_result = await db.execute(count_query)
-            total = count_result.scalar() or 0
-            return jobs, total
+            jobs, next_cursor = page_results(result.all(), limit, len(keys))
+            total = None
+            if with_total:
+                count_result = await db.execute(count_query)
+                total = count_result.scalar() or 0
+            return jobs, total, next_cursor
 
     async def get_queue_position(self, job_id: str) -> int:
-        """Get position of a pending job in queue (0-based)."""
+        """Get position of a pending job in queue (0-based).
+
+        Counts the pending jobs ahead of it on the (status, created_at, id)
+        index instead of loading the whole queue.
+        """
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(GenerationJob.created_at)
+                .where(GenerationJob.id == job_id, GenerationJob.status == "pending")
+            )
+            created_at = result.scalar_one_or_none()
+            if created_at is None:
+                return -1
+            result = await db.execute(
+                select(func.count())
+                .select_from(GenerationJob)
+                .where(
+                    GenerationJob.status == "pending",
+                    or_(
+                        GenerationJob.created_at < created_at,
+                        and_(GenerationJob.created_at == created_at, GenerationJob.id < job_id),
+                    ),
+                )
+            )
+            return result.scalar() or 0
+
+    async def get_pending_job_ids(self) -> list[str]:
+        """Return all pending job ids in dequeue order (index = position)."""
         async with self._session_factory() as db:
             result = await db.execute(
                 select(GenerationJob.id)
                 .where(GenerationJob.status == "pending")
-                .order_by(GenerationJob.created_at.asc())
+                .order_by(GenerationJob.created_at.asc(), GenerationJob.id.asc())
             )
-            ids = [row[0] for row in result.all()]
-            try:
-                return ids.index(job_id)
-            except ValueError:
-                return -1
+            return list(result.scalars().all())
 
     async def recover_stale_jobs(self) -> int:
         """Reset processing jobs to pending on startup (crash recovery)."""
@@ -139,12 +302,18 @@ class JobQueue:
             for job in stale:
                 job.status = "pending"
                 job.started_at = None
+                job.device = None
             await db.commit()
             if stale:
                 logger.info(f"Recovered {len(stale)} stale jobs")
             return len(stale)
 
     async def wait_for_job(self) -> None:
-        """Block until a new job is available."""
-        self._notify.clear()
+        """Block until a new job is available.
+
+        The flag is cleared after waking, not before waiting, so a job
+        enqueued while a worker was busy dequeuing is not missed. Every
+        waiting worker wakes; the claim decides which one gets the job.
+        """
         await self._notify.wait()
+        self._notify.clear()
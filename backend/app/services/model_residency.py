@@ -0,0 +1,224 @@
+import gc
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Iterator, Iterable, Optional
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class Residency(str, Enum):
+    DISK = "disk"  # dropped; the next use reloads the checkpoint from disk
+    HOST = "host"  # parked in host RAM (pinned when CUDA is available)
+    DEVICE = "device"  # on its compute device, ready to run
+
+
+@dataclass
+class ManagedModule:
+    name: str
+    device: torch.device
+    load: Callable[[], torch.nn.Module]  # (re)load from disk and attach to the pipeline
+    detach: Callable[[], None]  # drop the pipeline's reference
+    module: Optional[torch.nn.Module] = None
+    residency: Residency = Residency.DISK
+
+
+class ModelResidency:
+    """Keeps model weights on their device while in use and parks them when idle.
+
+    Callers wrap each use in hold(). Once nothing has held the models for
+    idle_unload_s seconds they move to host RAM (keep_host_copy) or are
+    dropped entirely; the next hold() brings them back, from pinned host
+    memory when possible and from disk otherwise. idle_unload_s=None keeps
+    them resident forever, 0 parks them as soon as each hold ends.
+
+    Thread-safe: hold() runs in generation threads and idle unloads fire
+    from a timer thread.
+    """
+
+    def __init__(
+        self,
+        idle_unload_s: Optional[float],
+        keep_host_copy: bool = True,
+        on_offload: Optional[Callable[[], None]] = None,
+    ):
+        self.idle_unload_s = idle_unload_s
+        self.keep_host_copy = keep_host_copy
+        self._on_offload = on_offload
+        self._modules: dict[str, ManagedModule] = {}
+        self._lock = threading.RLock()
+        self._busy = 0
+        self._timer: Optional[threading.Timer] = None
+        self._last_used: Optional[float] = None
+        self.last_reload_ms: Optional[float] = None
+        self.last_reload_source: Optional[Residency] = None
+        self.reloads = {Residency.DISK: 0, Residency.HOST: 0}
+        self.offloads = 0
+
+    def register(
+        self,
+        name: str,
+        device: torch.device,
+        load: Callable[[], torch.nn.Module],
+        detach: Callable[[], None],
+        module: Optional[torch.nn.Module] = None,
+    ) -> None:
+        """Manage a module; pass module if it is already loaded on device."""
+        with self._lock:
+            self._modules[name] = ManagedModule(
+                name=name, device=device, load=load, detach=detach, module=module,
+                residency=Residency.DEVICE if module is not None else Residency.DISK,
+            )
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Bring every module onto its device and keep it there until exit."""
+        with self._lock:
+            self._cancel_timer()
+            self._busy += 1
+            try:
+                self._ensure_resident()
+            except BaseException:
+                self._busy -= 1
+                raise
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy -= 1
+                self._last_used = time.monotonic()
+                if self._busy == 0:
+                    self._schedule_idle_unload()
+
+    def offload(self, names: Optional[Iterable[str]] = None) -> bool:
+        """Park idle modules now (e.g. to free VRAM for another model). False if in use.
+
+        names limits this to some modules; the rest stay where they are.
+        """
+        with self._lock:
+            if self._busy:
+                return False
+            if names is None:
+                self._cancel_timer()
+            self._offload(names)
+            return True
+
+    def is_on_device(self, name: str) -> bool:
+        with self._lock:
+            managed = self._modules.get(name)
+            return managed is not None and managed.residency == Residency.DEVICE
+
+    def close(self) -> None:
+        with self._lock:
+            self._cancel_timer()
+            self._modules.clear()
+
+    def _ensure_resident(self) -> None:
+        pending = [m for m in self._modules.values() if m.residency != Residency.DEVICE]
+        if not pending:
+            return
+        # A reload is as slow as its slowest source
+        source = Residency.DISK if any(m.residency == Residency.DISK for m in pending) else Residency.HOST
+        start = time.perf_counter()
+        for managed in pending:
+            if managed.residency == Residency.HOST:
+                _to_device(managed.module, managed.device)
+            else:
+                managed.module = managed.load()
+            managed.residency = Residency.DEVICE
+        if any(m.device.type == "cuda" for m in pending):
+            torch.cuda.synchronize()
+        self.last_reload_ms = (time.perf_counter() - start) * 1000
+        self.last_reload_source = source
+        self.reloads[source] += 1
+        logger.info(
+            f"Reloaded {', '.join(m.name for m in pending)} from {source.value} "
+            f"in {self.last_reload_ms:.0f} ms"
+        )
+
+    def _offload(self, names: Optional[Iterable[str]] = None) -> None:
+        resident = [m for m in self._modules.values() if m.residency == Residency.DEVICE]
+        if names is not None:
+            names = set(names)
+            resident = [m for m in resident if m.name in names]
+        if not resident:
+            return
+        if self._on_offload is not None:
+            self._on_offload()
+        for managed in resident:
+            if self.keep_host_copy:
+                if managed.device.type != "cpu":
+                    _to_host(managed.module, pin=torch.cuda.is_available())
+                managed.residency = Residency.HOST
+            else:
+                managed.detach()
+                managed.module = None
+                managed.residency = Residency.DISK
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        self.offloads += 1
+        target = Residency.HOST if self.keep_host_copy else Residency.DISK
+        logger.info(f"Offloaded {', '.join(m.name for m in resident)} to {target.value}")
+
+    def _schedule_idle_unload(self) -> None:
+        if self.idle_unload_s is None:
+            return
+        if self.idle_unload_s <= 0:
+            self._offload()
+            return
+        self._timer = threading.Timer(self.idle_unload_s, self._idle_unload)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _idle_unload(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._busy == 0:
+                self._offload()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def get_status(self) -> dict:
+        with self._lock:
+            modules = {m.name: m.residency.value for m in self._modules.values()}
+            states = set(modules.values())
+            idle_for = None
+            if self._busy == 0 and self._last_used is not None:
+                idle_for = round(time.monotonic() - self._last_used, 1)
+            return {
+                "state": states.pop() if len(states) == 1 else "mixed",
+                "modules": modules,
+                "in_use": self._busy > 0,
+                "idle_for_s": idle_for,
+                "idle_unload_s": self.idle_unload_s,
+                "last_reload_ms": round(self.last_reload_ms, 1) if self.last_reload_ms is not None else None,
+                "last_reload_source": self.last_reload_source.value if self.last_reload_source else None,
+                "reloads_from_disk": self.reloads[Residency.DISK],
+                "reloads_from_host": self.reloads[Residency.HOST],
+                "offloads": self.offloads,
+            }
+
+
+def _to_host(module: torch.nn.Module, pin: bool) -> None:
+    """Copy parameters and buffers to host RAM in place; references stay valid.
+
+    Pinned copies let the trip back to the GPU run as a fast DMA transfer.
+    """
+    for tensor in itertools.chain(module.parameters(), module.buffers()):
+        host = torch.empty(tensor.shape, dtype=tensor.dtype, device="cpu", pin_memory=pin)
+        host.copy_(tensor.data)
+        tensor.data = host
+
+
+def _to_device(module: torch.nn.Module, device: torch.device) -> None:
+    for tensor in itertools.chain(module.parameters(), module.buffers()):
+        tensor.data = tensor.data.to(device, non_blocking=True)
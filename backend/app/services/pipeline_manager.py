@@ -1,14 +1,22 @@
 import asyncio
 import gc
 import logging
+import threading
 import torch
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, Protocol
 from enum import Enum
 from app.config import Settings
+from app.services.gpu_manager import GPUManager
+from app.services.model_residency import ModelResidency
+from app.utils.audio import DecodedAudio
+from app.utils.progress import ProgressSlot
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 48000  # HeartCodec output rate
+
 
 class ModelState(str, Enum):
     UNLOADED = "unloaded"
@@ -19,15 +27,102 @@ class ModelState(str, Enum):
     ERROR = "error"
 
 
+class AudioSink(Protocol):
+    """Receiver of audio decoded while a job is still generating."""
+
+    @property
+    def active(self) -> bool: ...
+
+    def write(self, audio: DecodedAudio) -> None: ...
+
+
+class _ChunkStreamer:
+    """Decodes each job's new frames every chunk_frames for its active sink.
+
+    Decoding is skipped until a sink becomes active, at which point all
+    frames produced so far are decoded in one go.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[torch.Tensor], DecodedAudio],
+        sinks: list[Optional[AudioSink]],
+        chunk_frames: int,
+    ):
+        self._decode = decode
+        self._sinks = sinks
+        self._chunk_frames = chunk_frames
+        self._frames: list[list[torch.Tensor]] = [[] for _ in sinks]
+        self._decoded = [0] * len(sinks)
+
+    def __call__(self, index: int, frames: list[torch.Tensor]) -> None:
+        self._frames[index] = frames
+        if len(frames) - self._decoded[index] >= self._chunk_frames:
+            self._flush(index)
+
+    def _flush(self, index: int) -> None:
+        sink = self._sinks[index]
+        frames = self._frames[index]
+        if sink is None or not sink.active or self._decoded[index] >= len(frames):
+            return
+        chunk = torch.stack(frames[self._decoded[index]:]).T
+        self._decoded[index] = len(frames)
+        sink.write(self._decode(chunk))
+
+    def flush_all(self) -> None:
+        for index in range(len(self._sinks)):
+            self._flush(index)
+
+
+# CPU "devices" (simulated multi-device runs) share torch's one CPU generator
+_CPU_RNG_LOCK = threading.Lock()
+
+
+@contextmanager
+def _seeded(seed: Optional[int], device: torch.device):
+    """Seed the generator one generation samples from, on its own device.
+
+    Sampling in HeartMuLa.generate_frame draws from the device's default
+    torch RNG; fork_rng restores the previous state afterwards so nothing
+    leaks. Only this device's CUDA generator is touched, so workers on other
+    GPUs keep sampling undisturbed; seeded CPU runs take turns instead.
+    """
+    if seed is None:
+        yield
+        return
+    if device.type == "cuda":
+        with torch.random.fork_rng(devices=[device.index]), torch.cuda.device(device):
+            torch.cuda.manual_seed(seed)
+            yield
+        return
+    with _CPU_RNG_LOCK, torch.random.fork_rng(devices=[]):
+        torch.manual_seed(seed)
+        yield
+
+
 class PipelineManager:
-    """Manages HeartMuLa pipeline lifecycle with real model support."""
+    """Manages HeartMuLa pipeline lifecycle with real model support.
+
+    Each instance is pinned to one device (cuda:N or cpu); multi-GPU hosts
+    run one per device, each with its own copy of the weights.
+    """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, device: Optional[str] = None):
         self.settings = settings
+        self.device = torch.device(device or ("cuda:0" if torch.cuda.is_available() else "cpu"))
+        if self.device.type == "cuda" and self.device.index is None:
+            self.device = torch.device("cuda", 0)
+        self._cuda = self.device.type == "cuda"
         self.state = ModelState.UNLOADED
         self._gen_pipeline = None
         self._transcriptor_pipeline = None
         self._model_path = Path(settings.model_path).resolve()
+        self._mula_max_seq_len: Optional[int] = None
+        self.residency: Optional[ModelResidency] = None
+
+    def _on_device(self):
+        """Make this pipeline's GPU the calling thread's current CUDA device."""
+        return torch.cuda.device(self.device) if self._cuda else nullcontext()
 
     def _models_present(self) -> bool:
         """Check if all required model files are downloaded."""
@@ -111,8 +206,8 @@ class PipelineManager:
                 from heartlib.heartmula.modeling_heartmula import HeartMuLa
                 from tokenizers import Tokenizer
 
-                device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-                dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+                device = self.device
+                dtype = torch.float16 if self._cuda else torch.float32
                 version = self.settings.model_version
 
                 mula_path, codec_path, tokenizer_path, gen_config_path = _resolve_paths(
@@ -141,37 +236,57 @@ class PipelineManager:
                 # The backbone defaults to max_seq_len=8192, but 60s audio
                 # = 750 frames + ~50 token prompt = ~800 tokens. Reducing to
                 # 1024 saves ~1.6GB of VRAM from KV cache allocation.
-                if torch.cuda.is_available():
-                    total_vram = torch.cuda.get_device_properties(0).total_memory / (1024**3)
+                if self._cuda:
+                    total_vram = torch.cuda.get_device_properties(device).total_memory / (1024**3)
                     if total_vram < 16 and lazy_load:
-                        reduced_seq_len = 1024
+                        self._mula_max_seq_len = 1024
                         logger.info(
                             f"VRAM {total_vram:.1f}GB < 16GB: pre-loading HeartMuLa "
-                            f"with max_seq_len={reduced_seq_len} (was 8192)"
+                            f"with max_seq_len={self._mula_max_seq_len} (was 8192)"
                         )
                         # Eagerly load HeartMuLa and reduce seq_len before any
                         # generation call can trigger setup_caches with 8192.
-                        from heartlib.heartmula.modeling_heartmula import HeartMuLa as _HeartMuLa
-                        mula = _HeartMuLa.from_pretrained(
-                            mula_path,
-                            device_map=mula_device,
-                            dtype=dtype,
-                        )
-                        mula.backbone.max_seq_len = reduced_seq_len
-                        pipeline._mula = mula
+                        self._load_mula(pipeline)
                         logger.info(
-                            f"HeartMuLa loaded: {torch.cuda.memory_allocated()/1024**3:.1f}GB VRAM"
+                            f"HeartMuLa loaded on {device}: "
+                            f"{torch.cuda.memory_allocated(device)/1024**3:.1f}GB VRAM"
                         )
 
-                return pipeline
+                # lazy_load=False keeps weights resident for good, as before;
+                # otherwise they are parked after the idle window
+                idle_unload_s = self.settings.model_idle_unload_s
+                if not lazy_load or idle_unload_s < 0:
+                    idle_unload_s = None
+                residency = ModelResidency(
+                    idle_unload_s=idle_unload_s,
+                    keep_host_copy=self.settings.model_host_cache,
+                    on_offload=self._cleanup_caches,
+                )
+                residency.register(
+                    "mula", mula_device,
+                    load=lambda: self._load_mula(pipeline),
+                    detach=lambda: setattr(pipeline, "_mula", None),
+                    module=pipeline._mula,
+                )
+                residency.register(
+                    "codec", codec_device,
+                    load=lambda: self._load_codec(pipeline),
+                    detach=lambda: setattr(pipeline, "_codec", None),
+                    module=getattr(pipeline, "_codec", None),
+                )
+                return pipeline, residency
+
+            def _load_on_device():
+                with self._on_device():
+                    return _load()
 
-            self._gen_pipeline = await asyncio.to_thread(_load)
+            self._gen_pipeline, self.residency = await asyncio.to_thread(_load_on_device)
 
             self.state = ModelState.READY
             if progress_callback:
                 await progress_callback(1.0, "Model ready")
             logger.info(
-                f"Generation pipeline ready (lazy_load={self.settings.lazy_load})"
+                f"Generation pipeline ready on {self.device} (lazy_load={self.settings.lazy_load})"
             )
 
         except Exception as e:
@@ -179,6 +294,19 @@ class PipelineManager:
             logger.error(f"Failed to load model: {e}")
             raise
 
+    def _load_mula(self, pipeline):
+        """Load HeartMuLa from its checkpoint (heartlib memory-maps the safetensors)."""
+        pipeline._mula = None
+        mula = pipeline.mula
+        if self._mula_max_seq_len is not None:
+            mula.backbone.max_seq_len = self._mula_max_seq_len
+        return mula
+
+    @staticmethod
+    def _load_codec(pipeline):
+        pipeline._codec = None
+        return pipeline.codec
+
     def _cleanup_caches(self) -> None:
         """Clean up KV caches after failed generation to prevent memory leaks."""
         if self._gen_pipeline is None or self._gen_pipeline._mula is None:
@@ -202,115 +330,283 @@ class PipelineManager:
         self,
         lyrics: str,
         tags: str,
-        save_path: Path,
         max_audio_length_ms: int = 240000,
         temperature: float = 1.0,
         topk: int = 50,
         cfg_scale: float = 1.5,
-    ) -> Path:
+        seed: Optional[int] = None,
+        progress_slot: Optional[ProgressSlot] = None,
+        audio_sink: Optional[AudioSink] = None,
+    ) -> DecodedAudio:
         """Run generation synchronously (called from a thread via asyncio.to_thread).
 
-        Uses the real HeartMuLa pipeline. Progress is tracked via
-        the ProgressHook tqdm monkey-patch installed by the caller.
+        A single job is a batch of one. Progress is written to progress_slot
+        for the caller to sample. Returns the decoded PCM; encoding to a file
+        is left to the caller so it can happen outside the GPU lock.
+        """
+        return self.generate_batch_sync(
+            requests=[{"lyrics": lyrics, "tags": tags, "max_audio_length_ms": max_audio_length_ms}],
+            temperature=temperature,
+            topk=topk,
+            cfg_scale=cfg_scale,
+            seed=seed,
+            progress_slots=[progress_slot],
+            audio_sinks=[audio_sink],
+        )[0]
+
+    def prompt_length(self, lyrics: str, tags: str) -> int:
+        """Tokens in the prompt built from lyrics and tags.
+
+        Only prompts of equal length can share a forward pass (see
+        _forward_batch), so the worker checks this before claiming jobs for
+        a batch. Tokenizing runs on the CPU and leaves the weights alone.
         """
         if self._gen_pipeline is None:
             raise RuntimeError(f"Model not ready (state: {self.state})")
+        inputs = self._gen_pipeline.preprocess({"lyrics": lyrics, "tags": tags}, cfg_scale=1.0)
+        return inputs["tokens"].shape[1]
+
+    def _decode(self, frames: torch.Tensor) -> DecodedAudio:
+        """Decode (codebooks, frames) tokens with HeartCodec."""
+        pipeline = self._gen_pipeline
+        wav = pipeline.codec.detokenize(frames.to(pipeline.codec_device))
+        # (channels, samples) → (samples, channels)
+        return DecodedAudio(
+            samples=wav.to(torch.float32).cpu().numpy().T,
+            sample_rate=SAMPLE_RATE,
+        )
+
+    def _forward_batch(
+        self,
+        model_inputs: list[dict],
+        max_audio_length_ms: list[int],
+        temperature: float,
+        topk: int,
+        cfg_scale: float,
+        frame_callback: Optional[Callable[[int, list[torch.Tensor]], None]] = None,
+        progress_slots: Optional[list[Optional[ProgressSlot]]] = None,
+    ) -> list[torch.Tensor]:
+        """Batched equivalent of HeartMuLaGenPipeline._forward.
+
+        Every prompt must have the same length: the backbone takes no padding
+        mask or per-row positions, so padded rows would attend to the padding
+        and sample at shifted positions. With CFG the rows are laid out as
+        [cond_1..cond_n, uncond_1..uncond_n], which is what
+        HeartMuLa.generate_frame splits on. Each job stops collecting frames at
+        its own EOS or length limit; the loop ends once every job is done.
+        frame_callback(job_index, frames_so_far) runs after each new frame and
+        each job's progress slot tracks its own frames against its own limit.
+        Returns one (codebooks, frames) tensor per job.
+        """
+        pipeline = self._gen_pipeline
+        device = pipeline.mula_device
+        n = len(model_inputs)
+        rows = 2 if cfg_scale != 1.0 else 1
+        prompt_len = model_inputs[0]["tokens"].shape[1]
+        if any(inputs["tokens"].shape[1] != prompt_len for inputs in model_inputs):
+            raise ValueError("Batched prompts must all have the same length")
+
+        tokens, masks, embeds, starts = [], [], [], []
+        for half in range(rows):
+            for inputs in model_inputs:
+                tokens.append(inputs["tokens"][half])
+                masks.append(inputs["tokens_mask"][half])
+                embeds.append(inputs["muq_embed"][half])
+                starts.append(inputs["muq_idx"][half])
+        prompt_pos = torch.arange(prompt_len, device=device).unsqueeze(0).repeat(n * rows, 1)
+
+        mula = pipeline.mula
+        mula.setup_caches(n * rows)
+        autocast = torch.autocast(device_type=device.type, dtype=pipeline.mula_dtype)
+        with autocast:
+            curr_token = mula.generate_frame(
+                tokens=torch.stack(tokens).to(device),
+                tokens_mask=torch.stack(masks).to(device),
+                input_pos=prompt_pos,
+                temperature=temperature,
+                topk=topk,
+                cfg_scale=cfg_scale,
+                continuous_segments=torch.stack(embeds).to(device),
+                starts=starts,
+            )
+
+        frames = [[curr_token[i]] for i in range(n)]
+        max_frames = [length // 80 for length in max_audio_length_ms]
+        done = [False] * n
+        eos_id = pipeline.config.audio_eos_id
+        empty_id = pipeline.config.empty_id
+
+        slots = progress_slots or [None] * n
+        for i in range(max(max_frames)):
+            # Audio codebooks + an empty text slot, with the text slot masked
+            padded = torch.full(
+                (curr_token.shape[0], curr_token.shape[1] + 1), empty_id,
+                device=curr_token.device, dtype=torch.long,
+            )
+            padded[:, :-1] = curr_token
+            padded = padded.unsqueeze(1)
+            padded_mask = torch.ones_like(padded, dtype=torch.bool)
+            padded_mask[..., -1] = False
+
+            with autocast:
+                curr_token = mula.generate_frame(
+                    tokens=padded,
+                    tokens_mask=padded_mask,
+                    input_pos=prompt_pos[..., -1:] + i + 1,
+                    temperature=temperature,
+                    topk=topk,
+                    cfg_scale=cfg_scale,
+                    continuous_segments=None,
+                    starts=None,
+                )
 
-        save_path.parent.mkdir(parents=True, exist_ok=True)
+            hit_eos = (curr_token[:n] >= eos_id).any(dim=-1).tolist()
+            for j in range(n):
+                if done[j]:
+                    continue
+                if hit_eos[j] or len(frames[j]) > max_frames[j]:
+                    done[j] = True
+                    continue
+                frames[j].append(curr_token[j])
+                if slots[j] is not None:
+                    slots[j].update(len(frames[j]) - 1, max_frames[j])
+                if frame_callback is not None:
+                    frame_callback(j, frames[j])
+            if all(done):
+                break
+
+        return [torch.stack(job_frames).T for job_frames in frames]
+
+    def generate_batch_sync(
+        self,
+        requests: list[dict],
+        temperature: float = 1.0,
+        topk: int = 50,
+        cfg_scale: float = 1.5,
+        seed: Optional[int] = None,
+        progress_slots: Optional[list[Optional[ProgressSlot]]] = None,
+        audio_sinks: Optional[list[Optional[AudioSink]]] = None,
+    ) -> list[DecodedAudio]:
+        """Generate several compatible requests in one batched forward pass.
+
+        Each request dict carries lyrics, tags and max_audio_length_ms; the
+        sampling parameters are shared by the whole batch, and every prompt
+        must tokenize to the same length (see prompt_length), so each row
+        computes exactly what it would alone. All rows draw from one RNG
+        stream seeded with seed, so a batched job's output depends on its
+        batch and is not reproducible from its own seed alone.
+
+        audio_sinks optionally holds one sink per request; active sinks get
+        audio decoded every stream_chunk_frames frames while generating.
+        """
+        if self._gen_pipeline is None:
+            raise RuntimeError(f"Model not ready (state: {self.state})")
 
-        # Clean up any stale caches from previous failed generations
         self._cleanup_caches()
 
-        logger.info(f"Generating audio → {save_path} (cfg_scale={cfg_scale})")
+        logger.info(f"Generating {len(requests)} job(s) (cfg_scale={cfg_scale}, seed={seed})")
+        streamer = None
+        if audio_sinks and any(audio_sinks) and self.settings.stream_chunk_frames > 0:
+            streamer = _ChunkStreamer(self._decode, audio_sinks, self.settings.stream_chunk_frames)
         try:
-            # Run pipeline stages manually so we control saving
-            # (torchaudio.save in PyTorch 2.10+ requires torchcodec/FFmpeg libs)
-            pipeline = self._gen_pipeline
-            preprocess_kwargs, forward_kwargs, postprocess_kwargs = (
-                pipeline._sanitize_parameters(
-                    max_audio_length_ms=max_audio_length_ms,
+            # Held for the whole run; weights are parked once the queue goes idle
+            with self._on_device(), self.residency.hold():
+                pipeline = self._gen_pipeline
+                preprocess_kwargs, _, _ = pipeline._sanitize_parameters(
+                    max_audio_length_ms=max(r["max_audio_length_ms"] for r in requests),
                     temperature=temperature,
                     topk=topk,
                     cfg_scale=cfg_scale,
-                    save_path=str(save_path),
                 )
-            )
-            model_inputs = pipeline.preprocess(
-                {"lyrics": lyrics, "tags": tags}, **preprocess_kwargs
-            )
-            model_outputs = pipeline._forward(model_inputs, **forward_kwargs)
-
-            # Decode audio frames with codec
-            frames = model_outputs["frames"].to(pipeline.codec_device)
-            wav = pipeline.codec.detokenize(frames)
-            pipeline._unload()
-
-            # Save using soundfile → WAV, then convert to MP3 via ffmpeg
-            import soundfile as sf
-            import subprocess
-            wav_np = wav.to(torch.float32).cpu().numpy().T  # (channels, samples) → (samples, channels)
-            wav_path = str(save_path).replace(".mp3", ".wav")
-            sf.write(wav_path, wav_np, 48000)
-            # Convert WAV → MP3 using system ffmpeg
-            subprocess.run(
-                ["ffmpeg", "-y", "-i", wav_path, "-b:a", "192k", str(save_path)],
-                capture_output=True, check=True,
-            )
-            Path(wav_path).unlink(missing_ok=True)  # Clean up temp WAV
-            logger.info(f"Saved audio → {save_path}")
+                model_inputs = [
+                    pipeline.preprocess(
+                        {"lyrics": r["lyrics"], "tags": r["tags"]}, **preprocess_kwargs
+                    )
+                    for r in requests
+                ]
+                with _seeded(seed, self.device):
+                    frames = self._forward_batch(
+                        model_inputs,
+                        max_audio_length_ms=[r["max_audio_length_ms"] for r in requests],
+                        temperature=temperature,
+                        topk=topk,
+                        cfg_scale=cfg_scale,
+                        frame_callback=streamer,
+                        progress_slots=progress_slots,
+                    )
+                if streamer is not None:
+                    streamer.flush_all()
+                audios = [self._decode(job_frames) for job_frames in frames]
 
         except torch.cuda.OutOfMemoryError:
-            # Clean up and re-raise with helpful message
             self._cleanup_caches()
+            if len(requests) > 1:
+                raise RuntimeError(
+                    f"GPU out of memory during batched generation of {len(requests)} jobs. "
+                    f"Try lowering HEARTMULA_MAX_BATCH_SIZE or raising HEARTMULA_BATCH_VRAM_PER_JOB_GB."
+                )
             raise RuntimeError(
                 f"GPU out of memory during generation. "
                 f"Try reducing max_length_ms or using cfg_scale=1.0."
             )
 
-        logger.info(f"Generation complete → {save_path}")
-        return save_path
+        logger.info(f"Generation complete ({', '.join(f'{a.duration_ms} ms' for a in audios)} decoded)")
+        return audios
 
     async def generate(
         self,
         lyrics: str,
         tags: str,
-        save_path: Path,
         max_audio_length_ms: int = 240000,
         temperature: float = 1.0,
         topk: int = 50,
         cfg_scale: float = 1.5,
-        progress_callback: Optional[Callable[[int, int], None]] = None,
-    ) -> Path:
-        """Run generation asynchronously with tqdm-based progress tracking."""
+        seed: Optional[int] = None,
+        progress_slot: Optional[ProgressSlot] = None,
+        audio_sink: Optional[AudioSink] = None,
+    ) -> DecodedAudio:
+        """Run generation asynchronously in a worker thread."""
+        audios = await self.generate_batch(
+            requests=[{"lyrics": lyrics, "tags": tags, "max_audio_length_ms": max_audio_length_ms}],
+            temperature=temperature,
+            topk=topk,
+            cfg_scale=cfg_scale,
+            seed=seed,
+            progress_slots=[progress_slot],
+            audio_sinks=[audio_sink],
+        )
+        return audios[0]
+
+    async def generate_batch(
+        self,
+        requests: list[dict],
+        temperature: float = 1.0,
+        topk: int = 50,
+        cfg_scale: float = 1.5,
+        seed: Optional[int] = None,
+        progress_slots: Optional[list[Optional[ProgressSlot]]] = None,
+        audio_sinks: Optional[list[Optional[AudioSink]]] = None,
+    ) -> list[DecodedAudio]:
+        """Run batched generation asynchronously in a worker thread."""
         if self._gen_pipeline is None:
             raise RuntimeError(f"Model not ready (state: {self.state})")
 
         self.state = ModelState.GENERATING
-
-        from app.utils.progress_hook import ProgressHook
-
-        # Wrap the sync callback so it can be called from the generation thread
-        hook_callback = progress_callback if progress_callback else lambda s, t: None
-        hook = ProgressHook(hook_callback)
-
         try:
-            def _run():
-                with hook:
-                    self.generate_sync(
-                        lyrics=lyrics,
-                        tags=tags,
-                        save_path=save_path,
-                        max_audio_length_ms=max_audio_length_ms,
-                        temperature=temperature,
-                        topk=topk,
-                        cfg_scale=cfg_scale,
-                    )
-
-            await asyncio.to_thread(_run)
+            audios = await asyncio.to_thread(
+                self.generate_batch_sync,
+                requests=requests,
+                temperature=temperature,
+                topk=topk,
+                cfg_scale=cfg_scale,
+                seed=seed,
+                progress_slots=progress_slots,
+                audio_sinks=audio_sinks,
+            )
         finally:
             self.state = ModelState.READY
 
-        return save_path
+        return audios
 
     async def load_transcriptor(self) -> None:
         """Load the transcription pipeline (Whisper-based)."""
@@ -327,34 +623,100 @@ class PipelineManager:
         def _load():
             from heartlib import HeartTranscriptorPipeline
 
-            device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-            dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+            dtype = torch.float16 if self._cuda else torch.float32
             return HeartTranscriptorPipeline.from_pretrained(
                 pretrained_path=str(self._model_path),
-                device=device,
+                device=self.device,
                 dtype=dtype,
             )
 
         self._transcriptor_pipeline = await asyncio.to_thread(_load)
         logger.info("Transcription pipeline loaded")
 
-    async def transcribe(self, audio_path: Path) -> str:
-        """Transcribe audio to lyrics using HeartTranscriptor."""
+    async def transcribe_batch(self, audio_paths: list[Path]) -> list[str | Exception]:
+        """Transcribe several files to lyrics in batched HeartTranscriptor passes.
+
+        Returns one entry per path: the text, or the exception that file
+        raised. A failing batch is retried file by file so one bad upload
+        does not fail the others.
+        """
         if self._transcriptor_pipeline is None:
             await self.load_transcriptor()
-
-        def _run():
-            result = self._transcriptor_pipeline(str(audio_path))
-            return result["text"]
-
-        text = await asyncio.to_thread(_run)
-        return text
+        transcriptor = self._transcriptor_pipeline
+        inputs = [str(p) for p in audio_paths]
+
+        def _run() -> list[str | Exception]:
+            try:
+                # The Whisper pipeline pads the files' 30s chunks into shared forward passes
+                results = transcriptor(inputs, batch_size=len(inputs))
+                return [r["text"] for r in results]
+            except Exception as e:
+                if len(inputs) == 1:
+                    return [e]
+                logger.warning(f"Batched transcription failed ({e}); retrying files one by one")
+            texts: list[str | Exception] = []
+            for path in inputs:
+                try:
+                    texts.append(transcriptor(path)["text"])
+                except Exception as e:
+                    texts.append(e)
+            return texts
+
+        return await asyncio.to_thread(_run)
 
     def get_state(self) -> str:
         return self.state.value
 
+    def get_residency(self) -> Optional[dict]:
+        return self.residency.get_status() if self.residency is not None else None
+
+    def offload_module(self, name: str) -> None:
+        """Move one generation module ("mula" or "codec") off the GPU until next use."""
+        if self.residency is not None:
+            self.residency.offload([name])
+
+    def module_on_device(self, name: str) -> bool:
+        return self.residency is not None and self.residency.is_on_device(name)
+
+    def register_gpu_models(self, gpu: GPUManager, transcriptor: bool = True) -> None:
+        """Let the GPU scheduler evict our models when other work needs the VRAM.
+
+        Only the device that serves transcription registers the transcriptor.
+        """
+        s = self.settings
+        gpu.register_model(
+            "generation", s.vram_generation_gb,
+            evict=lambda: self.offload_module("mula"),
+            is_loaded=lambda: self.module_on_device("mula"),
+        )
+        gpu.register_model(
+            "codec", s.vram_codec_gb,
+            evict=lambda: self.offload_module("codec"),
+            is_loaded=lambda: self.module_on_device("codec"),
+        )
+        if not transcriptor:
+            return
+        gpu.register_model(
+            "transcriptor", s.vram_transcriptor_gb,
+            evict=self.unload_transcriptor,
+            is_loaded=lambda: self._transcriptor_pipeline is not None,
+        )
+
+    def unload_transcriptor(self) -> None:
+        """Drop the transcriptor; the next transcription loads it again."""
+        if self._transcriptor_pipeline is None:
+            return
+        self._transcriptor_pipeline = None
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info("Transcription pipeline unloaded")
+
     async def unload(self) -> None:
         """Unload all models from GPU."""
+        if self.residency is not None:
+            self.residency.close()
+            self.residency = None
         if self._gen_pipeline is not None:
             del self._gen_pipeline
             self._gen_pipeline = None
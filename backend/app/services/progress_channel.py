@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Optional
+from app.services.event_broadcaster import EventBroadcaster
+from app.utils.progress import ProgressSlot
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressChannel:
+    """Samples per-job ProgressSlots and broadcasts job:progress at a fixed rate.
+
+    However many steps a generation takes, each job produces at most one
+    progress event per interval, and only when its value has changed.
+    """
+
+    def __init__(self, broadcaster: EventBroadcaster, interval_s: float = 0.25):
+        self.broadcaster = broadcaster
+        self.interval_s = interval_s
+        self._slots: dict[str, ProgressSlot] = {}
+        self._sent: dict[str, tuple[int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def open(self, job_id: str) -> ProgressSlot:
+        slot = self._slots.setdefault(job_id, ProgressSlot())
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sample_loop())
+        return slot
+
+    def close(self, job_id: str) -> None:
+        self._slots.pop(job_id, None)
+        self._sent.pop(job_id, None)
+
+    async def _sample_loop(self) -> None:
+        while self._slots:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await self._sample()
+            except Exception as e:
+                logger.warning(f"Progress sampling failed: {e}")
+
+    async def _sample(self) -> None:
+        for job_id, slot in list(self._slots.items()):
+            value = slot.value
+            if value is None or value == self._sent.get(job_id):
+                continue
+            self._sent[job_id] = value
+            step, total = value
+            await self.broadcaster.broadcast("job:progress", {
+                "job_id": job_id,
+                "step": step,
+                "total_steps": total,
+                "progress": step / total if total > 0 else 0,
+            })
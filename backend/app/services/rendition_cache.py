@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Collection
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import Settings
+from app.models.rendition import Rendition
+from app.services.storage_service import StorageService
+from app.utils.audio import transcode_audio
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenditionFormat:
+    suffix: str
+    media_type: str
+    codec: str
+    default_bitrate: str
+
+
+RENDITION_FORMATS = {
+    "mp3": RenditionFormat(".mp3", "audio/mpeg", "libmp3lame", "192k"),
+    "opus": RenditionFormat(".opus", "audio/ogg", "libopus", "96k"),
+    "aac": RenditionFormat(".m4a", "audio/mp4", "aac", "160k"),
+}
+BITRATES = ("32k", "48k", "64k", "96k", "128k", "160k", "192k", "256k", "320k")
+
+
+class RenditionCache:
+    """Lossy renditions of track masters, transcoded on first request.
+
+    Renditions are encoded in their own worker pool and kept under
+    rendition_dir, least recently used first out once they pass
+    rendition_cache_max_mb. Concurrent requests for the same rendition share
+    one transcode.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, storage: StorageService, settings: Settings):
+        self._session_factory = session_factory
+        self.storage = storage
+        self.rendition_dir = Path(settings.rendition_dir)
+        self.max_bytes = settings.rendition_cache_max_mb * 1024 * 1024
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.rendition_workers), thread_name_prefix="transcode"
+        )
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.rendition_dir.mkdir(parents=True, exist_ok=True)
+
+    async def get(self, track_id: str, master: Path, fmt: str, bitrate: str) -> Path:
+        """Path of the track's rendition, transcoding it first if needed.
+
+        Raises RuntimeError if transcoding fails.
+        """
+        key = f"{track_id}:{fmt}:{bitrate}"
+        async with self._session_factory() as db:
+            entry = await db.get(Rendition, key)
+            if entry is not None:
+                if Path(entry.path).exists():
+                    entry.last_used_at = datetime.utcnow()
+                    await db.commit()
+                    return Path(entry.path)
+                await db.delete(entry)
+                await db.commit()
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._render(key, track_id, master, fmt, bitrate))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A client hanging up must not cancel the transcode others may be waiting on
+        return await asyncio.shield(future)
+
+    async def _render(self, key: str, track_id: str, master: Path, fmt: str, bitrate: str) -> Path:
+        spec = RENDITION_FORMATS[fmt]
+        path = self.rendition_dir / track_id[:2] / f"{track_id}-{bitrate}{spec.suffix}"
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool, transcode_audio, master, path, spec.codec, bitrate)
+        size = self.storage.get_file_size(path) or 0
+
+        async with self._session_factory() as db:
+            entry = await db.get(Rendition, key)
+            if entry is None:
+                db.add(Rendition(key=key, track_id=track_id, format=fmt, bitrate=bitrate, path=str(path), size_bytes=size))
+            else:
+                entry.path = str(path)
+                entry.size_bytes = size
+                entry.last_used_at = datetime.utcnow()
+            await db.commit()
+        logger.info(f"Rendered {key} ({size / 1024:.0f} KB)")
+
+        # Whoever asked for this one is about to serve it
+        await self.evict(keep=(key,))
+        return path
+
+    async def evict(self, keep: Collection[str] = ()) -> int:
+        """Drop least recently used renditions until the total fits max_bytes.
+
+        Renditions in keep and those still being transcoded are never
+        dropped, so the total may stay above max_bytes until the next call.
+        """
+        spared = {*keep, *self._inflight}
+        evicted: list[Rendition] = []
+        async with self._session_factory() as db:
+            total = (await db.execute(
+                select(func.coalesce(func.sum(Rendition.size_bytes), 0))
+            )).scalar()
+            if total > self.max_bytes:
+                result = await db.execute(select(Rendition).order_by(Rendition.last_used_at.asc()))
+                for entry in result.scalars():
+                    if total <= self.max_bytes:
+                        break
+                    if entry.key in spared:
+                        continue
+                    evicted.append(entry)
+                    total -= entry.size_bytes
+                await db.execute(delete(Rendition).where(Rendition.key.in_([e.key for e in evicted])))
+                await db.commit()
+
+        for entry in evicted:
+            await self.storage.delete_file(Path(entry.path))
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} renditions")
+        return len(evicted)
+
+    async def drop_track(self, track_id: str) -> None:
+        """Delete a track's renditions (files and rows)."""
+        async with self._session_factory() as db:
+            result = await db.execute(select(Rendition).where(Rendition.track_id == track_id))
+            entries = list(result.scalars().all())
+            await db.execute(delete(Rendition).where(Rendition.track_id == track_id))
+            await db.commit()
+        for entry in entries:
+            await self.storage.delete_file(Path(entry.path))
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
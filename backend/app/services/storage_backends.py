@@ -0,0 +1,214 @@
+import asyncio
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from app.config import Settings
+from app.utils.audio_response import IMMUTABLE
+
+STREAM_CHUNK_BYTES = 256 * 1024
+
+
+def output_key(output_path: str | Path) -> str:
+    """Backend-neutral name of an output file: "YYYY-MM-DD/<job_id>.<ext>".
+
+    Track.output_path holds the local path; the key is its last two parts,
+    so it stays the same whichever backend holds the file.
+    """
+    return "/".join(Path(output_path).parts[-2:])
+
+
+class ObjectStream:
+    """An open object, or a byte range of one, read in chunks off the event loop."""
+
+    def __init__(self, body, size: int, total: int, content_range: Optional[str], etag: Optional[str]):
+        self._body = body
+        self.size = size  # Bytes in this response
+        self.total = total  # Bytes in the whole object
+        self.content_range = content_range  # None for the whole object
+        self.etag = etag
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            while chunk := await asyncio.to_thread(self._body.read, STREAM_CHUNK_BYTES):
+                yield chunk
+        finally:
+            self._body.close()
+
+
+class StorageBackend(ABC):
+    """Where finished outputs live for serving, addressed by output_key.
+
+    Generation always writes to the local output_dir first; a remote backend
+    receives a copy once the files are complete.
+    """
+
+    name: str
+    remote: bool
+
+    @abstractmethod
+    async def upload(self, key: str, src: Path, content_type: str) -> None: ...
+
+    @abstractmethod
+    async def download(self, key: str, dest: Path) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Size in bytes, or None if the key does not exist."""
+
+
+class LocalBackend(StorageBackend):
+    name = "local"
+    remote = False
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key
+
+    async def upload(self, key: str, src: Path, content_type: str) -> None:
+        dest = self.path_for(key)
+        if dest != src:
+            await asyncio.to_thread(_copy_atomic, src, dest)
+
+    async def download(self, key: str, dest: Path) -> None:
+        src = self.path_for(key)
+        if dest != src:
+            await asyncio.to_thread(_copy_atomic, src, dest)
+
+    async def delete(self, key: str) -> None:
+        self.path_for(key).unlink(missing_ok=True)
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return self.path_for(key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+
+class S3Backend(StorageBackend):
+    """Any S3-compatible object store (AWS, MinIO, R2, a moto server, ...).
+
+    Uploads go through boto3's transfer manager, which streams the file from
+    disk in s3_multipart_chunk_mb parts instead of reading it into memory.
+    Credentials come from the usual AWS_* environment / config files.
+    """
+
+    name = "s3"
+    remote = True
+
+    def __init__(self, settings: Settings):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+        except ImportError as e:
+            raise RuntimeError(
+                "HEARTMULA_STORAGE_BACKEND=s3 needs boto3 (uv sync --extra s3)"
+            ) from e
+        if not settings.s3_bucket:
+            raise RuntimeError("HEARTMULA_STORAGE_BACKEND=s3 needs HEARTMULA_S3_BUCKET")
+        self.bucket = settings.s3_bucket
+        self.prefix = settings.s3_prefix
+        self.presign_ttl_s = settings.s3_presign_ttl_s
+        self._client = boto3.client(
+            "s3", endpoint_url=settings.s3_endpoint_url or None, region_name=settings.s3_region or None,
+        )
+        chunk = settings.s3_multipart_chunk_mb * 1024 * 1024
+        self._transfer = TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk)
+
+    def _object(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def upload(self, key: str, src: Path, content_type: str) -> None:
+        await asyncio.to_thread(
+            self._client.upload_file, str(src), self.bucket, self._object(key),
+            ExtraArgs={"ContentType": content_type, "CacheControl": IMMUTABLE},
+            Config=self._transfer,
+        )
+
+    async def download(self, key: str, dest: Path) -> None:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        partial = _partial_path(dest)
+        try:
+            await asyncio.to_thread(
+                self._client.download_file, self.bucket, self._object(key), str(partial), Config=self._transfer,
+            )
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        partial.replace(dest)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=self._object(key))
+
+    async def size(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+        try:
+            head = await asyncio.to_thread(self._client.head_object, Bucket=self.bucket, Key=self._object(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return head["ContentLength"]
+
+    def presigned_url(self, key: str) -> str:
+        return self._client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._object(key)}, ExpiresIn=self.presign_ttl_s,
+        )
+
+    async def open(self, key: str, byte_range: Optional[str] = None) -> Optional[ObjectStream]:
+        """Open an object (or the Range header's byte range of it) for proxying; None if missing.
+
+        Raises ValueError for a range the object can't satisfy.
+        """
+        from botocore.exceptions import ClientError
+        params = {"Bucket": self.bucket, "Key": self._object(key)}
+        if byte_range:
+            params["Range"] = byte_range
+        try:
+            obj = await asyncio.to_thread(self._client.get_object, **params)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return None
+            if code == "InvalidRange":
+                raise ValueError(f"Range not satisfiable: {byte_range}") from e
+            raise
+        content_range = obj.get("ContentRange")
+        total = int(content_range.rsplit("/", 1)[1]) if content_range else obj["ContentLength"]
+        return ObjectStream(obj["Body"], obj["ContentLength"], total, content_range, obj.get("ETag"))
+
+
+BACKENDS = ("local", "s3")
+
+
+def make_backend(settings: Settings, name: Optional[str] = None) -> StorageBackend:
+    """The backend named by settings.storage_backend (or name). Raises RuntimeError if unusable."""
+    name = name or settings.storage_backend
+    if name == "local":
+        return LocalBackend(Path(settings.output_dir))
+    if name == "s3":
+        return S3Backend(settings)
+    raise RuntimeError(f"Unknown storage backend {name!r}. Allowed: {list(BACKENDS)}")
+
+
+def _partial_path(dest: Path) -> Path:
+    # Unique per write, so concurrent writers of one dest never share a temp file
+    return dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:12]}.part")
+
+
+def _copy_atomic(src: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    partial = _partial_path(dest)
+    try:
+        shutil.copyfile(src, partial)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, dest)
@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import Settings
+from app.models.job import GenerationJob
+from app.models.rendition import Rendition
+from app.models.track import Track
+from app.models.transcription import TranscriptionJob
+from app.services.storage_service import StorageService
+from app.utils.peaks import peaks_path
+
+logger = logging.getLogger(__name__)
+
+# Left behind by interrupted writes (uploads, peaks files)
+TEMP_SUFFIXES = (".part", ".tmp")
+ACTIVE = ("pending", "processing")
+BATCH_SIZE = 200  # Files stat'ed and looked up per DB query
+START_DELAY_S = 60  # Let startup and recovery finish before the first pass
+
+
+@dataclass
+class DirUsage:
+    files: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class ReconcileStats:
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    files_scanned: int = 0
+    orphans_removed: int = 0
+    temp_removed: int = 0
+    bytes_freed: int = 0
+    dirs_removed: int = 0
+    missing_outputs: int = 0  # Tracks whose audio file is gone
+    errors: int = 0
+    outputs_by_date: dict[str, DirUsage] = field(default_factory=dict)  # After cleanup
+    uploads: DirUsage = field(default_factory=DirUsage)
+    renditions: DirUsage = field(default_factory=DirUsage)
+
+
+@dataclass
+class _Entry:
+    path: Path
+    size: int
+    mtime: float
+
+
+class StorageReconciler:
+    """Background pass that brings output, upload and rendition dirs back in line with the DB.
+
+    Outputs (audio and peaks) no Track refers to, uploads no pending
+    transcription refers to, renditions with no renditions row, and temp
+    files from interrupted writes are removed; files younger than
+    reconcile_grace_s are always left alone, since the row for them may not
+    exist yet. Directories are walked one batch at a time at no more than
+    reconcile_files_per_s, so a pass over a large library spreads out
+    instead of competing with audio serving for the disk.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, storage: StorageService, settings: Settings):
+        self._session_factory = session_factory
+        self.storage = storage
+        self.rendition_dir = Path(settings.rendition_dir)
+        self.interval_s = settings.reconcile_interval_s
+        self.grace_s = settings.reconcile_grace_s
+        self.files_per_s = max(1, settings.reconcile_files_per_s)
+        self.last_run: Optional[ReconcileStats] = None
+        self.running = False
+        self._budget_at = 0.0
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.interval_s <= 0:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(f"Storage reconciler started (every {self.interval_s}s)")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_loop(self) -> None:
+        delay = min(START_DELAY_S, self.interval_s)
+        while not await self._stopped_within(delay):
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Storage reconcile failed: {e}")
+            delay = self.interval_s
+
+    async def _stopped_within(self, seconds: float) -> bool:
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def run_once(self) -> ReconcileStats:
+        """One full pass over outputs, uploads and renditions."""
+        stats = ReconcileStats(started_at=datetime.utcnow())
+        self.running = True
+        try:
+            seen = await self._reconcile_outputs(stats)
+            if not self.storage.backend.remote:
+                # With a remote backend the local copy may have been moved away
+                await self._count_missing(stats, seen)
+            await self._reconcile_uploads(stats)
+            await self._reconcile_renditions(stats)
+        finally:
+            self.running = False
+        stats.finished_at = datetime.utcnow()
+        self.last_run = stats
+        logger.info(
+            f"Storage reconcile: {stats.files_scanned} files, {stats.orphans_removed} orphans and "
+            f"{stats.temp_removed} temp files removed ({stats.bytes_freed / (1024 * 1024):.1f} MB), "
+            f"{stats.missing_outputs} tracks missing audio"
+        )
+        return stats
+
+    async def _reconcile_outputs(self, stats: ReconcileStats) -> set[str]:
+        """Clean each date directory; returns every audio path found, for _count_missing."""
+        seen: set[str] = set()
+        today = date.today().isoformat()
+        for directory in await asyncio.to_thread(_subdirectories, self.storage.output_dir):
+            usage = stats.outputs_by_date.setdefault(directory.name, DirUsage())
+            names = await asyncio.to_thread(_file_names, directory)
+            for start in range(0, len(names), BATCH_SIZE):
+                batch = names[start:start + BATCH_SIZE]
+                entries = await asyncio.to_thread(_stat_all, [directory / name for name in batch])
+                keep, active = await self._referenced_outputs({name.split(".", 1)[0] for name in batch})
+                doomed = []
+                for entry in entries:
+                    key = _key(entry.path)
+                    if entry.path.suffix not in TEMP_SUFFIXES and entry.path.suffix != ".peaks":
+                        seen.add(key)
+                    if self._is_young(entry) or key in keep or entry.path.name.split(".", 1)[0] in active:
+                        usage.files += 1
+                        usage.bytes += entry.size
+                    else:
+                        doomed.append(entry)
+                await self._remove(doomed, stats)
+                stats.files_scanned += len(entries)
+                await self._pace(len(batch))
+
+            if directory.name != today and await asyncio.to_thread(_remove_if_empty, directory):
+                stats.dirs_removed += 1
+                del stats.outputs_by_date[directory.name]
+        return seen
+
+    async def _referenced_outputs(self, job_ids: set[str]) -> tuple[set[str], set[str]]:
+        """(output and peaks paths of these jobs' tracks, ids of these jobs still in flight)."""
+        async with self._session_factory() as db:
+            result = await db.execute(select(Track.output_path).where(Track.job_id.in_(job_ids)))
+            keep = set()
+            for output_path in result.scalars():
+                keep.add(_key(Path(output_path)))
+                keep.add(_key(peaks_path(Path(output_path))))
+            result = await db.execute(
+                select(GenerationJob.id).where(GenerationJob.id.in_(job_ids), GenerationJob.status.in_(ACTIVE))
+            )
+            return keep, set(result.scalars())
+
+    async def _count_missing(self, stats: ReconcileStats, seen: set[str]) -> None:
+        """Count tracks (older than this pass) whose audio file the walk did not find."""
+        after = ""
+        while True:
+            async with self._session_factory() as db:
+                result = await db.execute(
+                    select(Track.id, Track.output_path)
+                    .where(Track.id > after, Track.created_at < stats.started_at)
+                    .order_by(Track.id)
+                    .limit(1000)
+                )
+                rows = result.all()
+            if not rows:
+                return
+            for track_id, output_path in rows:
+                if _key(Path(output_path)) not in seen:
+                    stats.missing_outputs += 1
+                    logger.warning(f"Track {track_id} has no audio file at {output_path}")
+            after = rows[-1][0]
+
+    async def _reconcile_uploads(self, stats: ReconcileStats) -> None:
+        upload_dir = self.storage.upload_dir
+        names = await asyncio.to_thread(_file_names, upload_dir)
+        for start in range(0, len(names), BATCH_SIZE):
+            entries = await asyncio.to_thread(_stat_all, [upload_dir / name for name in names[start:start + BATCH_SIZE]])
+            async with self._session_factory() as db:
+                result = await db.execute(
+                    select(TranscriptionJob.audio_path).where(
+                        TranscriptionJob.audio_path.in_([str(e.path) for e in entries]),
+                        TranscriptionJob.status.in_(ACTIVE),
+                    )
+                )
+                queued = {_key(Path(p)) for p in result.scalars()}
+            doomed = []
+            for entry in entries:
+                if self._is_young(entry) or _key(entry.path) in queued:
+                    stats.uploads.files += 1
+                    stats.uploads.bytes += entry.size
+                else:
+                    doomed.append(entry)
+            await self._remove(doomed, stats)
+            stats.files_scanned += len(entries)
+            await self._pace(len(entries))
+
+    async def _reconcile_renditions(self, stats: ReconcileStats) -> None:
+        """Remove rendition files no renditions row refers to (e.g. rows cascaded away with their track)."""
+        for directory in await asyncio.to_thread(_subdirectories, self.rendition_dir):
+            names = await asyncio.to_thread(_file_names, directory)
+            for start in range(0, len(names), BATCH_SIZE):
+                entries = await asyncio.to_thread(_stat_all, [directory / name for name in names[start:start + BATCH_SIZE]])
+                async with self._session_factory() as db:
+                    result = await db.execute(
+                        select(Rendition.path).where(Rendition.path.in_([str(e.path) for e in entries]))
+                    )
+                    cached = {_key(Path(p)) for p in result.scalars()}
+                doomed = []
+                for entry in entries:
+                    if self._is_young(entry) or _key(entry.path) in cached:
+                        stats.renditions.files += 1
+                        stats.renditions.bytes += entry.size
+                    else:
+                        doomed.append(entry)
+                await self._remove(doomed, stats)
+                stats.files_scanned += len(entries)
+                await self._pace(len(entries))
+            if await asyncio.to_thread(_remove_if_empty, directory):
+                stats.dirs_removed += 1
+
+    def _is_young(self, entry: _Entry) -> bool:
+        return time.time() - entry.mtime < self.grace_s
+
+    async def _remove(self, entries: list[_Entry], stats: ReconcileStats) -> None:
+        if not entries:
+            return
+        removed = await asyncio.to_thread(_unlink_all, [e.path for e in entries])
+        for entry in entries:
+            if entry.path not in removed:
+                stats.errors += 1
+                continue
+            stats.bytes_freed += entry.size
+            if entry.path.suffix in TEMP_SUFFIXES:
+                stats.temp_removed += 1
+            else:
+                stats.orphans_removed += 1
+                logger.info(f"Removed orphaned {entry.path}")
+
+    async def _pace(self, files: int) -> None:
+        """Sleep as needed to hold the pass to files_per_s."""
+        now = time.monotonic()
+        self._budget_at = max(self._budget_at, now) + files / self.files_per_s
+        if self._budget_at > now:
+            await asyncio.sleep(self._budget_at - now)
+
+
+def _key(path: Path) -> str:
+    # Paths in the DB and from the walk may differ in form (relative, ./)
+    return os.path.abspath(path)
+
+
+def _subdirectories(root: Path) -> list[Path]:
+    try:
+        with os.scandir(root) as it:
+            return sorted(Path(e.path) for e in it if e.is_dir(follow_symlinks=False))
+    except FileNotFoundError:
+        return []
+
+
+def _file_names(directory: Path) -> list[str]:
+    try:
+        with os.scandir(directory) as it:
+            return sorted(e.name for e in it if e.is_file(follow_symlinks=False))
+    except FileNotFoundError:
+        return []
+
+
+def _stat_all(paths: list[Path]) -> list[_Entry]:
+    entries = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue  # Deleted since the listing
+        entries.append(_Entry(path, st.st_size, st.st_mtime))
+    return entries
+
+
+def _unlink_all(paths: list[Path]) -> set[Path]:
+    removed = set()
+    for path in paths:
+        try:
+            path.unlink()
+            removed.add(path)
+        except FileNotFoundError:
+            removed.add(path)
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+    return removed
+
+
+def _remove_if_empty(directory: Path) -> bool:
+    try:
+        directory.rmdir()
+        return True
+    except OSError:
+        return False
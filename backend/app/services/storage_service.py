@@ -1,37 +1,128 @@
+import asyncio
+import hashlib
 import os
 import uuid
+from concurrent.futures import Executor
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import date
+from typing import BinaryIO, Optional
 from fastapi import UploadFile
 from app.config import Settings
+from app.services.storage_backends import StorageBackend, make_backend, output_key
+from app.utils.audio_response import AUDIO_MEDIA_TYPES
+from app.utils.audio import DecodedAudio, encode_audio
+from app.utils.peaks import peaks_path, write_peaks
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    size_bytes: int
+    sha256: Optional[str] = None  # Set when the upload was hashed
 
 
 class StorageService:
     def __init__(self, settings: Settings):
         self.output_dir = Path(settings.output_dir)
         self.upload_dir = Path(settings.upload_dir)
+        self.output_suffix = "." + settings.output_format.lstrip(".")
+        self.max_upload_bytes = settings.max_upload_size_mb * 1024 * 1024
+        self.dedupe_uploads = settings.upload_dedupe
+        self.backend: StorageBackend = make_backend(settings)
+        self.url_mode = settings.s3_url_mode
+        self._fetches: dict[str, asyncio.Future] = {}
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
 
     def get_output_path(self, job_id: str) -> Path:
-        """Return path organized by date: data/outputs/YYYY-MM-DD/job_id.mp3"""
+        """Return path organized by date: data/outputs/YYYY-MM-DD/job_id.flac (or output_format)"""
         date_dir = self.output_dir / date.today().isoformat()
         date_dir.mkdir(parents=True, exist_ok=True)
-        return date_dir / f"{job_id}.mp3"
+        return date_dir / f"{job_id}{self.output_suffix}"
 
     def get_output_url(self, output_path: Path) -> str:
-        """Convert file path to HTTP URL."""
-        rel = output_path.relative_to(self.output_dir)
-        return f"/outputs/{rel}"
+        """Convert file path to HTTP URL (the same for every backend; see routers/audio.py)."""
+        return f"/outputs/{output_key(output_path)}"
+
+    async def publish(self, output_path: Path) -> None:
+        """Copy a finished output and its peaks to a remote backend; no-op for local."""
+        if not self.backend.remote:
+            return
+        key = output_key(output_path)
+        await self.backend.upload(key, output_path, AUDIO_MEDIA_TYPES.get(output_path.suffix, "application/octet-stream"))
+        peaks = peaks_path(output_path)
+        if peaks.exists():
+            await self.backend.upload(output_key(peaks), peaks, "application/octet-stream")
+
+    async def ensure_local(self, path: Path) -> bool:
+        """Make sure an output file (audio or peaks) is on local disk, fetching it from the backend if not.
+
+        False if neither has it. Concurrent calls for the same file share one
+        download.
+        """
+        if path.exists():
+            return True
+        if not self.backend.remote:
+            return False
+        key = output_key(path)
+        future = self._fetches.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(key, path))
+            self._fetches[key] = future
+            future.add_done_callback(lambda _: self._fetches.pop(key, None))
+        # One caller hanging up must not cancel the download others wait on
+        return await asyncio.shield(future)
+
+    async def _fetch(self, key: str, path: Path) -> bool:
+        if await self.backend.size(key) is None:
+            return False
+        await self.backend.download(key, path)
+        return True
+
+    async def delete_output(self, output_path: Path) -> None:
+        """Delete an output and its peaks, locally and from a remote backend."""
+        for path in (output_path, peaks_path(output_path)):
+            await self.delete_file(path)
+            if self.backend.remote:
+                await self.backend.delete(output_key(path))
+
+    async def save_audio(
+        self, audio: DecodedAudio, path: Path, executor: Optional[Executor] = None
+    ) -> Path:
+        """Encode decoded audio to path on executor (default: loop's pool)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, encode_audio, audio, path)
 
-    async def save_upload(self, file: UploadFile) -> Path:
-        """Save uploaded file, return path."""
+    async def save_peaks(
+        self, audio: DecodedAudio, audio_path: Path, executor: Optional[Executor] = None
+    ) -> Path:
+        """Write the waveform peaks for audio_path next to it."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, write_peaks, audio, peaks_path(audio_path))
+
+    async def save_upload(self, file: UploadFile, hash_content: bool = False) -> SavedUpload:
+        """Stream an uploaded file to the upload dir in chunks, off the event loop.
+
+        Raises UploadTooLarge (and keeps nothing) once it passes
+        max_upload_size_mb. With hash_content the file is named after its
+        sha256, so repeated uploads of the same file share one path.
+        """
         ext = Path(file.filename or "upload").suffix or ".mp3"
-        filename = f"{uuid.uuid4()}{ext}"
-        path = self.upload_dir / filename
-        content = await file.read()
-        path.write_bytes(content)
-        return path
+        token = str(uuid.uuid4())
+        partial = self.upload_dir / f"{token}.part"
+        size, digest = await asyncio.to_thread(
+            _copy_limited, file.file, partial, self.max_upload_bytes, hash_content,
+        )
+        path = self.upload_dir / f"{digest or token}{ext}"
+        os.replace(partial, path)
+        return SavedUpload(path=path, size_bytes=size, sha256=digest)
 
     async def delete_file(self, path: Path) -> None:
         """Delete a file if it exists."""
@@ -43,3 +134,22 @@ class StorageService:
         if path.exists():
             return path.stat().st_size
         return None
+
+
+def _copy_limited(src: BinaryIO, dest: Path, max_bytes: int, hash_content: bool) -> tuple[int, Optional[str]]:
+    """Copy src to dest chunk by chunk. Returns (size, sha256 hex or None)."""
+    hasher = hashlib.sha256() if hash_content else None
+    size = 0
+    try:
+        with open(dest, "wb") as out:
+            while chunk := src.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+                if hasher is not None:
+                    hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return size, hasher.hexdigest() if hasher is not None else None
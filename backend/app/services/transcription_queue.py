@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy import select, update, func, and_, or_
+from app.models.transcription import TranscriptionJob
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionQueue:
+    """SQLite-backed persistent transcription queue with crash recovery."""
+
+    def __init__(self, session_factory: async_sessionmaker, max_pending: int = 100):
+        self._session_factory = session_factory
+        self.max_pending = max_pending
+        self._notify = asyncio.Event()
+        self._last_created_at = datetime.min
+
+    def _created_at(self) -> datetime:
+        """A queue timestamp later than any handed out before, as JobQueue does.
+
+        The column's server default only has second resolution, so uploads
+        arriving in the same second would be ordered by their random ids.
+        """
+        self._last_created_at = max(datetime.utcnow(), self._last_created_at + timedelta(microseconds=1))
+        return self._last_created_at
+
+    async def enqueue(
+        self,
+        audio_path: str,
+        filename: Optional[str],
+        content_hash: Optional[str] = None,
+        duration_ms: Optional[int] = None,
+    ) -> TranscriptionJob:
+        """Insert a new pending job for a saved upload."""
+        async with self._session_factory() as db:
+            job = TranscriptionJob(
+                audio_path=audio_path, filename=filename, content_hash=content_hash, duration_ms=duration_ms,
+                created_at=self._created_at(),
+            )
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+            self._notify.set()
+            logger.info(f"Transcription {job.id} enqueued")
+            return job
+
+    async def dequeue_batch(self, limit: int) -> list[TranscriptionJob]:
+        """Claim up to `limit` of the oldest pending jobs and set them to processing."""
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(TranscriptionJob)
+                .where(TranscriptionJob.status == "pending")
+                .order_by(TranscriptionJob.created_at.asc(), TranscriptionJob.id.asc())
+                .limit(limit)
+            )
+            jobs = list(result.scalars().all())
+            now = datetime.utcnow()
+            for job in jobs:
+                job.status = "processing"
+                job.started_at = now
+            await db.commit()
+            if jobs:
+                logger.info(f"{len(jobs)} transcriptions dequeued -> processing")
+            return jobs
+
+    async def mark_completed(self, job_id: str, lyrics: str) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(TranscriptionJob)
+                .where(TranscriptionJob.id == job_id)
+                .values(status="completed", lyrics=lyrics, completed_at=datetime.utcnow())
+            )
+            await db.commit()
+            logger.info(f"Transcription {job_id} completed")
+
+    async def mark_failed(self, job_id: str, error: str) -> None:
+        async with self._session_factory() as db:
+            await db.execute(
+                update(TranscriptionJob)
+                .where(TranscriptionJob.id == job_id)
+                .values(status="failed", error=error, completed_at=datetime.utcnow())
+            )
+            await db.commit()
+            logger.info(f"Transcription {job_id} failed: {error}")
+
+    async def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(TranscriptionJob).where(TranscriptionJob.id == job_id)
+            )
+            return result.scalar_one_or_none()
+
+    async def find_reusable(self, content_hash: str) -> Optional[TranscriptionJob]:
+        """Newest job for the same audio that is queued, running or done (not failed)."""
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(TranscriptionJob)
+                .where(
+                    TranscriptionJob.content_hash == content_hash,
+                    TranscriptionJob.status.in_(("pending", "processing", "completed")),
+                )
+                .order_by(TranscriptionJob.created_at.desc())
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    async def count_pending(self) -> int:
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(func.count())
+                .select_from(TranscriptionJob)
+                .where(TranscriptionJob.status == "pending")
+            )
+            return result.scalar() or 0
+
+    async def is_full(self) -> bool:
+        return await self.count_pending() >= self.max_pending
+
+    async def get_queue_position(self, job_id: str) -> int:
+        """Get position of a pending job in queue (0-based), -1 if not pending."""
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(TranscriptionJob.created_at)
+                .where(TranscriptionJob.id == job_id, TranscriptionJob.status == "pending")
+            )
+            created_at = result.scalar_one_or_none()
+            if created_at is None:
+                return -1
+            result = await db.execute(
+                select(func.count())
+                .select_from(TranscriptionJob)
+                .where(
+                    TranscriptionJob.status == "pending",
+                    or_(
+                        TranscriptionJob.created_at < created_at,
+                        and_(TranscriptionJob.created_at == created_at, TranscriptionJob.id < job_id),
+                    ),
+                )
+            )
+            return result.scalar() or 0
+
+    async def recover_stale_jobs(self) -> int:
+        """Reset processing jobs to pending on startup (crash recovery)."""
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(TranscriptionJob).where(TranscriptionJob.status == "processing")
+            )
+            stale = result.scalars().all()
+            for job in stale:
+                job.status = "pending"
+                job.started_at = None
+            await db.commit()
+            if stale:
+                logger.info(f"Recovered {len(stale)} stale transcriptions")
+            return len(stale)
+
+    async def wait_for_job(self) -> None:
+        """Block until a new job is available.
+
+        Cleared after waking, not before waiting, so an upload enqueued
+        while the worker was dequeuing is not missed (see JobQueue).
+        """
+        await self._notify.wait()
+        self._notify.clear()
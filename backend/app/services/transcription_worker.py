@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+from app.services.transcription_queue import TranscriptionQueue
+from app.services.pipeline_manager import PipelineManager
+from app.services.gpu_manager import GPUManager
+from app.services.event_broadcaster import EventBroadcaster
+from app.services.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionWorker:
+    """Background worker that transcribes queued uploads in batches.
+
+    Each pass claims up to max_batch_size pending jobs and runs them through
+    the transcriptor together, waiting its turn on the GPU scheduler like a
+    generation batch does.
+    """
+
+    def __init__(
+        self,
+        queue: TranscriptionQueue,
+        pipeline: PipelineManager,
+        gpu: GPUManager,
+        broadcaster: EventBroadcaster,
+        storage: StorageService,
+        max_batch_size: int = 8,
+        working_gb_per_file: float = 1.0,
+    ):
+        self.queue = queue
+        self.pipeline = pipeline
+        self.gpu = gpu
+        self.broadcaster = broadcaster
+        self.storage = storage
+        self.max_batch_size = max(1, max_batch_size)
+        self.working_gb_per_file = working_gb_per_file
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._running = True
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info("Transcription worker started")
+
+    async def stop(self) -> None:
+        self._running = False
+        self.queue._notify.set()  # Wake up if waiting
+        if self._task:
+            await self._task
+        logger.info("Transcription worker stopped")
+
+    async def _run_loop(self) -> None:
+        while self._running:
+            try:
+                jobs = await self.queue.dequeue_batch(self.max_batch_size)
+                if not jobs:
+                    await self.queue.wait_for_job()
+                    continue
+
+                for job in jobs:
+                    await self.broadcaster.broadcast("transcription:started", {"job_id": job.id})
+
+                paths = [Path(job.audio_path) for job in jobs]
+                try:
+                    async with self.gpu.reserve(
+                        ["transcriptor"], self.working_gb_per_file * len(jobs), label=f"transcription:{jobs[0].id}",
+                    ):
+                        results = await self.pipeline.transcribe_batch(paths)
+                except Exception as e:
+                    results = [e] * len(jobs)
+
+                for job, path, result in zip(jobs, paths, results):
+                    if isinstance(result, Exception):
+                        await self._fail_job(job.id, result)
+                    else:
+                        await self.queue.mark_completed(job.id, result)
+                        await self.broadcaster.broadcast("transcription:completed", {
+                            "job_id": job.id,
+                            "lyrics": result,
+                        })
+                    await self.storage.delete_file(path)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Transcription loop error: {e}")
+                await asyncio.sleep(1)
+
+    async def _fail_job(self, job_id: str, error: Exception) -> None:
+        logger.error(f"Transcription {job_id} failed: {error}")
+        await self.queue.mark_failed(job_id, str(error))
+        await self.broadcaster.broadcast("transcription:failed", {
+            "job_id": job_id,
+            "error": str(error),
+        })
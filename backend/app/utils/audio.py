@@ -1,10 +1,111 @@
+import asyncio
+import struct
 import subprocess
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
+
+@dataclass
+class DecodedAudio:
+    """PCM decoded by HeartCodec, shaped (samples, channels) float32."""
+    samples: np.ndarray
+    sample_rate: int = 48000
+
+    @property
+    def channels(self) -> int:
+        return 1 if self.samples.ndim == 1 else self.samples.shape[1]
+
+    @property
+    def duration_ms(self) -> int:
+        return int(self.samples.shape[0] * 1000 / self.sample_rate)
+
+
+def _codec_args(save_path: Path, bitrate: str) -> list[str]:
+    if save_path.suffix == ".flac":
+        # Lossless master: 16-bit, bitrate does not apply
+        return ["-c:a", "flac", "-sample_fmt", "s16"]
+    return ["-b:a", bitrate]
+
+
+def encode_audio(audio: DecodedAudio, save_path: Path, bitrate: str = "192k") -> Path:
+    """Encode decoded PCM straight into ffmpeg over stdin.
+
+    Raw float32 samples are piped in, so no intermediate WAV ever touches
+    the disk. The format is picked by ffmpeg from the save_path suffix.
+    """
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    samples = np.ascontiguousarray(audio.samples, dtype=np.float32)
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "f32le", "-ar", str(audio.sample_rate), "-ac", str(audio.channels),
+        "-i", "pipe:0",
+        *_codec_args(save_path, bitrate), str(save_path),
+    ]
+    try:
+        # Byte view of the array: avoids a second full copy via tobytes()
+        subprocess.run(cmd, input=memoryview(samples).cast("B"), capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        save_path.unlink(missing_ok=True)
+        stderr = e.stderr.decode(errors="replace").strip() if e.stderr else ""
+        raise RuntimeError(f"Audio encoding failed: {stderr or e}") from e
+    return save_path
+
+
+# ffmpeg can't infer the container from the .part suffix
+_MUXERS = {".mp3": "mp3", ".opus": "ogg", ".m4a": "ipod", ".flac": "flac", ".wav": "wav"}
+
+
+def transcode_audio(src: Path, dest: Path, codec: str, bitrate: str) -> Path:
+    """Transcode an audio file with ffmpeg; dest appears only once complete."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    partial = dest.with_name(f".{dest.name}.part")
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", str(src),
+        "-vn", "-c:a", codec, "-b:a", bitrate, "-f", _MUXERS.get(dest.suffix, dest.suffix[1:]), str(partial),
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        partial.unlink(missing_ok=True)
+        stderr = e.stderr.decode(errors="replace").strip() if e.stderr else ""
+        raise RuntimeError(f"Audio transcoding failed: {stderr or e}") from e
+    partial.replace(dest)
+    return dest
+
+
+def decode_audio_file(path: Path, sample_rate: int = 48000) -> DecodedAudio:
+    """Decode any audio file to float32 PCM with ffmpeg (stereo, sample_rate)."""
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(path),
+        "-f", "f32le", "-ac", "2", "-ar", str(sample_rate), "pipe:1",
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors="replace").strip() if e.stderr else ""
+        raise RuntimeError(f"Audio decoding failed: {stderr or e}") from e
+    samples = np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, 2)
+    return DecodedAudio(samples=samples, sample_rate=sample_rate)
+
 
 def get_audio_duration_ms(path: Path) -> Optional[int]:
-    """Get audio duration in milliseconds using ffprobe."""
+    """Get audio duration in milliseconds from the file's headers.
+
+    MP3, WAV and FLAC are parsed natively; anything else, and headers too
+    damaged to parse, falls back to ffprobe. Blocking: use probe_duration_ms
+    from async code.
+    """
+    try:
+        duration = read_duration_ms(path)
+    except OSError:
+        return None
+    except struct.error:
+        duration = None
+    if duration is not None:
+        return duration
     try:
         result = subprocess.run(
             ["ffprobe", "-v", "quiet", "-show_entries", "format=duration",
@@ -13,10 +114,177 @@ def get_audio_duration_ms(path: Path) -> Optional[int]:
         )
         return int(float(result.stdout.strip()) * 1000)
     except Exception:
-        pass
-    # Fallback: estimate from file size (~192kbps MP3 = 24KB/s)
-    try:
-        size = path.stat().st_size
-        return int(size / 24 * 1000 / 1000)
-    except OSError:
         return None
+
+
+async def probe_duration_ms(path: Path) -> Optional[int]:
+    """get_audio_duration_ms off the event loop (ffprobe may have to run)."""
+    return await asyncio.to_thread(get_audio_duration_ms, path)
+
+
+# How much of the file the header parsers look at
+_HEAD_BYTES = 64 * 1024
+
+
+def read_duration_ms(path: Path) -> Optional[int]:
+    """Duration from MP3, WAV or FLAC headers alone; None if not recognized."""
+    with open(path, "rb") as f:
+        head = f.read(_HEAD_BYTES)
+        size = f.seek(0, 2)
+        if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+            return _wav_duration_ms(head, size)
+        start = _id3v2_size(head)
+        if start:
+            f.seek(start)
+            head = f.read(_HEAD_BYTES)
+        if head.startswith(b"fLaC"):
+            return _flac_duration_ms(head)
+        tail = b""
+        if size >= 128:
+            f.seek(size - 128)
+            tail = f.read(128)
+    audio_bytes = size - start - (128 if tail.startswith(b"TAG") else 0)
+    return _mp3_duration_ms(head, audio_bytes)
+
+
+def _id3v2_size(data: bytes) -> int:
+    if len(data) < 10 or not data.startswith(b"ID3"):
+        return 0
+    # Syncsafe integer: 7 bits per byte
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _wav_duration_ms(data: bytes, file_size: int) -> Optional[int]:
+    byte_rate = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = struct.unpack_from("<I", data, pos + 4)[0]
+        if chunk_id == b"fmt " and pos + 20 <= len(data):
+            # format (2), channels (2), sample rate (4), then byte rate
+            byte_rate = struct.unpack_from("<I", data, pos + 16)[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed WAVs leave the size unset; the data runs to the end of the file
+            available = file_size - (pos + 8)
+            if chunk_size in (0, 0xFFFFFFFF) or chunk_size > available:
+                chunk_size = available
+            return int(chunk_size * 1000 / byte_rate)
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _flac_duration_ms(data: bytes) -> Optional[int]:
+    # STREAMINFO is always the first metadata block: 4-byte block header, then
+    # 10 bytes of block/frame sizes and a 64-bit field of
+    # sample rate (20 bits) | channels (3) | bits per sample (5) | total samples (36)
+    if len(data) < 26 or data[4] & 0x7F != 0:
+        return None
+    packed = int.from_bytes(data[18:26], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return None
+    return int(total_samples * 1000 / sample_rate)
+
+
+# Bitrates in kbps by (MPEG-1?, layer)
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by the header's version bits: 0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1
+_MP3_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+@dataclass
+class _Mp3Frame:
+    mpeg1: bool
+    layer: int
+    bitrate_kbps: int
+    sample_rate: int
+    mono: bool
+    length: int  # bytes, including the header
+
+    @property
+    def samples(self) -> int:
+        if self.layer == 1:
+            return 384
+        return 1152 if self.mpeg1 or self.layer == 2 else 576
+
+
+def _mp3_frame(data: bytes, pos: int) -> Optional[_Mp3Frame]:
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version, layer_bits = (b1 >> 3) & 3, (b1 >> 1) & 3
+    bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1, layer = version == 3, 4 - layer_bits
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index]
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        coefficient = 144 if mpeg1 or layer == 2 else 72
+        length = coefficient * bitrate * 1000 // sample_rate + padding
+    return _Mp3Frame(mpeg1, layer, bitrate, sample_rate, b3 >> 6 == 3, length)
+
+
+def _mp3_duration_ms(data: bytes, audio_bytes: int) -> Optional[int]:
+    # First frame header that is followed by another one (guards against
+    # stray sync bits in leftover tag data)
+    pos, frame = 0, None
+    while pos < len(data) - 4:
+        pos = data.find(b"\xff", pos)
+        if pos < 0:
+            return None
+        frame = _mp3_frame(data, pos)
+        if frame is not None:
+            following = pos + frame.length
+            if following + 4 > len(data) or _mp3_frame(data, following) is not None:
+                break
+        frame = None
+        pos += 1
+    if frame is None:
+        return None
+
+    # VBR/Info headers sit in the first frame, after the side information
+    side_info = (17 if frame.mono else 32) if frame.mpeg1 else (9 if frame.mono else 17)
+    xing = pos + 4 + side_info
+    # A file cut off inside these headers gets None (and ffprobe) rather than a guess
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        if xing + 8 > len(data):
+            return None
+        flags = struct.unpack_from(">I", data, xing + 4)[0]
+        if flags & 1:
+            if xing + 12 > len(data):
+                return None
+            frames = struct.unpack_from(">I", data, xing + 8)[0]
+            samples = frames * frame.samples
+            # LAME/Lavc extension: encoder delay and padding for gapless length
+            lame = xing + 8 + 4 * bool(flags & 1) + 4 * bool(flags & 2) + 100 * bool(flags & 4) + 4 * bool(flags & 8)
+            if lame + 24 <= len(data):
+                delay_padding = int.from_bytes(data[lame + 21:lame + 24], "big")
+                trimmed = samples - (delay_padding >> 12) - (delay_padding & 0xFFF)
+                if trimmed > 0:
+                    samples = trimmed
+            return int(samples * 1000 / frame.sample_rate)
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        if vbri + 18 > len(data):
+            return None
+        frames = struct.unpack_from(">I", data, vbri + 14)[0]
+        return int(frames * frame.samples * 1000 / frame.sample_rate)
+
+    # Constant bitrate: the stream length gives the duration
+    return int((audio_bytes - pos) * 8 / frame.bitrate_kbps)
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+AUDIO_MEDIA_TYPES = {
+    ".flac": "audio/flac",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".opus": "audio/ogg",
+    ".m4a": "audio/mp4",
+}
+
+# Audio files are written once under a name that is never reused
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def audio_etag(identity: str, size: int) -> str:
+    """Strong ETag from what the file is (track, format, bitrate) and its size."""
+    return f'"{identity}-{size:x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in tags
+
+
+def audio_file_response(request: Request, path: Path, identity: str, media_type: Optional[str] = None) -> Response:
+    """Serve an immutable audio file with byte ranges and ETag revalidation.
+
+    A matching If-None-Match gets a bodiless 304. Otherwise FileResponse
+    handles Range/If-Range (Starlette 0.39+, hence the fastapi lower bound)
+    and hands the file to the server as http.response.pathsend (zero-copy)
+    where the server supports it.
+    Raises FileNotFoundError if the file is gone.
+    """
+    stat = os.stat(path)
+    etag = audio_etag(identity, stat.st_size)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE, "Accept-Ranges": "bytes"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path,
+        media_type=media_type or AUDIO_MEDIA_TYPES.get(path.suffix, "application/octet-stream"),
+        headers=headers,
+        stat_result=stat,
+    )
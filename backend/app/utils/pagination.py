@@ -0,0 +1,56 @@
+import base64
+import json
+from typing import Any, Optional, Sequence
+from sqlalchemy import DateTime, String, tuple_, type_coerce
+
+
+def _key(column):
+    # Compare datetimes as the strings SQLite stores them. Rows written via
+    # server_default (CURRENT_TIMESTAMP) and via Python datetimes use
+    # different formats, so a re-bound datetime could skip or repeat rows.
+    if isinstance(getattr(column, "type", None), DateTime):
+        # Labelled, or the ORM takes it for the entity's own column when
+        # loading rows and can't find that column in the result
+        return type_coerce(column, String).label(f"{column.key}_key")
+    return column
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Values from an encoded cursor. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def paginate(query, keys: Sequence, descending: bool, cursor: Optional[str], limit: int):
+    """Order query by keys and fetch one page after cursor (keyset pagination).
+
+    keys must end in a unique column so the order is total. The key values
+    are added as trailing result columns; pass the rows to page_results.
+    """
+    exprs = [_key(k) for k in keys]
+    if cursor:
+        values = decode_cursor(cursor, len(exprs))
+        after = tuple_(*exprs) < tuple_(*values) if descending else tuple_(*exprs) > tuple_(*values)
+        query = query.where(after)
+    order = [e.desc() if descending else e.asc() for e in exprs]
+    return query.add_columns(*exprs).order_by(*order).limit(limit + 1)
+
+
+def page_results(rows: Sequence, limit: int, keys: int) -> tuple[list, Optional[str]]:
+    """Split rows from paginate into (items, next_cursor); next_cursor is None on the last page."""
+    items = [row[0] for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(rows[limit - 1][-keys:])
+    return items, next_cursor
@@ -0,0 +1,104 @@
+import struct
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.utils.audio import DecodedAudio
+
+# Level 0 holds min/max per 256 samples; each further level merges 4 buckets.
+# A 4-minute track at 48 kHz comes to ~120 KB for all five levels; a
+# request only ever transfers the resolution it asks for.
+BASE_SAMPLES_PER_BUCKET = 256
+LEVEL_FACTOR = 4
+LEVELS = 5
+
+_MAGIC = b"HMPK"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBHIQ")  # magic, version, levels, reserved, sample_rate, total_samples
+_LEVEL = struct.Struct("<II")  # samples_per_bucket, buckets
+
+
+def peaks_path(audio_path: Path) -> Path:
+    """Where the peaks for an audio file live: next to it, same stem."""
+    return audio_path.with_suffix(".peaks")
+
+
+def _quantize(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(values * 127), -127, 127).astype(np.int8)
+
+
+def compute_peaks(audio: DecodedAudio) -> bytes:
+    """Multi-resolution min/max envelope of all channels, as a peaks file.
+
+    Each level is an int8 array of interleaved (min, max) pairs scaled to
+    +-127.
+    """
+    samples = audio.samples if audio.samples.ndim == 2 else audio.samples[:, None]
+    total = samples.shape[0]
+    if total == 0:
+        mins = maxs = np.zeros(0, dtype=np.float32)
+    else:
+        starts = np.arange(0, total, BASE_SAMPLES_PER_BUCKET)
+        mins = np.minimum.reduceat(samples, starts, axis=0).min(axis=1)
+        maxs = np.maximum.reduceat(samples, starts, axis=0).max(axis=1)
+
+    header = [_HEADER.pack(_MAGIC, _VERSION, LEVELS, 0, audio.sample_rate, total)]
+    data = []
+    samples_per_bucket = BASE_SAMPLES_PER_BUCKET
+    for level in range(LEVELS):
+        if level:
+            starts = np.arange(0, len(mins), LEVEL_FACTOR)
+            if len(mins):
+                mins, maxs = np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+            samples_per_bucket *= LEVEL_FACTOR
+        header.append(_LEVEL.pack(samples_per_bucket, len(mins)))
+        pairs = np.empty((len(mins), 2), dtype=np.int8)
+        pairs[:, 0], pairs[:, 1] = _quantize(mins), _quantize(maxs)
+        data.append(pairs.tobytes())
+    return b"".join(header + data)
+
+
+def write_peaks(audio: DecodedAudio, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".peaks.tmp")
+    tmp.write_bytes(compute_peaks(audio))
+    tmp.replace(path)
+    return path
+
+
+def read_peaks(path: Path, resolution: int) -> Optional[tuple[np.ndarray, int, int]]:
+    """Peaks at `resolution` buckets from a peaks file: (pairs, sample_rate, total_samples).
+
+    pairs is an int8 array shaped (buckets, 2) of (min, max). Fewer buckets
+    come back only for audio shorter than resolution base buckets. None if
+    the file is missing or not a peaks file.
+    """
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    magic, version, levels, _, sample_rate, total = _HEADER.unpack_from(raw)
+    if magic != _MAGIC or version != _VERSION:
+        return None
+
+    offset = _HEADER.size + levels * _LEVEL.size
+    chosen = None
+    for level in range(levels):
+        _, buckets = _LEVEL.unpack_from(raw, _HEADER.size + level * _LEVEL.size)
+        # Coarsest level that still has enough buckets; the finest otherwise
+        if chosen is None or buckets >= resolution:
+            chosen = (offset, buckets)
+        offset += buckets * 2
+    start, buckets = chosen
+    pairs = np.frombuffer(raw, dtype=np.int8, count=buckets * 2, offset=start).reshape(-1, 2)
+
+    if buckets > resolution:
+        starts = np.linspace(0, buckets, resolution, endpoint=False).astype(np.int64)
+        pairs = np.stack([
+            np.minimum.reduceat(pairs[:, 0], starts),
+            np.maximum.reduceat(pairs[:, 1], starts),
+        ], axis=1)
+    return pairs, sample_rate, total
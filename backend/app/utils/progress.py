@@ -0,0 +1,18 @@
+from typing import Optional
+
+
+class ProgressSlot:
+    """Latest (step, total) of one job, written by the generation thread.
+
+    The writer swaps in a new tuple per update, which is a single atomic
+    reference assignment, so readers on the event loop never need a lock
+    and only ever see the most recent complete value.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value: Optional[tuple[int, int]] = None
+
+    def update(self, step: int, total: int) -> None:
+        self.value = (step, total)
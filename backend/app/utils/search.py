@@ -0,0 +1,101 @@
+import re
+from typing import Optional
+from sqlalchemy import literal_column, select, table, text
+
+# bm25 column weights for tracks_fts(title, lyrics, tags): a hit in a title
+# outranks the same word somewhere in a long lyric body
+RANK_WEIGHTS = (10.0, 1.0, 4.0)
+
+_TOKEN = re.compile(r"\w+")
+
+
+# tracks_fts is an external-content FTS5 index over tracks, keyed by
+# tracks.search_rowid; triggers keep it in step with every insert, update and
+# delete, whichever code path makes them. tracks has a string primary key, so
+# its implicit rowid is not stable (VACUUM may renumber it) and can't be the
+# key. The insert trigger numbers new tracks past the highest key in use.
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+        title, lyrics, tags,
+        content='tracks', content_rowid='search_rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tracks_search_ai AFTER INSERT ON tracks BEGIN
+        UPDATE tracks SET search_rowid = (SELECT coalesce(max(search_rowid), 0) + 1 FROM tracks)
+            WHERE rowid = new.rowid;
+        INSERT INTO tracks_fts (rowid, title, lyrics, tags)
+            SELECT search_rowid, title, lyrics, tags FROM tracks WHERE rowid = new.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tracks_search_ad AFTER DELETE ON tracks BEGIN
+        INSERT INTO tracks_fts (tracks_fts, rowid, title, lyrics, tags)
+            VALUES ('delete', old.search_rowid, old.title, old.lyrics, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tracks_search_au AFTER UPDATE OF title, lyrics, tags ON tracks BEGIN
+        INSERT INTO tracks_fts (tracks_fts, rowid, title, lyrics, tags)
+            VALUES ('delete', old.search_rowid, old.title, old.lyrics, old.tags);
+        INSERT INTO tracks_fts (rowid, title, lyrics, tags)
+            VALUES (new.search_rowid, new.title, new.lyrics, new.tags);
+    END
+    """,
+]
+
+
+def create_search_index(sync_conn) -> None:
+    """Create the FTS index and its triggers, (re)indexing existing tracks when needed.
+
+    Tracks from before search_rowid existed are numbered here, and an index
+    keyed on the old implicit rowid is dropped and rebuilt.
+    """
+    existing = sync_conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tracks_fts'")
+    ).scalar()
+    # Triggers are recreated so their definitions follow code changes
+    for name in ("tracks_search_ai", "tracks_search_ad", "tracks_search_au"):
+        sync_conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    sync_conn.execute(text(
+        "UPDATE tracks SET search_rowid = (SELECT coalesce(max(search_rowid), 0) FROM tracks) + rowid "
+        "WHERE search_rowid IS NULL"
+    ))
+    if existing is not None and "'search_rowid'" not in existing:
+        sync_conn.execute(text("DROP TABLE tracks_fts"))
+        existing = None
+    for statement in SEARCH_DDL:
+        sync_conn.execute(text(statement))
+    if existing is None:
+        sync_conn.execute(text("INSERT INTO tracks_fts (tracks_fts) VALUES ('rebuild')"))
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 MATCH expression requiring every word, the last one as a prefix.
+
+    Words are quoted, so user input can't inject FTS5 query syntax.
+    """
+    terms = [f'"{token}"' for token in _TOKEN.findall(query)]
+    if not terms:
+        return None
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def ranked_matches(expression: str):
+    """Subquery of (rowid, rank) for tracks matching expression; lower rank is better.
+
+    rowid here is tracks.search_rowid.
+    """
+    weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+    return (
+        select(
+            literal_column("rowid").label("rowid"),
+            literal_column(f"bm25(tracks_fts, {weights})").label("rank"),
+        )
+        .select_from(table("tracks_fts"))
+        .where(literal_column("tracks_fts").op("MATCH")(expression))
+        .subquery("matches")
+    )
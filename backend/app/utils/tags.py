@@ -0,0 +1,98 @@
+import string
+from sqlalchemy import text
+
+# Tables with a comma-separated tags column -> (link table, link column)
+TAG_LINKS = {
+    "tracks": ("track_tags", "track_id"),
+    "generation_jobs": ("job_tags", "job_id"),
+}
+
+
+# SQLite's lower() and trim() only touch ASCII letters and spaces; mirror them
+# exactly so names normalized here match the ones the triggers store
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase + "\t\n\r", string.ascii_lowercase + "   ")
+
+
+# Request schemas take tags strings without control characters other than
+# tab, newline and carriage return (which are read as spaces)
+TAGS_PATTERN = r"^[^\x00-\x08\x0b\x0c\x0e-\x1f\x7f]*$"
+
+
+def normalize_tags(tags: str) -> list[str]:
+    """Distinct normalized tag names from a comma-separated string, in order."""
+    seen: dict[str, None] = {}
+    for tag in tags.split(","):
+        name = tag.translate(_ASCII_LOWER).strip(" ")
+        if name:
+            seen.setdefault(name, None)
+    return list(seen)
+
+
+def _tag_array(col: str) -> str:
+    """SQL turning a comma-separated tags string into a JSON array for json_each.
+
+    json_quote escapes quotes, backslashes and every control character, and
+    none of its escapes contain a comma, so splitting the quoted string on
+    commas still gives valid JSON.
+    """
+    spaced = col
+    for ch in ("char(9)", "char(10)", "char(13)"):
+        spaced = f"replace({spaced}, {ch}, ' ')"
+    return f"""('[' || replace(json_quote({spaced}), ',', '","') || ']')"""
+
+
+def _tag_names(col: str) -> str:
+    return f"SELECT trim(lower(value)) AS name FROM json_each({_tag_array(col)})"
+
+
+def _link_statements(table: str, row: str) -> str:
+    link_table, link_col = TAG_LINKS[table]
+    names = _tag_names(f"{row}.tags")
+    return f"""
+        INSERT OR IGNORE INTO tags (name) SELECT name FROM ({names}) WHERE name != '';
+        INSERT OR IGNORE INTO {link_table} ({link_col}, tag_id)
+            SELECT {row}.id, id FROM tags WHERE name IN (SELECT name FROM ({names}));
+    """
+
+
+def _triggers(table: str) -> list[str]:
+    link_table, link_col = TAG_LINKS[table]
+    return [
+        f"""
+        CREATE TRIGGER {table}_tags_ai AFTER INSERT ON {table} BEGIN
+            {_link_statements(table, "new")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER {table}_tags_au AFTER UPDATE OF tags ON {table} BEGIN
+            DELETE FROM {link_table} WHERE {link_col} = old.id;
+            {_link_statements(table, "new")}
+        END
+        """,
+    ]
+
+
+def create_tag_links(sync_conn) -> None:
+    """(Re)create the triggers linking tags strings to the tags table, then backfill.
+
+    Triggers keep the links in step with every insert and update whichever
+    code path makes them; deletes cascade through the link tables' foreign
+    keys. Rows that predate the link tables are linked here on startup.
+    """
+    for table, (link_table, link_col) in TAG_LINKS.items():
+        for suffix in ("ai", "au"):
+            sync_conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_tags_{suffix}"))
+        for statement in _triggers(table):
+            sync_conn.execute(text(statement))
+
+        needs_backfill = sync_conn.execute(text(
+            f"SELECT EXISTS (SELECT 1 FROM {table}) AND NOT EXISTS (SELECT 1 FROM {link_table})"
+        )).scalar()
+        if needs_backfill:
+            names = f"SELECT trim(lower(t.value)) AS name FROM {table}, json_each({_tag_array(f'{table}.tags')}) AS t"
+            sync_conn.execute(text(f"INSERT OR IGNORE INTO tags (name) SELECT name FROM ({names}) WHERE name != ''"))
+            sync_conn.execute(text(f"""
+                INSERT OR IGNORE INTO {link_table} ({link_col}, tag_id)
+                SELECT {table}.id, tags.id FROM {table}, json_each({_tag_array(f'{table}.tags')}) AS t
+                JOIN tags ON tags.name = trim(lower(t.value))
+            """))
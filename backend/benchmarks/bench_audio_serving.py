@@ -0,0 +1,139 @@
+"""Concurrent seeks across many tracks: the old StaticFiles mount vs the /outputs audio route.
+
+Starts a real uvicorn server with both: StaticFiles at /static (as /outputs
+used to be mounted) and the audio router at /outputs, over the same files.
+Clients seek like a player scrubbing: random 64 KB ranges of random tracks.
+A second pass replays one request per track with If-None-Match, which a
+browser sends for anything it has cached. The immutable Cache-Control on the
+route means browsers mostly skip even that.
+
+Run from backend/:  uv run --extra dev python -m benchmarks.bench_audio_serving --tracks 200 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_OUTPUT_DIR"] = f"{_tmp}/outputs"
+os.environ["HEARTMULA_UPLOAD_DIR"] = f"{_tmp}/uploads"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.staticfiles import StaticFiles  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.routers import audio  # noqa: E402
+from app.services.storage_service import StorageService  # noqa: E402
+
+RANGE_BYTES = 64 * 1024
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_tracks(storage: StorageService, count: int, size: int) -> list[tuple[str, int]]:
+    """Random-content .flac files spread over a few date directories: (relative URL path, size)."""
+    tracks = []
+    for i in range(count):
+        date_dir = storage.output_dir / f"2026-01-{i % 28 + 1:02d}"
+        date_dir.mkdir(parents=True, exist_ok=True)
+        path = date_dir / f"track-{i:05d}.flac"
+        path.write_bytes(os.urandom(size))
+        tracks.append((str(path.relative_to(storage.output_dir)), size))
+    return tracks
+
+
+def make_app(storage: StorageService) -> FastAPI:
+    app = FastAPI()
+    app.state.storage = storage
+    app.mount("/static", StaticFiles(directory=str(storage.output_dir)), name="static")
+    app.include_router(audio.router)
+    return app
+
+
+async def seeks(client: httpx.AsyncClient, prefix: str, tracks: list, requests: int, concurrency: int, seed: int):
+    rng = random.Random(seed)
+    plan = []
+    for _ in range(requests):
+        rel, size = rng.choice(tracks)
+        start = rng.randrange(0, size - RANGE_BYTES)
+        plan.append((rel, start))
+    latencies, statuses = [], {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(rel: str, start: int) -> None:
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await client.get(f"{prefix}/{rel}", headers={"Range": f"bytes={start}-{start + RANGE_BYTES - 1}"})
+            latencies.append(time.perf_counter() - t0)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(rel, start) for rel, start in plan))
+    return time.perf_counter() - t0, latencies, statuses
+
+
+async def revalidate(client: httpx.AsyncClient, prefix: str, tracks: list) -> tuple[int, int, str]:
+    not_modified, sent, cache_control = 0, 0, ""
+    for rel, _ in tracks:
+        first = await client.head(f"{prefix}/{rel}")
+        cache_control = first.headers.get("cache-control", "-")
+        response = await client.get(f"{prefix}/{rel}", headers={"If-None-Match": first.headers["etag"]})
+        not_modified += response.status_code == 304
+        sent += len(response.content)
+    return not_modified, sent, cache_control
+
+
+def pct(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else 0.0
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--track-mb", type=float, default=2.0)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    storage = StorageService(get_settings())
+    tracks = make_tracks(storage, args.tracks, int(args.track_mb * 1024 * 1024))
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(make_app(storage), host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None) as client:
+        print(f"  {args.requests} seeks of {RANGE_BYTES // 1024} KB over {args.tracks} tracks, concurrency {args.concurrency}")
+        print(f"  {'route':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+        for prefix in ("/static", "/outputs"):
+            elapsed, latencies, statuses = await seeks(
+                client, prefix, tracks, args.requests, args.concurrency, args.seed
+            )
+            print(f"  {prefix:<10} {args.requests / elapsed:>8.0f} {pct(latencies, 50):>8.2f} "
+                  f"{pct(latencies, 99):>8.2f}  {statuses}")
+
+        print(f"  {'route':<10} {'304s':>8} {'body B':>8}  cache-control")
+        for prefix in ("/static", "/outputs"):
+            not_modified, sent, cache_control = await revalidate(client, prefix, tracks)
+            print(f"  {prefix:<10} {not_modified:>8} {sent:>8}  {cache_control}")
+
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
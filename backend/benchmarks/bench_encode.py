@@ -0,0 +1,61 @@
+"""Compare the legacy WAV + ffmpeg round trip with the piped encoder.
+
+Run from backend/:  uv run python -m benchmarks.bench_encode --seconds 240
+"""
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.utils.audio import DecodedAudio, encode_audio
+
+
+def legacy_encode(audio: DecodedAudio, save_path: Path) -> int:
+    """Previous generate_sync path. Returns bytes written to disk."""
+    import soundfile as sf
+
+    wav_path = str(save_path).replace(".mp3", ".wav")
+    sf.write(wav_path, audio.samples, audio.sample_rate)
+    written = Path(wav_path).stat().st_size
+    subprocess.run(
+        ["ffmpeg", "-y", "-i", wav_path, "-b:a", "192k", str(save_path)],
+        capture_output=True, check=True,
+    )
+    Path(wav_path).unlink(missing_ok=True)
+    return written + save_path.stat().st_size
+
+
+def piped_encode(audio: DecodedAudio, save_path: Path) -> int:
+    encode_audio(audio, save_path)
+    return save_path.stat().st_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=240.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    samples = rng.uniform(-0.5, 0.5, size=(int(args.seconds * 48000), 2)).astype(np.float32)
+    audio = DecodedAudio(samples=samples)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in (("legacy wav+ffmpeg", legacy_encode), ("piped encoder", piped_encode)):
+            times, written = [], 0
+            for i in range(args.runs):
+                path = Path(tmp) / f"{name.split()[0]}-{i}.mp3"
+                start = time.perf_counter()
+                written = fn(audio, path)
+                times.append(time.perf_counter() - start)
+            print(
+                f"{name:>18}: {min(times):6.2f}s best / {sum(times) / len(times):6.2f}s mean, "
+                f"{written / 1024**2:7.1f} MiB written per job"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""GPU sharing between generation and transcription with fake models that report sizes.
+
+Compares the old exclusive lock (transcription evicts the generation weights
+every time) with the VRAM budget scheduler, on a mixed queue of generation
+batches and transcriptions. Loads and runs are simulated with sleeps, so no
+GPU is needed; the reported peak is the scheduler's own bookkeeping.
+
+Run from backend/:  uv run python -m benchmarks.bench_gpu_scheduler --budget 11 --jobs 40
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.gpu_manager import GPUManager
+
+SIZES_GB = {"generation": 6.5, "codec": 1.5, "transcriptor": 3.0}
+LOAD_S_PER_GB = 0.02  # simulated host-to-device transfer
+GENERATE_S, TRANSCRIBE_S = 0.2, 0.05
+GENERATION_WORKING_GB, TRANSCRIPTION_WORKING_GB = 2.0, 1.0
+
+
+class FakeModel:
+    def __init__(self, name: str):
+        self.name, self.size_gb = name, SIZES_GB[name]
+        self.loaded, self.loads = False, 0
+
+    async def ensure_loaded(self) -> None:
+        if not self.loaded:
+            await asyncio.sleep(self.size_gb * LOAD_S_PER_GB)
+            self.loaded, self.loads = True, self.loads + 1
+
+    def evict(self) -> None:
+        self.loaded = False
+
+
+def make_workload(jobs: int, transcribe_ratio: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return ["transcription" if rng.random() < transcribe_ratio else "generation" for _ in range(jobs)]
+
+
+async def run_locked(workload: list[str], models: dict[str, FakeModel]) -> list[float]:
+    """Before: one lock for generation; transcription bypasses it and parks generation weights."""
+    lock, waits = asyncio.Lock(), []
+
+    async def generation(submitted: float) -> None:
+        async with lock:
+            waits.append(time.perf_counter() - submitted)
+            await models["generation"].ensure_loaded()
+            await models["codec"].ensure_loaded()
+            await asyncio.sleep(GENERATE_S)
+
+    async def transcription(submitted: float) -> None:
+        waits.append(time.perf_counter() - submitted)
+        models["generation"].evict()
+        models["codec"].evict()
+        await models["transcriptor"].ensure_loaded()
+        await asyncio.sleep(TRANSCRIBE_S)
+
+    await _submit(workload, generation, transcription)
+    return waits
+
+
+async def run_scheduled(workload: list[str], models: dict[str, FakeModel], budget_gb: float) -> tuple[list[float], float, GPUManager]:
+    gpu, waits, peak = GPUManager(budget_gb=budget_gb), [], 0.0
+    for model in models.values():
+        gpu.register_model(model.name, model.size_gb, evict=model.evict, is_loaded=lambda m=model: m.loaded)
+
+    async def run(needed: list[str], working_gb: float, seconds: float, submitted: float) -> None:
+        nonlocal peak
+        async with gpu.reserve(needed, working_gb, label=needed[0]):
+            waits.append(time.perf_counter() - submitted)
+            peak = max(peak, gpu.get_schedule()["reserved_gb"])
+            for name in needed:
+                await models[name].ensure_loaded()
+            await asyncio.sleep(seconds)
+
+    async def generation(submitted: float) -> None:
+        await run(["generation", "codec"], GENERATION_WORKING_GB, GENERATE_S, submitted)
+
+    async def transcription(submitted: float) -> None:
+        await run(["transcriptor"], TRANSCRIPTION_WORKING_GB, TRANSCRIBE_S, submitted)
+
+    await _submit(workload, generation, transcription)
+    return waits, peak, gpu
+
+
+async def _submit(workload: list[str], generation, transcription) -> None:
+    # Generations come from the single worker, one after another; uploads
+    # for transcription arrive independently while it runs
+    async def worker() -> None:
+        for kind in workload:
+            if kind == "generation":
+                await generation(time.perf_counter())
+
+    async def uploads() -> None:
+        tasks = []
+        for kind in workload:
+            await asyncio.sleep(GENERATE_S / 2)
+            if kind == "transcription":
+                tasks.append(asyncio.create_task(transcription(time.perf_counter())))
+        await asyncio.gather(*tasks)
+
+    await asyncio.gather(worker(), uploads())
+
+
+def fresh_models() -> dict[str, FakeModel]:
+    return {name: FakeModel(name) for name in SIZES_GB}
+
+
+def report(label: str, elapsed: float, waits: list[float], models: dict[str, FakeModel], extra: str = "") -> None:
+    loads = " ".join(f"{m.name}={m.loads}" for m in models.values())
+    worst = max(waits) * 1000 if waits else 0.0
+    print(f"  {label:<10} {elapsed:>6.2f}s  worst wait {worst:>7.1f} ms  loads: {loads}{extra}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=float, default=11.0, help="VRAM budget in GB")
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--transcribe-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workload = make_workload(args.jobs, args.transcribe_ratio, args.seed)
+    print(f"  {workload.count('generation')} generations, {workload.count('transcription')} transcriptions, "
+          f"budget {args.budget}GB, models {SIZES_GB}")
+
+    models = fresh_models()
+    start = time.perf_counter()
+    waits = await run_locked(workload, models)
+    report("lock", time.perf_counter() - start, waits, models, "  (transcription unbounded by VRAM)")
+
+    models = fresh_models()
+    start = time.perf_counter()
+    waits, peak, gpu = await run_scheduled(workload, models, args.budget)
+    report("scheduler", time.perf_counter() - start, waits, models,
+           f"  peak {peak:.1f}GB, {gpu.evictions} evictions")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""Jobs/hour with N generation workers on simulated devices sharing one JobQueue.
+
+Each "device" is a CPU GPUManager plus a stub pipeline that sleeps per job,
+so this runs on a CPU-only machine. The per-device split is read back
+from the job rows' device column; that every job runs exactly once is
+checked by tests/test_generation_worker.py.
+
+Run from backend/:  uv run python -m benchmarks.bench_multi_gpu --jobs 40 --devices 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["HEARTMULA_OUTPUT_DIR"] = f"{_tmp}/outputs"
+os.environ["HEARTMULA_UPLOAD_DIR"] = f"{_tmp}/uploads"
+
+import numpy as np  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.database import async_session_factory, init_db  # noqa: E402
+from app.models.job import GenerationJob  # noqa: E402
+from app.services.event_broadcaster import EventBroadcaster  # noqa: E402
+from app.services.generation_worker import GenerationWorker  # noqa: E402
+from app.services.gpu_manager import GPUManager  # noqa: E402
+from app.services.job_queue import JobQueue  # noqa: E402
+from app.services.storage_service import StorageService  # noqa: E402
+from app.utils.audio import DecodedAudio  # noqa: E402
+
+
+class StubPipeline:
+    """Stands in for a device's pipeline: sleeps per job."""
+
+    def __init__(self, device: str, seconds_per_job: float):
+        self.device = device
+        self.seconds_per_job = seconds_per_job
+
+    def prompt_length(self, lyrics: str, tags: str) -> int:
+        return 1  # Every job may share a pass
+
+    async def generate(self, lyrics: str, **kwargs) -> DecodedAudio:
+        return (await self.generate_batch([{"lyrics": lyrics}]))[0]
+
+    async def generate_batch(self, requests: list[dict], **kwargs) -> list[DecodedAudio]:
+        await asyncio.to_thread(time.sleep, self.seconds_per_job * len(requests))
+        return [DecodedAudio(samples=np.zeros((4800, 2), dtype=np.float32)) for _ in requests]
+
+
+class StubStorage(StorageService):
+    """Writes a placeholder file instead of running ffmpeg."""
+
+    async def save_audio(self, audio, path, executor=None):
+        def _write():
+            path.write_bytes(b"\0" * 1024)
+            return path
+
+        return await asyncio.get_running_loop().run_in_executor(executor, _write)
+
+
+async def run(devices: int, jobs: int, seconds_per_job: float, round_id: int) -> tuple[float, Counter]:
+    settings = get_settings()
+    storage = StubStorage(settings)
+    broadcaster = EventBroadcaster()
+    queue = JobQueue(async_session_factory)
+    subscriber = broadcaster.subscribe(types=["job:completed", "job:failed"])
+    lyrics = [f"[Verse]\nround {round_id} job {i}" for i in range(jobs)]
+    await queue.enqueue_many([{"lyrics": text, "tags": "pop", "max_length_ms": 30000} for text in lyrics])
+
+    workers = []
+    for i in range(devices):
+        device = f"sim:{i}"
+        workers.append(GenerationWorker(
+            job_queue=queue,
+            pipeline=StubPipeline(device, seconds_per_job),
+            gpu=GPUManager(device="cpu"),
+            broadcaster=broadcaster,
+            storage=storage,
+            device=device,
+        ))
+
+    start = time.perf_counter()
+    for worker in workers:
+        await worker.start()
+    done = 0
+    while done < jobs:
+        chunk = await subscriber.get(timeout=60)
+        if chunk is None:
+            raise RuntimeError("workers stalled")
+        done += chunk.count(b"job:completed") + chunk.count(b"job:failed")
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        await worker.stop()
+    broadcaster.unsubscribe(subscriber)
+
+    async with async_session_factory() as db:
+        result = await db.execute(select(GenerationJob.device).where(GenerationJob.lyrics.in_(lyrics)))
+        per_device = Counter(result.scalars())
+    return elapsed, per_device
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds-per-job", type=float, default=0.2)
+    args = parser.parse_args()
+
+    await init_db()
+    print(f"  {'devices':>7} {'elapsed':>8} {'jobs/hour':>10}  per device")
+    for round_id, devices in enumerate(args.devices):
+        elapsed, per_device = await run(devices, args.jobs, args.seconds_per_job, round_id)
+        split = " ".join(f"{d}={n}" for d, n in sorted(per_device.items()))
+        print(f"  {devices:>7} {elapsed:>7.2f}s {args.jobs / elapsed * 3600:>10.0f}  {split}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
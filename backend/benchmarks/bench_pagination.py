@@ -0,0 +1,90 @@
+"""GET /api/tracks latency at page 1 vs a deep page: LIMIT/OFFSET + COUNT vs cursor.
+
+Run from backend/:  uv run python -m benchmarks.bench_pagination --tracks 100000 --page 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.database import async_session_factory, engine, init_db  # noqa: E402
+from app.models.job import GenerationJob  # noqa: E402
+from app.models.track import Track  # noqa: E402
+from app.routers.tracks import list_tracks  # noqa: E402
+from app.utils.pagination import page_results, paginate  # noqa: E402
+
+LIMIT = 20
+SORTS = {
+    "created_at": ([Track.created_at, Track.id], True),
+    "title": ([Track.title, Track.id], False),
+    "duration_ms": ([Track.duration_ms, Track.id], True),
+}
+
+
+async def populate(count: int) -> None:
+    start = datetime(2025, 1, 1)
+    batch = 5000
+    for offset in range(0, count, batch):
+        jobs, tracks = [], []
+        for i in range(offset, min(offset + batch, count)):
+            job_id = str(uuid.uuid4())
+            jobs.append({"id": job_id, "status": "completed", "lyrics": "la la", "tags": "pop"})
+            tracks.append({
+                "id": str(uuid.uuid4()), "job_id": job_id, "title": f"Track {uuid.uuid4().hex[:8]}",
+                "tags": "pop", "lyrics": "la la", "output_path": "", "output_url": "",
+                "duration_ms": 30000 + (i * 7919) % 210000, "created_at": start + timedelta(seconds=i),
+            })
+        async with engine.begin() as conn:
+            await conn.execute(insert(GenerationJob), jobs)
+            await conn.execute(insert(Track), tracks)
+
+
+async def cursor_for_page(db, sort: str, page: int) -> str:
+    """The cursor a client would hold after scrolling through page - 1 pages."""
+    keys, descending = SORTS[sort]
+    query = paginate(select(Track), keys, descending, None, 1).offset((page - 1) * LIMIT - 1)
+    _, cursor = page_results((await db.execute(query)).all(), 1, len(keys))
+    return cursor
+
+
+async def timed(repeats: int, **params) -> float:
+    async with async_session_factory() as db:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            await list_tracks(db=db, search=None, tags=None, favorite=None, limit=LIMIT, **params)
+        return (time.perf_counter() - start) / repeats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    await init_db()
+    await populate(args.tracks)
+
+    print(f"  {'sort':<12} {'page':>6} {'offset+count':>14} {'cursor':>10}")
+    for sort in SORTS:
+        for page in (1, args.page):
+            offset = (page - 1) * LIMIT
+            cursor = None
+            if page > 1:
+                async with async_session_factory() as db:
+                    cursor = await cursor_for_page(db, sort, page)
+            old = await timed(args.repeats, sort=sort, offset=offset, cursor=None, with_total=True)
+            new = await timed(args.repeats, sort=sort, offset=0, cursor=cursor, with_total=False)
+            print(f"  {sort:<12} {page:>6} {old * 1000:>11.2f} ms {new * 1000:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
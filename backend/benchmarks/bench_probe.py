@@ -0,0 +1,105 @@
+"""Duration probes/sec: the old ffprobe-per-file function vs the native header parser.
+
+Test files are made with ffmpeg (a 3-minute tone per format) when it is
+installed. Otherwise headers are synthesized, and the old function can only
+time its file-size guess.
+
+Run from backend/:  uv run python -m benchmarks.bench_probe --seconds 2
+"""
+import argparse
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import Optional
+
+from app.utils.audio import get_audio_duration_ms
+
+DURATION_S = 180
+
+
+def old_get_audio_duration_ms(path: Path) -> Optional[int]:
+    """get_audio_duration_ms as it was: one ffprobe process per call, size-based guess on failure."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "quiet", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+            capture_output=True, text=True, check=True,
+        )
+        return int(float(result.stdout.strip()) * 1000)
+    except Exception:
+        pass
+    try:
+        size = path.stat().st_size
+        return int(size / 24 * 1000 / 1000)
+    except OSError:
+        return None
+
+
+def make_with_ffmpeg(directory: Path) -> list[Path]:
+    paths = []
+    for name, args in (("tone.mp3", ["-b:a", "192k"]), ("tone.flac", []), ("tone.wav", [])):
+        path = directory / name
+        subprocess.run(
+            ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={DURATION_S}",
+             "-ac", "2", *args, str(path)],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def make_synthetic(directory: Path) -> list[Path]:
+    rate = 48000
+    wav = directory / "tone.wav"
+    with wave.open(str(wav), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\0" * (rate * 4 * DURATION_S))
+
+    flac = directory / "tone.flac"
+    packed = (rate << 44) | (1 << 41) | (15 << 36) | (rate * DURATION_S)
+    streaminfo = struct.pack(">HH", 4096, 4096) + b"\0" * 6 + packed.to_bytes(8, "big") + b"\0" * 16
+    flac.write_bytes(b"fLaC" + bytes([0x80, 0, 0, 34]) + streaminfo)
+
+    # MPEG-1 Layer III, 192 kbps, 48 kHz: 576-byte frames of 1152 samples
+    mp3 = directory / "tone.mp3"
+    frame = bytes([0xFF, 0xFB, 0xB4, 0x00]) + b"\0" * 572
+    mp3.write_bytes(frame * (rate * DURATION_S // 1152))
+    return [mp3, flac, wav]
+
+
+def rate(fn, path: Path, seconds: float) -> tuple[float, Optional[int]]:
+    calls, result = 0, None
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        result = fn(path)
+        calls += 1
+    return calls / (time.perf_counter() - start), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per function and file")
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="heartmula-bench-"))
+    have_ffmpeg = shutil.which("ffmpeg") and shutil.which("ffprobe")
+    paths = make_with_ffmpeg(directory) if have_ffmpeg else make_synthetic(directory)
+    if not have_ffmpeg:
+        print("  ffmpeg not found: synthetic headers, old function falls back to its size guess")
+
+    print(f"  {'file':<10} {'old/s':>9} {'new/s':>10} {'old ms':>8} {'new ms':>8}")
+    for path in paths:
+        old_rate, old_ms = rate(old_get_audio_duration_ms, path, args.seconds)
+        new_rate, new_ms = rate(get_audio_duration_ms, path, args.seconds)
+        print(f"  {path.name:<10} {old_rate:>9.0f} {new_rate:>10.0f} {old_ms:>8} {new_ms:>8}")
+
+
+if __name__ == "__main__":
+    main()
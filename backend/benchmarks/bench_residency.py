@@ -0,0 +1,64 @@
+"""Time-to-ready for a parked model: reload from disk vs from (pinned) host RAM.
+
+Uses a stub model of plain Linear layers, so it runs on CPU; with CUDA the
+host copy is pinned and reloads are real host-to-device transfers.
+
+Run from backend/:  uv run python -m benchmarks.bench_residency --mb 1024
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+
+from app.services.model_residency import ModelResidency
+
+
+class StubModel(torch.nn.Module):
+    def __init__(self, mb: int, width: int = 2048):
+        super().__init__()
+        layers = max(1, mb * 1024 * 1024 // (width * width * 4))
+        self.layers = torch.nn.ModuleList(torch.nn.Linear(width, width) for _ in range(layers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=int, default=1024, help="approximate model size")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    checkpoint = Path(tempfile.mkdtemp(prefix="heartmula-bench-")) / "stub.pt"
+    torch.save(StubModel(args.mb).state_dict(), checkpoint)
+
+    holder = {}
+
+    def load() -> torch.nn.Module:
+        # mmap=True mirrors the memory-mapped safetensors load of the real checkpoint
+        model = StubModel(args.mb)
+        model.load_state_dict(torch.load(checkpoint, mmap=True, weights_only=True))
+        holder["model"] = model.to(device)
+        return holder["model"]
+
+    print(f"  device: {device}, model: ~{args.mb} MB")
+    for keep_host_copy in (False, True):
+        residency = ModelResidency(idle_unload_s=0, keep_host_copy=keep_host_copy)
+        residency.register("stub", device, load=load, detach=lambda: holder.pop("model", None))
+        with residency.hold():
+            pass  # first, cold load
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            with residency.hold():
+                timings.append(time.perf_counter() - start)
+        status = residency.get_status()
+        label = "host RAM" if keep_host_copy else "disk"
+        print(f"  reload from {label:<8}: {min(timings) * 1000:8.1f} ms "
+              f"(last_reload_source={status['last_reload_source']}, state after idle={status['state']})")
+        residency.close()
+        holder.clear()
+
+
+if __name__ == "__main__":
+    main()
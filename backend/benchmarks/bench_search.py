@@ -0,0 +1,106 @@
+"""Library search latency: the old ILIKE scan vs the FTS5 index, on synthetic tracks.
+
+Run from backend/:  uv run python -m benchmarks.bench_search --tracks 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.database import async_session_factory, engine, init_db  # noqa: E402
+from app.models.job import GenerationJob  # noqa: E402
+from app.models.track import Track  # noqa: E402
+from app.routers.tracks import list_tracks  # noqa: E402
+
+TAGS = ["pop", "rock", "hip-hop", "r&b", "jazz", "electronic", "piano", "guitar", "happy", "sad",
+        "energetic", "chill", "female vocal", "male vocal", "lo-fi", "cinematic"]
+
+
+def make_vocab(rng: random.Random, size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+async def populate(count: int, rng: random.Random) -> list[str]:
+    vocab = make_vocab(rng, 5000)
+    batch = 5000
+    for start in range(0, count, batch):
+        jobs, tracks = [], []
+        for _ in range(min(batch, count - start)):
+            job_id, lyrics = str(uuid.uuid4()), " ".join(rng.choices(vocab, k=150))
+            tags = ", ".join(rng.sample(TAGS, 3))
+            jobs.append({"id": job_id, "status": "completed", "lyrics": lyrics, "tags": tags})
+            tracks.append({
+                "id": str(uuid.uuid4()), "job_id": job_id, "title": " ".join(rng.choices(vocab, k=3)),
+                "tags": tags, "lyrics": lyrics, "output_path": "", "output_url": "", "duration_ms": 60000,
+            })
+        async with engine.begin() as conn:
+            await conn.execute(insert(GenerationJob), jobs)
+            await conn.execute(insert(Track), tracks)
+    return vocab
+
+
+async def old_search(db, search: str, tags: str = None) -> int:
+    """list_tracks as it was: substring scans plus a second full count."""
+    query = select(Track)
+    count_query = select(func.count()).select_from(Track)
+    if search:
+        search_filter = Track.title.ilike(f"%{search}%") | Track.lyrics.ilike(f"%{search}%")
+        query = query.where(search_filter)
+        count_query = count_query.where(search_filter)
+    if tags:
+        query = query.where(Track.tags.ilike(f"%{tags}%"))
+        count_query = count_query.where(Track.tags.ilike(f"%{tags}%"))
+    query = query.order_by(Track.created_at.desc()).limit(20)
+    list((await db.execute(query)).scalars().all())
+    return (await db.execute(count_query)).scalar() or 0
+
+
+async def new_search(db, search: str, tags: str = None) -> int:
+    response = await list_tracks(db=db, search=search, tags=tags, favorite=None,
+                                 sort="relevance", limit=20, offset=0)
+    return response.total
+
+
+async def timed(fn, queries: list[tuple[str, str]]) -> float:
+    start = time.perf_counter()
+    async with async_session_factory() as db:
+        for search, tags in queries:
+            await fn(db, search, tags)
+    return (time.perf_counter() - start) / len(queries)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    await init_db()
+    start = time.perf_counter()
+    vocab = await populate(args.tracks, rng)
+    print(f"  inserted {args.tracks} tracks (index maintained by triggers) in {time.perf_counter() - start:.1f}s")
+
+    words = [(rng.choice(vocab), None) for _ in range(args.queries)]
+    # Type-ahead: what the library page sends while the user is still typing
+    prefixes = [(w[:3], None) for w, _ in words]
+    tagged = [(rng.choice(vocab), rng.choice(TAGS)) for _ in range(args.queries)]
+
+    print(f"  {'query':<14} {'ILIKE':>10} {'FTS5':>10}")
+    for label, queries in (("word", words), ("prefix", prefixes), ("word + tag", tagged)):
+        old = await timed(old_search, queries)
+        new = await timed(new_search, queries)
+        print(f"  {label:<14} {old * 1000:>7.1f} ms {new * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""Per-event dispatch cost of EventBroadcaster.broadcast vs subscriber count.
+
+Compares every client subscribed to everything (the pre-filtering behaviour)
+with clients that each watch a single job via ?jobs=...&types=job:*.
+
+Run from backend/:  uv run --extra dev python -m benchmarks.bench_sse_dispatch
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.event_broadcaster import EventBroadcaster
+
+
+async def dispatch_cost(clients: int, filtered: bool, events: int) -> float:
+    broadcaster = EventBroadcaster(client_buffer=events + 1)
+    for i in range(clients):
+        if filtered:
+            broadcaster.subscribe(types=["job:*"], jobs=[f"job-{i}"])
+        else:
+            broadcaster.subscribe()
+
+    start = time.perf_counter()
+    for n in range(events):
+        await broadcaster.broadcast("job:progress", {
+            "job_id": f"job-{n % clients}", "step": n, "total_steps": events, "progress": n / events,
+        })
+    return (time.perf_counter() - start) / events
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"  {'clients':>8} {'unfiltered':>14} {'per-job filter':>16}")
+    for clients in args.clients:
+        everything = await dispatch_cost(clients, filtered=False, events=args.events)
+        per_job = await dispatch_cost(clients, filtered=True, events=args.events)
+        print(f"  {clients:>8} {everything * 1e6:>11.1f} us {per_job * 1e6:>13.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Submissions/sec for N jobs via POST /api/generate vs POST /api/generate/batch.
+
+Run from backend/:  uv run --extra dev python -m benchmarks.bench_submit --jobs 1000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.database import async_session_factory, init_db  # noqa: E402
+from app.routers import generation  # noqa: E402
+from app.services.event_broadcaster import EventBroadcaster  # noqa: E402
+from app.services.job_queue import JobQueue  # noqa: E402
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(generation.router)
+    app.state.job_queue = JobQueue(async_session_factory)
+    app.state.broadcaster = EventBroadcaster()
+    return app
+
+
+def payload(i: int) -> dict:
+    return {"lyrics": f"[Verse]\nbench line {i}", "tags": "pop, piano", "max_length_ms": 60000}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1000)
+    args = parser.parse_args()
+
+    await init_db()
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for i in range(args.jobs):
+            (await client.post("/api/generate", json=payload(i))).raise_for_status()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/generate/batch", json={"jobs": [payload(i) for i in range(args.jobs)]}
+        )
+        response.raise_for_status()
+        batch = time.perf_counter() - start
+
+    print(f"  single: {single:6.2f}s -> {args.jobs / single:8.0f} submissions/s")
+    print(f"   batch: {batch:6.2f}s -> {args.jobs / batch:8.0f} submissions/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Transcription queue throughput: one file per pass vs batched passes, with a stub transcriber.
+
+The stub charges a fixed cost per forward pass plus a smaller cost per file,
+the shape that makes batching Whisper worthwhile on a GPU. Jobs go through
+the real SQLite queue and worker.
+
+Run from backend/:  uv run python -m benchmarks.bench_transcription --files 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["HEARTMULA_OUTPUT_DIR"] = f"{_tmp}/outputs"
+os.environ["HEARTMULA_UPLOAD_DIR"] = f"{_tmp}/uploads"
+
+from app.config import get_settings  # noqa: E402
+from app.database import async_session_factory, init_db  # noqa: E402
+from app.services.event_broadcaster import EventBroadcaster  # noqa: E402
+from app.services.gpu_manager import GPUManager  # noqa: E402
+from app.services.storage_service import StorageService  # noqa: E402
+from app.services.transcription_queue import TranscriptionQueue  # noqa: E402
+from app.services.transcription_worker import TranscriptionWorker  # noqa: E402
+
+
+class StubTranscriber:
+    def __init__(self, pass_ms: float, file_ms: float):
+        self.pass_s, self.file_s = pass_ms / 1000, file_ms / 1000
+        self.passes = 0
+
+    async def transcribe_batch(self, audio_paths: list[Path]) -> list[str]:
+        self.passes += 1
+        await asyncio.to_thread(time.sleep, self.pass_s + self.file_s * len(audio_paths))
+        return [f"lyrics of {p.stem}" for p in audio_paths]
+
+
+async def run(files: int, batch_size: int, transcriber: StubTranscriber, storage: StorageService) -> float:
+    queue = TranscriptionQueue(async_session_factory, max_pending=files)
+    broadcaster = EventBroadcaster()
+    subscriber = broadcaster.subscribe(types=["transcription:completed"])
+    worker = TranscriptionWorker(queue, transcriber, GPUManager(), broadcaster, storage, max_batch_size=batch_size)
+
+    for i in range(files):
+        path = storage.upload_dir / f"bench-{batch_size}-{i}.wav"
+        path.write_bytes(b"\0" * 1024)
+        await queue.enqueue(str(path), path.name)
+
+    start = time.perf_counter()
+    await worker.start()
+    done = 0
+    while done < files:
+        chunk = await subscriber.get(timeout=60)
+        if chunk is None:
+            raise RuntimeError("worker stalled")
+        done += chunk.count(b"transcription:completed")
+    elapsed = time.perf_counter() - start
+    await worker.stop()
+    broadcaster.unsubscribe(subscriber)
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pass-ms", type=float, default=80, help="fixed cost of one transcriber pass")
+    parser.add_argument("--file-ms", type=float, default=15, help="added cost per file in a pass")
+    args = parser.parse_args()
+
+    await init_db()
+    storage = StorageService(get_settings())
+
+    print(f"  {'batch':>5} {'passes':>7} {'elapsed':>9} {'files/s':>8}")
+    for batch_size in (1, 4, 8, 16):
+        transcriber = StubTranscriber(args.pass_ms, args.file_ms)
+        elapsed = await run(args.files, batch_size, transcriber, storage)
+        print(f"  {batch_size:>5} {transcriber.passes:>7} {elapsed:>8.2f}s {args.files / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
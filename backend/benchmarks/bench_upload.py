@@ -0,0 +1,159 @@
+"""Peak RSS while a large file is uploaded: read-it-all vs streaming save_upload.
+
+Starts a real uvicorn server with two upload routes: the old
+`await file.read()` + write_bytes, and StorageService.save_upload. The client
+streams a multipart body of the given size, so the client side stays small.
+RSS is sampled from a background thread. An oversized chunked upload checks
+that BodySizeLimit cuts it off early.
+
+Run from backend/:  uv run --extra dev python -m benchmarks.bench_upload --mb 200
+"""
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_OUTPUT_DIR"] = f"{_tmp}/outputs"
+os.environ["HEARTMULA_UPLOAD_DIR"] = f"{_tmp}/uploads"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, File, UploadFile  # noqa: E402
+
+from app.config import Settings  # noqa: E402
+from app.services.storage_service import StorageService  # noqa: E402
+from app.utils.body_limit import BodySizeLimit, MULTIPART_OVERHEAD_BYTES  # noqa: E402
+
+BOUNDARY = "heartmula-bench-boundary"
+CHUNK = b"\x5a" * (1024 * 1024)
+
+
+class RssSampler:
+    """Peak resident set size above the baseline at start(), in MB."""
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self.peak = self.baseline = 0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def rss() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:  # not Linux: ru_maxrss is a high-water mark, in KB (bytes on macOS)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def start(self) -> None:
+        self.baseline = self.peak = self.rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        return (self.peak - self.baseline) / (1024 * 1024)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.peak = max(self.peak, self.rss())
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_app(storage: StorageService, limit_bytes: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimit, max_bytes=limit_bytes, paths=("/limited",))
+
+    @app.post("/read-all")
+    async def read_all(file: UploadFile = File(...)):
+        path = Path(storage.upload_dir) / "read-all.bin"
+        content = await file.read()
+        path.write_bytes(content)
+        path.unlink()
+        return {"size": len(content)}
+
+    @app.post("/streamed")
+    @app.post("/limited")
+    async def streamed(file: UploadFile = File(...)):
+        saved = await storage.save_upload(file, hash_content=True)
+        await storage.delete_file(saved.path)
+        return {"size": saved.size_bytes, "sha256": saved.sha256}
+
+    return app
+
+
+def multipart(mb: int):
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"bench.wav\"\r\n"
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    async def body():
+        yield head
+        for _ in range(mb):
+            yield CHUNK
+        yield tail
+
+    return body(), len(head) + mb * len(CHUNK) + len(tail)
+
+
+async def upload(client: httpx.AsyncClient, url: str, mb: int, chunked: bool = False) -> tuple[int, float, float]:
+    body, length = multipart(mb)
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    if not chunked:
+        headers["Content-Length"] = str(length)
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, content=body, headers=headers)
+        status = response.status_code
+    except httpx.HTTPError:
+        status = 0  # server hung up mid-body
+    elapsed = time.perf_counter() - start
+    return status, elapsed, sampler.stop()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=int, default=200)
+    parser.add_argument("--limit-mb", type=int, default=50, help="limit for the oversized upload check")
+    args = parser.parse_args()
+
+    storage = StorageService(Settings(max_upload_size_mb=args.mb + 1))
+    limit_bytes = args.limit_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(make_app(storage, limit_bytes), host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(timeout=None) as client:
+        print(f"  {args.mb} MB upload        {'status':>6} {'time':>8} {'peak RSS':>10}")
+        # Streamed first: RSS rarely shrinks back after the read-all route
+        for route in ("streamed", "read-all"):
+            status, elapsed, peak = await upload(client, f"{base}/{route}", args.mb)
+            print(f"  {route:<20} {status:>6} {elapsed:>7.2f}s {peak:>7.1f} MB")
+        status, elapsed, peak = await upload(client, f"{base}/limited", args.mb, chunked=True)
+        print(f"  over {args.limit_mb} MB, chunked  {status:>6} {elapsed:>7.2f}s {peak:>7.1f} MB")
+
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
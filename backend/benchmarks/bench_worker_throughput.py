@@ -0,0 +1,111 @@
+"""Jobs/hour of GenerationWorker with a sleeping stub pipeline.
+
+Compares the two-stage worker (post-processing overlapped with the next GPU
+job) against running post-processing inline after every generation.
+
+Run from backend/:  uv run python -m benchmarks.bench_worker_throughput --jobs 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp(prefix="heartmula-bench-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/bench.db"
+os.environ["HEARTMULA_OUTPUT_DIR"] = f"{_tmp}/outputs"
+os.environ["HEARTMULA_UPLOAD_DIR"] = f"{_tmp}/uploads"
+
+import numpy as np  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.database import async_session_factory, init_db  # noqa: E402
+from app.services.event_broadcaster import EventBroadcaster  # noqa: E402
+from app.services.generation_worker import GenerationWorker  # noqa: E402
+from app.services.gpu_manager import GPUManager  # noqa: E402
+from app.services.job_queue import JobQueue  # noqa: E402
+from app.services.storage_service import StorageService  # noqa: E402
+from app.utils.audio import DecodedAudio  # noqa: E402
+
+
+class StubPipeline:
+    """Sleeps in a thread to stand in for the GPU-bound generation stage."""
+
+    def __init__(self, gpu_seconds: float):
+        self.gpu_seconds = gpu_seconds
+
+    async def generate(self, **kwargs) -> DecodedAudio:
+        await asyncio.to_thread(time.sleep, self.gpu_seconds)
+        return DecodedAudio(samples=np.zeros((48000, 2), dtype=np.float32))
+
+
+class StubStorage(StorageService):
+    """Sleeps on the post-processing pool instead of running ffmpeg."""
+
+    def __init__(self, settings, cpu_seconds: float):
+        super().__init__(settings)
+        self.cpu_seconds = cpu_seconds
+
+    async def save_audio(self, audio, path, executor=None):
+        def _encode():
+            time.sleep(self.cpu_seconds)
+            path.write_bytes(b"\0" * 1024)
+            return path
+
+        return await asyncio.get_running_loop().run_in_executor(executor, _encode)
+
+
+class InlineWorker(GenerationWorker):
+    """Pre-pipelining behaviour: post-process before dequeuing again."""
+
+    async def _submit_postprocess(self, job, audio) -> None:
+        await self._postprocess(job, audio)
+
+
+async def run(worker_cls, jobs: int, gpu_s: float, cpu_s: float, workers: int) -> float:
+    settings = get_settings()
+    broadcaster = EventBroadcaster()
+    queue = JobQueue(async_session_factory)
+    events = broadcaster.subscribe()
+    for i in range(jobs):
+        await queue.enqueue({"lyrics": f"[Verse]\nbench {i}", "tags": "pop", "max_length_ms": 30000})
+
+    worker = worker_cls(
+        job_queue=queue,
+        pipeline=StubPipeline(gpu_s),
+        gpu=GPUManager(),
+        broadcaster=broadcaster,
+        storage=StubStorage(settings, cpu_s),
+        postprocess_workers=workers,
+    )
+    start = time.perf_counter()
+    await worker.start()
+    done = 0
+    while done < jobs:
+        message = await events.get()
+        if message["event"] in ("job:completed", "job:failed"):
+            done += 1
+    elapsed = time.perf_counter() - start
+    await worker.stop()
+    broadcaster.unsubscribe(events)
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--gpu-seconds", type=float, default=0.5)
+    parser.add_argument("--cpu-seconds", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    Path(f"{_tmp}/outputs").mkdir(parents=True, exist_ok=True)
+    await init_db()
+    for name, cls in (("inline", InlineWorker), ("two-stage", GenerationWorker)):
+        elapsed = await run(cls, args.jobs, args.gpu_seconds, args.cpu_seconds, args.workers)
+        print(f"{name:>10}: {elapsed:6.2f}s for {args.jobs} jobs -> {args.jobs / elapsed * 3600:8.0f} jobs/hour")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
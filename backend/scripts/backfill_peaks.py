@@ -0,0 +1,64 @@
+"""Compute waveform peaks files for tracks generated before peaks existed.
+
+Decodes each track's audio with ffmpeg and writes the peaks next to it.
+Tracks that already have peaks are skipped unless --force is given.
+
+Run from backend/:  uv run python -m scripts.backfill_peaks --workers 4
+"""
+import argparse
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.database import async_session_factory, init_db
+from app.models.track import Track
+from app.utils.audio import decode_audio_file
+from app.utils.peaks import peaks_path, write_peaks
+
+logger = logging.getLogger("backfill_peaks")
+
+
+def backfill_one(audio_path: Path) -> Path:
+    return write_peaks(decode_audio_file(audio_path), peaks_path(audio_path))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4, help="ffmpeg decodes in parallel")
+    parser.add_argument("--force", action="store_true", help="recompute existing peaks files")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    await init_db()
+    async with async_session_factory() as db:
+        result = await db.execute(select(Track.id, Track.output_path).where(Track.output_path != ""))
+        rows = result.all()
+
+    todo, missing = [], 0
+    for track_id, output_path in rows:
+        path = Path(output_path)
+        if not path.exists():
+            missing += 1
+        elif args.force or not peaks_path(path).exists():
+            todo.append((track_id, path))
+    logger.info(f"{len(rows)} tracks: {len(todo)} to backfill, {missing} without audio on disk")
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, backfill_one, path) for _, path in todo),
+            return_exceptions=True,
+        )
+    failed = 0
+    for (track_id, path), result in zip(todo, results):
+        if isinstance(result, Exception):
+            failed += 1
+            logger.warning(f"Track {track_id} ({path}): {result}")
+    logger.info(f"Backfilled {len(todo) - failed} tracks, {failed} failed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Copy every track's audio and peaks from one storage backend to another.
+
+Objects already at the destination with the same size are skipped, so an
+interrupted run can simply be started again. With --delete-source each
+object is removed from the source once its copy is verified. Output URLs do
+not change (see StorageService.get_output_url); switch
+HEARTMULA_STORAGE_BACKEND once the copy is done.
+
+Run from backend/:  uv run --extra s3 python -m scripts.migrate_storage --source local --dest s3 --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import async_session_factory, init_db
+from app.models.track import Track
+from app.services.storage_backends import BACKENDS, LocalBackend, StorageBackend, make_backend, output_key
+from app.utils.audio_response import AUDIO_MEDIA_TYPES
+from app.utils.peaks import peaks_path
+
+logger = logging.getLogger("migrate_storage")
+
+
+async def copy_one(source: StorageBackend, dest: StorageBackend, key: str, dry_run: bool) -> str:
+    """Copy key from source to dest; returns copied | skipped | missing."""
+    size = await source.size(key)
+    if size is None:
+        return "missing"
+    if await dest.size(key) == size:
+        return "skipped"
+    if dry_run:
+        return "copied"
+
+    content_type = AUDIO_MEDIA_TYPES.get(Path(key).suffix, "application/octet-stream")
+    if isinstance(source, LocalBackend):
+        await dest.upload(key, source.path_for(key), content_type)
+    elif isinstance(dest, LocalBackend):
+        await source.download(key, dest.path_for(key))
+    else:
+        with tempfile.TemporaryDirectory(prefix="heartmula-migrate-") as tmp:
+            staged = Path(tmp) / Path(key).name
+            await source.download(key, staged)
+            await dest.upload(key, staged, content_type)
+
+    if await dest.size(key) != size:
+        raise RuntimeError(f"size mismatch after copying {key}")
+    return "copied"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", choices=BACKENDS, default="local")
+    parser.add_argument("--dest", choices=BACKENDS, required=True)
+    parser.add_argument("--workers", type=int, default=4, help="objects copied in parallel")
+    parser.add_argument("--delete-source", action="store_true", help="remove each object from the source once copied")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be copied")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.source == args.dest:
+        parser.error("--source and --dest must differ")
+
+    settings = get_settings()
+    source, dest = make_backend(settings, args.source), make_backend(settings, args.dest)
+
+    await init_db()
+    async with async_session_factory() as db:
+        result = await db.execute(select(Track.output_path).where(Track.output_path != ""))
+        keys = []
+        for output_path in result.scalars():
+            keys += [output_key(output_path), output_key(peaks_path(Path(output_path)))]
+    logger.info(f"{len(keys) // 2} tracks: {len(keys)} objects from {source.name} to {dest.name}")
+
+    semaphore = asyncio.Semaphore(max(1, args.workers))
+    counts = {"copied": 0, "skipped": 0, "missing": 0, "failed": 0}
+
+    async def migrate(key: str) -> None:
+        async with semaphore:
+            try:
+                outcome = await copy_one(source, dest, key, args.dry_run)
+                if args.delete_source and outcome != "missing" and not args.dry_run:
+                    await source.delete(key)
+            except Exception as e:
+                outcome = "failed"
+                logger.warning(f"{key}: {e}")
+            counts[outcome] += 1
+
+    await asyncio.gather(*(migrate(key) for key in keys))
+    logger.info(", ".join(f"{n} {outcome}" for outcome, n in counts.items()) + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
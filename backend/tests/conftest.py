@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+# Point the app at a throwaway data directory before anything imports it
+_tmp = tempfile.mkdtemp(prefix="heartmula-tests-")
+os.environ["HEARTMULA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.db"
+os.environ["HEARTMULA_OUTPUT_DIR"] = f"{_tmp}/outputs"
+os.environ["HEARTMULA_UPLOAD_DIR"] = f"{_tmp}/uploads"
+os.environ["HEARTMULA_CACHE_DIR"] = f"{_tmp}/cache"
+os.environ["HEARTMULA_RENDITION_DIR"] = f"{_tmp}/renditions"
+os.environ["HEARTMULA_MODEL_PATH"] = f"{_tmp}/models"
+
+import pytest_asyncio  # noqa: E402
+
+from app.database import Base, async_session_factory, engine, init_db  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """The app's session factory over a freshly emptied database."""
+    await init_db()
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+    yield async_session_factory
+    # Pooled aiosqlite connections belong to this test's event loop
+    await engine.dispose()
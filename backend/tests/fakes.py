@@ -0,0 +1,192 @@
+"""Small CPU stand-ins for heartlib's generation pipeline, for tests."""
+from typing import Optional
+import torch
+from app.config import get_settings
+from app.services.model_residency import ModelResidency
+from app.services.pipeline_manager import ModelState, PipelineManager
+
+CODEBOOKS = 8
+VOCAB = 32
+EMPTY_ID = 0
+EOS_ID = 30  # Any codebook sampling >= EOS_ID ends the job
+SAMPLES_PER_FRAME = 16
+_STATES = 251  # Size of the logits table; prime, so states spread out
+
+
+class FakeConfig:
+    audio_eos_id = EOS_ID
+    empty_id = EMPTY_ID
+
+
+class FakeMula:
+    """HeartMuLa with the real generate_frame contract and a tiny fake backbone.
+
+    Each row keeps a running state over every unmasked token it was fed and
+    the position it was fed at, the way causal attention over the KV cache
+    would, so padding or shifted positions change what it samples. Logits
+    come from a fixed table indexed by that state; CFG, temperature, top-k
+    and multinomial sampling from the default torch RNG work as in HeartMuLa.
+    """
+
+    def __init__(self):
+        table = torch.randn((_STATES, CODEBOOKS, VOCAB), generator=torch.Generator().manual_seed(0))
+        table[..., EOS_ID:] -= 4.0  # EOS is possible but rare
+        self.table = table
+        self.batch_sizes: list[int] = []  # One entry per setup_caches call
+        self._rows: Optional[int] = None
+        self._state: Optional[torch.Tensor] = None
+
+    def setup_caches(self, max_batch_size: int) -> None:
+        self.batch_sizes.append(max_batch_size)
+        self._rows = max_batch_size
+        self._state = None
+
+    def generate_frame(
+        self,
+        tokens: torch.Tensor,
+        tokens_mask: torch.Tensor,
+        input_pos: torch.Tensor,
+        temperature: float,
+        topk: int,
+        cfg_scale: float,
+        continuous_segments: Optional[torch.Tensor] = None,
+        starts: Optional[list] = None,
+    ) -> torch.Tensor:
+        assert tokens.shape[0] == self._rows, "batch does not match setup_caches"
+        seen = (tokens.long() + 1) * tokens_mask.long()
+        weights = (input_pos.long() * 7 + 3).unsqueeze(-1)
+        mix = (seen * weights).sum(dim=(1, 2))
+        if starts is not None:
+            mix = mix + torch.tensor([int(s) for s in starts]) * 13
+        state = mix if self._state is None else self._state * 31 + mix
+        self._state = state % 1_000_003
+
+        logits = self.table[self._state % _STATES]
+        if cfg_scale != 1.0:
+            cond, uncond = logits.chunk(2)
+            logits = uncond + (cond - uncond) * cfg_scale
+        top = torch.topk(logits / temperature, topk, dim=-1)
+        probs = torch.softmax(top.values, dim=-1)
+        choice = torch.multinomial(probs.reshape(-1, topk), 1).reshape(probs.shape[:-1])
+        sample = top.indices.gather(-1, choice.unsqueeze(-1)).squeeze(-1)
+        if cfg_scale != 1.0:
+            sample = torch.cat([sample, sample])
+        return sample
+
+
+class FakeCodec:
+    def detokenize(self, frames: torch.Tensor) -> torch.Tensor:
+        """(codebooks, frames) tokens -> (2, samples) audio that encodes them exactly."""
+        level = frames.float().mean(dim=0) / VOCAB
+        mono = level.repeat_interleave(SAMPLES_PER_FRAME)
+        return torch.stack([mono, -mono])
+
+
+class FakeGenPipeline:
+    """The parts of HeartMuLaGenPipeline that PipelineManager drives."""
+
+    mula_device = torch.device("cpu")
+    codec_device = torch.device("cpu")
+    mula_dtype = torch.float32
+    _parallel_number = CODEBOOKS + 1  # Audio codebooks + the text slot
+
+    def __init__(self):
+        self.config = FakeConfig()
+        self.mula = FakeMula()
+        self._mula = None  # Nothing for PipelineManager._cleanup_caches to clear
+        self.codec = FakeCodec()
+
+    def _sanitize_parameters(self, max_audio_length_ms, temperature, topk, cfg_scale):
+        forward_kwargs = {
+            "max_audio_length_ms": max_audio_length_ms,
+            "temperature": temperature,
+            "topk": topk,
+            "cfg_scale": cfg_scale,
+        }
+        return {"cfg_scale": cfg_scale}, forward_kwargs, {}
+
+    def preprocess(self, inputs: dict, cfg_scale: float) -> dict:
+        """One text token per character of lyrics and tags; the uncond row sees only the first."""
+        text = [ord(c) % 29 + 1 for c in f"{inputs['tags']}|{inputs['lyrics']}"]
+        rows = 2 if cfg_scale != 1.0 else 1
+        tokens = torch.zeros((rows, len(text), CODEBOOKS + 1), dtype=torch.long)
+        tokens[..., -1] = torch.tensor(text)
+        tokens_mask = torch.zeros_like(tokens, dtype=torch.bool)
+        tokens_mask[..., -1] = True
+        if rows == 2:
+            tokens_mask[1, 1:] = False
+        return {
+            "tokens": tokens,
+            "tokens_mask": tokens_mask,
+            "muq_embed": torch.zeros((rows, 4)),
+            "muq_idx": [0] * rows,
+            "pos": torch.arange(len(text)).unsqueeze(0).repeat(rows, 1),
+        }
+
+    def _unload(self) -> None:
+        pass
+
+    def _forward(self, model_inputs, max_audio_length_ms, temperature, topk, cfg_scale):
+        """heartlib's unbatched HeartMuLaGenPipeline._forward, step for step."""
+        prompt_tokens = model_inputs["tokens"].to(self.mula_device)
+        prompt_tokens_mask = model_inputs["tokens_mask"].to(self.mula_device)
+        continuous_segment = model_inputs["muq_embed"].to(self.mula_device)
+        starts = model_inputs["muq_idx"]
+        prompt_pos = model_inputs["pos"].to(self.mula_device)
+        frames = []
+
+        bs_size = 2 if cfg_scale != 1.0 else 1
+        self.mula.setup_caches(bs_size)
+        with torch.autocast(device_type=self.mula_device.type, dtype=self.mula_dtype):
+            curr_token = self.mula.generate_frame(
+                tokens=prompt_tokens,
+                tokens_mask=prompt_tokens_mask,
+                input_pos=prompt_pos,
+                temperature=temperature,
+                topk=topk,
+                cfg_scale=cfg_scale,
+                continuous_segments=continuous_segment,
+                starts=starts,
+            )
+        frames.append(curr_token[0:1,])
+
+        def _pad_audio_token(token: torch.Tensor):
+            padded_token = (
+                torch.ones((token.shape[0], self._parallel_number), device=token.device, dtype=torch.long)
+                * self.config.empty_id
+            )
+            padded_token[:, :-1] = token
+            padded_token = padded_token.unsqueeze(1)
+            padded_token_mask = torch.ones_like(padded_token, device=token.device, dtype=torch.bool)
+            padded_token_mask[..., -1] = False
+            return padded_token, padded_token_mask
+
+        max_audio_frames = max_audio_length_ms // 80
+        for i in range(max_audio_frames):
+            curr_token, curr_token_mask = _pad_audio_token(curr_token)
+            with torch.autocast(device_type=self.mula_device.type, dtype=self.mula_dtype):
+                curr_token = self.mula.generate_frame(
+                    tokens=curr_token,
+                    tokens_mask=curr_token_mask,
+                    input_pos=prompt_pos[..., -1:] + i + 1,
+                    temperature=temperature,
+                    topk=topk,
+                    cfg_scale=cfg_scale,
+                    continuous_segments=None,
+                    starts=None,
+                )
+            if torch.any(curr_token[0:1, :] >= self.config.audio_eos_id):
+                break
+            frames.append(curr_token[0:1,])
+        frames = torch.stack(frames).permute(1, 2, 0).squeeze(0)
+        return {"frames": frames}
+
+
+def fake_pipeline_manager(**overrides) -> PipelineManager:
+    """A ready PipelineManager on the CPU driving a FakeGenPipeline."""
+    settings = get_settings().model_copy(update=overrides)
+    manager = PipelineManager(settings, device="cpu")
+    manager._gen_pipeline = FakeGenPipeline()
+    manager.residency = ModelResidency(idle_unload_s=None)
+    manager.state = ModelState.READY
+    return manager
@@ -0,0 +1,105 @@
+import struct
+import pytest
+from app.utils.audio import get_audio_duration_ms, probe_duration_ms, read_duration_ms
+
+# MPEG-1 layer III, 128 kbps, 44.1 kHz, joint stereo: 417-byte frames of 1152 samples
+FRAME_HEADER = b"\xff\xfb\x90\x64"
+FRAME_BYTES = 417
+SIDE_INFO = 32
+
+
+def _frame(payload: bytes = b"") -> bytes:
+    return (FRAME_HEADER + b"\x00" * SIDE_INFO + payload).ljust(FRAME_BYTES, b"\x00")
+
+
+def _chunk(chunk_id: bytes, payload: bytes, size: int = None) -> bytes:
+    size = len(payload) if size is None else size
+    return chunk_id + struct.pack("<I", size) + payload + b"\x00" * (len(payload) & 1)
+
+
+def _wav(pcm_bytes: int, data_size: int = None, extra: bytes = b"") -> bytes:
+    # PCM, stereo, 44.1 kHz, 16-bit: 176400 bytes per second
+    fmt = struct.pack("<HHIIHH", 1, 2, 44100, 176400, 4, 16)
+    body = b"WAVE" + _chunk(b"fmt ", fmt) + extra + _chunk(b"data", b"\x00" * pcm_bytes, data_size)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _flac(sample_rate: int, total_samples: int) -> bytes:
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples  # Stereo, 16-bit
+    streaminfo = struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + bytes([0x80]) + len(streaminfo).to_bytes(3, "big") + streaminfo + b"\xff\xf8" * 64
+
+
+def _xing(frames: int) -> bytes:
+    return b"Xing" + struct.pack(">II", 1, frames)  # Flags: frame count only
+
+
+@pytest.mark.parametrize("length", [40, 44, 47])
+def test_mp3_cut_off_inside_the_xing_header_falls_back(tmp_path, length):
+    path = tmp_path / "truncated.mp3"
+    path.write_bytes(_frame(_xing(100))[:length])
+
+    assert read_duration_ms(path) is None
+    get_audio_duration_ms(path)  # ffprobe's call, when installed; must not raise
+
+
+def test_mp3_cut_off_inside_the_vbri_header_falls_back(tmp_path):
+    path = tmp_path / "truncated.mp3"
+    path.write_bytes(_frame(b"VBRI" + b"\x00" * 6)[:len(FRAME_HEADER) + SIDE_INFO + 10])
+
+    assert read_duration_ms(path) is None
+
+
+def test_mp3_xing_frame_count_gives_the_duration(tmp_path):
+    path = tmp_path / "vbr.mp3"
+    path.write_bytes(_frame(_xing(100)) + _frame() * 3)
+
+    assert read_duration_ms(path) == 100 * 1152 * 1000 // 44100
+
+
+def test_cbr_mp3_duration_comes_from_the_stream_length(tmp_path):
+    path = tmp_path / "cbr.mp3"
+    path.write_bytes(_frame() * 10)
+
+    assert read_duration_ms(path) == 10 * FRAME_BYTES * 8 // 128
+
+
+@pytest.mark.parametrize("data_size", [0, 0xFFFFFFFF])
+def test_streamed_wav_without_a_data_size_runs_to_the_end_of_the_file(tmp_path, data_size):
+    path = tmp_path / "streamed.wav"
+    path.write_bytes(_wav(176400 * 2, data_size))
+
+    assert read_duration_ms(path) == 2000
+
+
+def test_wav_chunks_of_odd_size_are_padded_to_even(tmp_path):
+    path = tmp_path / "tagged.wav"
+    path.write_bytes(_wav(176400 // 2, extra=_chunk(b"LIST", b"INFOabc")))  # 7 bytes + 1 pad
+
+    assert read_duration_ms(path) == 500
+
+
+def test_flac_duration_comes_from_streaminfo(tmp_path):
+    path = tmp_path / "song.flac"
+    path.write_bytes(_flac(48000, 48000 * 3 + 24000))
+
+    assert read_duration_ms(path) == 3500
+
+
+def test_flac_behind_an_id3_tag_is_still_recognized(tmp_path):
+    tag = b"ID3\x04\x00\x00" + bytes([0, 0, 1, 0]) + b"\x00" * 128  # Syncsafe size 128
+    path = tmp_path / "tagged.flac"
+    path.write_bytes(tag + _flac(44100, 44100 * 4))
+
+    assert read_duration_ms(path) == 4000
+
+
+@pytest.mark.asyncio
+async def test_unrecognized_files_have_no_duration(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"not audio at all\n" * 100)
+
+    assert read_duration_ms(path) is None
+    assert get_audio_duration_ms(path) is None  # ffprobe, when installed, can't read it either
+    assert await probe_duration_ms(path) is None
+    assert await probe_duration_ms(tmp_path / "missing.mp3") is None
@@ -0,0 +1,27 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from app.utils.audio_response import audio_file_response
+
+
+@pytest.mark.asyncio
+async def test_range_requests_get_partial_content(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(bytes(range(256)) * 4)
+    app = FastAPI()
+
+    @app.get("/song")
+    async def song(request: Request):
+        return audio_file_response(request, path, "song")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        partial = await client.get("/song", headers={"Range": "bytes=100-199"})
+        etag = partial.headers["etag"]
+        stale = await client.get("/song", headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+        cached = await client.get("/song", headers={"If-None-Match": etag})
+
+    assert partial.status_code == 206
+    assert partial.content == path.read_bytes()[100:200]
+    assert partial.headers["content-range"] == "bytes 100-199/1024"
+    assert stale.status_code == 200 and len(stale.content) == 1024  # If-Range mismatch: whole file
+    assert cached.status_code == 304 and cached.content == b""
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from tests.fakes import fake_pipeline_manager
+
+
+def _generate_alone(request: dict, **sampling) -> np.ndarray:
+    manager = fake_pipeline_manager()
+    return manager.generate_sync(
+        lyrics=request["lyrics"],
+        tags=request["tags"],
+        max_audio_length_ms=request["max_audio_length_ms"],
+        **sampling,
+    ).samples
+
+
+@pytest.mark.parametrize("cfg_scale", [1.0, 1.5])
+def test_batched_rows_match_their_solo_runs(cfg_scale):
+    # Same prompt length, different content and length limits; topk=1 takes
+    # sampling out of the picture, so any difference comes from batching
+    requests = [
+        {"lyrics": "[Verse]\nfirst song", "tags": "pop", "max_audio_length_ms": 4000},
+        {"lyrics": "[Verse]\nother tune", "tags": "rap", "max_audio_length_ms": 2400},
+        {"lyrics": "[Chorus]\nthe third", "tags": "alt", "max_audio_length_ms": 3200},
+    ]
+    sampling = {"temperature": 1.0, "topk": 1, "cfg_scale": cfg_scale}
+    manager = fake_pipeline_manager()
+
+    audios = manager.generate_batch_sync(requests, **sampling)
+
+    rows = 2 if cfg_scale != 1.0 else 1
+    assert manager._gen_pipeline.mula.batch_sizes == [len(requests) * rows]
+    for request, audio in zip(requests, audios):
+        np.testing.assert_array_equal(audio.samples, _generate_alone(request, **sampling))
+
+
+def test_prompts_of_different_lengths_are_not_batched_together():
+    requests = [
+        {"lyrics": "[Verse]\nshort", "tags": "pop", "max_audio_length_ms": 2400},
+        {"lyrics": "[Verse]\na noticeably longer first line", "tags": "pop", "max_audio_length_ms": 2400},
+        {"lyrics": "[Verse]\nbrief", "tags": "pop", "max_audio_length_ms": 2400},
+    ]
+    manager = fake_pipeline_manager()
+
+    lengths = [manager.prompt_length(r["lyrics"], r["tags"]) for r in requests]
+
+    # What the worker checks before claiming jobs for one pass (see JobQueue.dequeue_compatible)
+    assert lengths[0] == lengths[2] != lengths[1]
+    with pytest.raises(ValueError):
+        manager.generate_batch_sync(requests, topk=1, cfg_scale=1.0)
+    assert manager._gen_pipeline.mula.batch_sizes == []
+
+
+def test_each_job_stops_at_its_own_length_limit():
+    requests = [
+        {"lyrics": "[Verse]\nlong one", "tags": "pop", "max_audio_length_ms": 4000},
+        {"lyrics": "[Verse]\nshort on", "tags": "pop", "max_audio_length_ms": 800},
+    ]
+    manager = fake_pipeline_manager()
+
+    long_audio, short_audio = manager.generate_batch_sync(requests, topk=1, cfg_scale=1.0)
+
+    # At most max_length_ms // 80 frames after the first
+    assert short_audio.samples.shape[0] <= (800 // 80 + 1) * 16
+    assert long_audio.samples.shape[0] > short_audio.samples.shape[0]
+
+
+def test_mismatched_prompt_lengths_are_rejected_by_forward_batch():
+    manager = fake_pipeline_manager()
+    pipeline = manager._gen_pipeline
+    inputs = [
+        pipeline.preprocess({"lyrics": "one", "tags": "pop"}, cfg_scale=1.0),
+        pipeline.preprocess({"lyrics": "three", "tags": "pop"}, cfg_scale=1.0),
+    ]
+    with pytest.raises(ValueError):
+        manager._forward_batch(inputs, [800, 800], temperature=1.0, topk=1, cfg_scale=1.0)
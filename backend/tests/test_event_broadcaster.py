@@ -0,0 +1,154 @@
+import asyncio
+import json
+import socket
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+from app.routers import events
+from app.services.event_broadcaster import EventBroadcaster
+
+CLIENTS = 500
+JOBS = 10
+STEPS = 50  # Progress events per job
+SLOW_EVERY = 10  # Every tenth client stops reading for a while mid-burst
+
+
+def _ids(chunk: bytes) -> list[int]:
+    return [int(line[4:]) for line in chunk.decode().splitlines() if line.startswith("id: ")]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_progress_is_sent_after_older_events():
+    broadcaster = EventBroadcaster()
+    sub = broadcaster.subscribe()
+
+    await broadcaster.broadcast("job:progress", {"job_id": "a", "progress": 0.1})
+    await broadcaster.broadcast("job:started", {"job_id": "b"})
+    await broadcaster.broadcast("job:progress", {"job_id": "a", "progress": 0.2})
+
+    chunk = await sub.get(timeout=1)
+    assert _ids(chunk) == [2, 3]
+    assert b'"progress": 0.1' not in chunk
+
+
+@pytest.mark.asyncio
+async def test_resume_after_coalescing_replays_nothing_twice():
+    broadcaster = EventBroadcaster()
+    sub = broadcaster.subscribe()
+    for step in range(3):
+        await broadcaster.broadcast("job:progress", {"job_id": "a", "progress": step / 4})
+        await broadcaster.broadcast("gpu:status", {"step": step})
+    await broadcaster.broadcast("job:progress", {"job_id": "a", "progress": 3 / 4})
+    seen = _ids(await sub.get(timeout=1))
+
+    resumed = broadcaster.subscribe(last_event_id=seen[-1])
+    assert await resumed.get(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_job_filter_matches_aggregated_events_by_membership():
+    broadcaster = EventBroadcaster()
+    mine = broadcaster.subscribe(jobs={"b"})
+    other = broadcaster.subscribe(jobs={"z"})
+    everything = broadcaster.subscribe()
+
+    await broadcaster.broadcast("jobs:queued", {"job_ids": ["a", "b"], "jobs": []})
+
+    assert _ids(await mine.get(timeout=1)) == [1]
+    assert await other.get(timeout=0.01) is None
+    assert _ids(await everything.get(timeout=1)) == [1]
+    # Replay applies the same filter
+    assert await broadcaster.subscribe(jobs={"z"}, last_event_id=0).get(timeout=0.01) is None
+    replayed = broadcaster.subscribe(jobs={"a"}, last_event_id=0)
+    assert _ids(await replayed.get(timeout=1)) == [1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _listen(client: httpx.AsyncClient, url: str, slow: bool, connected: asyncio.Event, counter: dict) -> dict:
+    stats = {"ids": [], "events": 0, "progress": {}, "completed": set(), "done": False}
+    async with client.stream("GET", url) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("id: "):
+                stats["ids"].append(int(line[4:]))
+            if not line.startswith("data: "):
+                continue
+            message = json.loads(line[6:])
+            event, data = message["event"], message["data"]
+            if event == "system:connected":
+                counter["connected"] += 1
+                if counter["connected"] == CLIENTS:
+                    connected.set()
+                continue
+            stats["events"] += 1
+            if event == "job:progress":
+                stats["progress"][data["job_id"]] = data["step"]
+            elif event == "job:completed":
+                stats["completed"].add(data["job_id"])
+            elif event == "test:done":
+                stats["done"] = True
+                return stats
+            if slow and stats["events"] == 10:
+                await asyncio.sleep(0.5)
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_500_subscribers_get_every_event_in_order():
+    broadcaster = EventBroadcaster()
+    app = FastAPI()
+    app.include_router(events.router)
+    app.state.broadcaster = broadcaster
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        url = f"http://127.0.0.1:{port}/api/events"
+        connected = asyncio.Event()
+        counter = {"connected": 0}
+        limits = httpx.Limits(max_connections=CLIENTS + 10)
+        async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+            tasks = [
+                asyncio.create_task(_listen(client, url, i % SLOW_EVERY == 0, connected, counter))
+                for i in range(CLIENTS)
+            ]
+            await asyncio.wait_for(connected.wait(), timeout=60)
+
+            fewest_clients = CLIENTS
+            for step in range(STEPS):
+                for job in range(JOBS):
+                    await broadcaster.broadcast("job:progress", {
+                        "job_id": f"job-{job}", "step": step, "progress": step / STEPS,
+                    })
+                if step % 5 == 0:
+                    # Not coalesced: lagging clients must get these in order
+                    await broadcaster.broadcast("gpu:status", {"step": step})
+                fewest_clients = min(fewest_clients, broadcaster.client_count)
+                await asyncio.sleep(0)
+            for job in range(JOBS):
+                await broadcaster.broadcast("job:completed", {"job_id": f"job-{job}"})
+            await broadcaster.broadcast("test:done", {})
+            results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=120)
+    finally:
+        server.should_exit = True
+        await server_task
+
+    # Lagging clients were coalesced, never dropped
+    assert fewest_clients == CLIENTS
+    jobs = {f"job-{job}" for job in range(JOBS)}
+    for stats in results:
+        assert stats["done"]
+        assert stats["ids"] == sorted(set(stats["ids"]))
+        assert stats["completed"] == jobs
+        assert stats["progress"] == {job_id: STEPS - 1 for job_id in jobs}
+    slow = [stats["events"] for i, stats in enumerate(results) if i % SLOW_EVERY == 0]
+    assert min(slow) < JOBS * STEPS
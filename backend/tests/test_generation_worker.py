@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import Counter
+import numpy as np
+import pytest
+from sqlalchemy import select
+from app.config import get_settings
+from app.models import GenerationJob
+from app.services.event_broadcaster import EventBroadcaster
+from app.services.generation_worker import GenerationWorker
+from app.services.gpu_manager import GPUManager
+from app.services.job_queue import JobQueue
+from app.services.storage_service import StorageService
+from app.utils.audio import DecodedAudio
+from tests.fakes import fake_pipeline_manager
+
+JOBS = 24
+SECONDS_PER_JOB = 0.01
+
+
+class StubPipeline:
+    """Stands in for a device's pipeline: sleeps per job, records what it generated."""
+
+    def __init__(self, generated: Counter):
+        self.generated = generated
+        self.jobs = 0
+        self.largest_batch = 0
+
+    def prompt_length(self, lyrics: str, tags: str) -> int:
+        return 1  # Every job may share a pass
+
+    async def generate(self, lyrics: str, **kwargs) -> DecodedAudio:
+        return (await self.generate_batch([{"lyrics": lyrics}]))[0]
+
+    async def generate_batch(self, requests: list[dict], **kwargs) -> list[DecodedAudio]:
+        await asyncio.to_thread(time.sleep, SECONDS_PER_JOB * len(requests))
+        for request in requests:
+            self.generated[request["lyrics"]] += 1
+        self.jobs += len(requests)
+        self.largest_batch = max(self.largest_batch, len(requests))
+        return [DecodedAudio(samples=np.zeros((4800, 2), dtype=np.float32)) for _ in requests]
+
+
+class StubStorage(StorageService):
+    """Writes a placeholder file instead of running ffmpeg."""
+
+    async def save_audio(self, audio, path, executor=None):
+        path.write_bytes(b"\0" * 1024)
+        return path
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_batch_size", [1, 4])
+async def test_workers_sharing_a_queue_run_every_job_exactly_once(session_factory, tmp_path, max_batch_size):
+    settings = get_settings().model_copy(update={
+        "output_dir": str(tmp_path / "outputs"), "upload_dir": str(tmp_path / "uploads"),
+    })
+    storage = StubStorage(settings)
+    broadcaster = EventBroadcaster()
+    queue = JobQueue(session_factory)
+    subscriber = broadcaster.subscribe(types=["job:completed", "job:failed"])
+    lyrics = [f"[Verse]\njob {i}" for i in range(JOBS)]
+    await queue.enqueue_many([
+        {"lyrics": text, "tags": "pop", "max_length_ms": 30000, "seed_source": "server"} for text in lyrics
+    ])
+
+    generated: Counter = Counter()
+    pipelines = [StubPipeline(generated) for _ in ("cpu", "cpu")]
+    workers = [
+        GenerationWorker(
+            job_queue=queue, pipeline=pipeline, gpu=GPUManager(device="cpu"), broadcaster=broadcaster,
+            storage=storage, max_batch_size=max_batch_size, device="cpu",
+        )
+        for pipeline in pipelines
+    ]
+    for worker in workers:
+        await worker.start()
+    finished = 0
+    try:
+        while finished < JOBS:
+            chunk = await subscriber.get(timeout=30)
+            assert chunk is not None, f"workers stalled after {finished} of {JOBS} jobs"
+            finished += chunk.count(b"job:completed") + chunk.count(b"job:failed")
+    finally:
+        for worker in workers:
+            await worker.stop()
+        broadcaster.unsubscribe(subscriber)
+
+    assert generated == Counter(lyrics)  # None missed, none claimed twice
+    assert max(pipeline.largest_batch for pipeline in pipelines) == max_batch_size
+    assert all(pipeline.jobs for pipeline in pipelines)  # Both workers took part
+    async with session_factory() as db:
+        result = await db.execute(select(GenerationJob.status, GenerationJob.device))
+        assert Counter(result.all()) == Counter({("completed", "cpu"): JOBS})
+
+
+@pytest.mark.asyncio
+async def test_only_prompts_of_one_length_are_claimed_for_a_batch(session_factory, tmp_path):
+    settings = get_settings().model_copy(update={
+        "output_dir": str(tmp_path / "outputs"), "upload_dir": str(tmp_path / "uploads"),
+    })
+    broadcaster = EventBroadcaster()
+    queue = JobQueue(session_factory)
+    subscriber = broadcaster.subscribe(types=["job:completed", "job:failed"])
+    lyrics = ["[Verse]\nshort", "[Verse]\na noticeably longer first line", "[Verse]\nbrief"]
+    await queue.enqueue_many([
+        {"lyrics": text, "tags": "pop", "max_length_ms": 1600, "topk": 1, "seed_source": "server"}
+        for text in lyrics
+    ])
+    manager = fake_pipeline_manager()
+    passes = []
+    generate_batch = manager.generate_batch
+
+    async def record_pass(requests, **kwargs):  # Single jobs come through here too
+        passes.append([request["lyrics"] for request in requests])
+        return await generate_batch(requests=requests, **kwargs)
+
+    manager.generate_batch = record_pass
+    worker = GenerationWorker(
+        job_queue=queue, pipeline=manager, gpu=GPUManager(device="cpu"), broadcaster=broadcaster,
+        storage=StubStorage(settings), max_batch_size=4, device="cpu",
+    )
+
+    await worker.start()
+    events = []
+    try:
+        while sum(event.count(b"job:") for event in events) < len(lyrics):
+            event = await subscriber.get(timeout=30)
+            assert event is not None, "worker stalled"
+            events.append(event)
+    finally:
+        await worker.stop()
+        broadcaster.unsubscribe(subscriber)
+
+    # The two short prompts shared a pass; the long one was left pending, not held in the batch
+    assert passes == [[lyrics[0], lyrics[2]], [lyrics[1]]]
+    rows = 2  # Default cfg_scale 1.5: a cond and an uncond row per job
+    assert manager._gen_pipeline.mula.batch_sizes == [2 * rows, 1 * rows]
+    async with session_factory() as db:
+        result = await db.execute(select(GenerationJob.lyrics, GenerationJob.status))
+        assert dict(result.all()) == {text: "completed" for text in lyrics}
@@ -0,0 +1,180 @@
+import asyncio
+import pytest
+from app.services.gpu_manager import GPUManager
+
+
+class FakeModels:
+    """Registered models that record evictions and report whether they are loaded."""
+
+    def __init__(self, gpu: GPUManager, **sizes_gb: float):
+        self.loaded = {name: False for name in sizes_gb}
+        self.evicted: list[str] = []
+        for name, size_gb in sizes_gb.items():
+            gpu.register_model(
+                name, size_gb,
+                evict=lambda name=name: self._evict(name),
+                is_loaded=lambda name=name: self.loaded[name],
+            )
+
+    def _evict(self, name: str) -> None:
+        self.loaded[name] = False
+        self.evicted.append(name)
+
+
+async def use(gpu: GPUManager, models: FakeModels, names: list[str], working_gb: float = 0.0,
+              label: str = "", log: list = None, release: asyncio.Event = None) -> None:
+    async with gpu.reserve(names, working_gb, label):
+        for name in names:
+            models.loaded[name] = True  # Loaded lazily inside the block, as the pipelines do
+        if log is not None:
+            log.append(label)
+        if release is not None:
+            await release.wait()
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_work_that_fits_together_runs_concurrently():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, mula=4, whisper=3)
+    release = asyncio.Event()
+    log = []
+
+    tasks = [
+        asyncio.create_task(use(gpu, models, ["mula"], 1, "generation", log, release)),
+        asyncio.create_task(use(gpu, models, ["whisper"], 1, "transcription", log, release)),
+    ]
+    await _settle()
+
+    assert log == ["generation", "transcription"]
+    assert gpu.get_schedule()["running"] == ["generation", "transcription"]
+    assert gpu.get_schedule()["reserved_gb"] == 9
+    release.set()
+    await asyncio.gather(*tasks)
+    assert models.evicted == []
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_admitted_in_arrival_order():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, mula=6, whisper=3, tiny=1)
+    first, second = asyncio.Event(), asyncio.Event()
+    log = []
+
+    running = asyncio.create_task(use(gpu, models, ["mula"], 2, "big", log, first))
+    await _settle()
+    # Doesn't fit next to "big", so it queues...
+    blocked = asyncio.create_task(use(gpu, models, ["whisper"], 0, "blocked", log, second))
+    await _settle()
+    # ...and this one, which would fit right now, must not overtake it
+    small = asyncio.create_task(use(gpu, models, ["tiny"], 0, "small", log))
+    await _settle()
+
+    assert log == ["big"]
+    assert gpu.get_schedule()["queued"] == 2
+    first.set()
+    await running
+    await _settle()
+    assert log[:2] == ["big", "blocked"]
+    second.set()
+    await asyncio.gather(blocked, small)
+    assert log == ["big", "blocked", "small"]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_idle_model_is_evicted():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, a=4, b=4, c=4)
+
+    await use(gpu, models, ["a"])
+    await use(gpu, models, ["b"])
+    await use(gpu, models, ["c"])  # Only room for two: a was used longest ago
+    assert models.evicted == ["a"]
+
+    await use(gpu, models, ["b"])  # Already resident: no eviction, now most recent
+    await use(gpu, models, ["a"])
+    assert models.evicted == ["a", "c"]
+    assert gpu.evictions == 2
+    resident = {name for name, slot in gpu.get_schedule()["models"].items() if slot["resident"]}
+    assert resident == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_models_in_use_are_never_evicted():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, a=4, b=4, c=4)
+    await use(gpu, models, ["a"])
+    release = asyncio.Event()
+    log = []
+
+    holding_b = asyncio.create_task(use(gpu, models, ["b"], 0, "b", log, release))
+    await _settle()
+    await use(gpu, models, ["c"], 0, "c", log)  # Evicts idle a, not b
+    assert models.evicted == ["a"]
+
+    big = asyncio.create_task(use(gpu, models, ["c"], 4, "needs b's space", log))
+    await _settle()
+    assert log == ["b", "c"]  # No idle model frees enough while b is held
+    release.set()
+    await asyncio.gather(holding_b, big)
+    assert log[-1] == "needs b's space"
+    assert models.evicted == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_models_that_unloaded_themselves_free_their_budget():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, a=6, b=6)
+    await use(gpu, models, ["a"])
+    models.loaded["a"] = False  # Idle unload behind the scheduler's back
+
+    await use(gpu, models, ["b"])
+
+    assert models.evicted == []
+
+
+@pytest.mark.asyncio
+async def test_work_larger_than_the_budget_runs_alone():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, small=2, huge=12)
+    release = asyncio.Event()
+    log = []
+
+    small = asyncio.create_task(use(gpu, models, ["small"], 0, "small", log, release))
+    await _settle()
+    huge = asyncio.create_task(use(gpu, models, ["huge"], 0, "huge", log))
+    await _settle()
+    assert log == ["small"]
+
+    release.set()
+    await asyncio.gather(small, huge)
+    assert log == ["small", "huge"]
+    assert models.evicted == ["small"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_block_the_queue():
+    gpu = GPUManager(budget_gb=10, device="cpu")
+    models = FakeModels(gpu, a=8, b=8, c=1)
+    release = asyncio.Event()
+    log = []
+
+    running = asyncio.create_task(use(gpu, models, ["a"], 0, "a", log, release))
+    await _settle()
+    cancelled = asyncio.create_task(use(gpu, models, ["b"], 0, "b", log))
+    await _settle()
+    after = asyncio.create_task(use(gpu, models, ["c"], 0, "c", log))
+    await _settle()
+    assert log == ["a"]
+
+    cancelled.cancel()
+    await _settle()
+    await after  # Fits beside a once b no longer heads the queue
+    assert log == ["a", "c"]
+    release.set()
+    await running
+    assert gpu.get_schedule()["queued"] == 0
@@ -0,0 +1,90 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.routers import generation
+from app.services.event_broadcaster import EventBroadcaster
+from app.models import GenerationJob
+from app.services.job_queue import JobQueue
+from tests.fakes import fake_pipeline_manager
+
+
+def _job(name: str) -> dict:
+    return {"lyrics": f"[Verse]\n{name}", "tags": "pop", "max_length_ms": 30000}
+
+
+@pytest.mark.asyncio
+async def test_batch_stays_consecutive_between_single_jobs(session_factory):
+    queue = JobQueue(session_factory)
+
+    before = await queue.enqueue(_job("before"))
+    batch = await queue.enqueue_many([_job(f"batch {i}") for i in range(5)])
+    after = await queue.enqueue(_job("after"))
+
+    expected = [before.id, *(job.id for job in batch), after.id]
+    assert await queue.get_pending_job_ids() == expected
+    first = await queue.get_queue_position(batch[0].id)
+    for i, job in enumerate(batch):
+        assert await queue.get_queue_position(job.id) == first + i
+
+
+@pytest.mark.asyncio
+async def test_job_list_pages_newest_first_without_gaps(session_factory):
+    queue = JobQueue(session_factory)
+    await queue.enqueue(_job("single"))
+    await queue.enqueue_many([_job(f"batch {i}") for i in range(4)])
+    expected = list(reversed(await queue.get_pending_job_ids()))
+
+    seen, cursor = [], None
+    while True:
+        jobs, total, cursor = await queue.get_jobs(limit=2, cursor=cursor)
+        seen.extend(job.id for job in jobs)
+        if cursor is None:
+            break
+
+    assert total == len(expected)
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_batch_claims_skip_prompts_of_another_length(session_factory):
+    queue = JobQueue(session_factory)
+    names = ["short", "a noticeably longer first line", "brief", "quick"]
+    jobs = await queue.enqueue_many([{**_job(name), "seed_source": "server"} for name in names])
+    prompt_length = fake_pipeline_manager().prompt_length
+
+    head = await queue.dequeue()
+    extra = await queue.dequeue_compatible(head, 4, 30000, prompt_length=prompt_length)
+
+    assert [job.lyrics for job in extra] == [_job("brief")["lyrics"], _job("quick")["lyrics"]]
+    assert await queue.get_pending_job_ids() == [jobs[1].id]  # Waits for a pass of its own
+
+
+class ClaimingQueue(JobQueue):
+    """A queue whose worker claims jobs the moment a batch lands."""
+
+    claims = 0
+
+    async def enqueue_many(self, jobs_data: list[dict]) -> list[GenerationJob]:
+        jobs = await super().enqueue_many(jobs_data)
+        for _ in range(self.claims):
+            await self.dequeue()
+        return jobs
+
+
+@pytest.mark.asyncio
+async def test_batch_positions_reflect_jobs_claimed_before_they_were_read(session_factory):
+    queue = ClaimingQueue(session_factory)
+    await queue.enqueue(_job("ahead"))
+    queue.claims = 3  # The job ahead and the batch's first two
+    app = FastAPI()
+    app.include_router(generation.router)
+    app.state.job_queue = queue
+    app.state.broadcaster = EventBroadcaster()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/generate/batch", json={
+            "jobs": [{"lyrics": f"[Verse]\nbatch {i}", "tags": "pop"} for i in range(4)],
+        })
+
+    assert response.status_code == 200
+    assert [job["queue_position"] for job in response.json()["jobs"]] == [-1, -1, 0, 1]
@@ -0,0 +1,136 @@
+import asyncio
+import time
+import httpx
+import pytest
+import torch
+from fastapi import FastAPI
+from app.routers import system
+from app.services.gpu_manager import GPUManager
+from app.services.model_residency import ModelResidency
+from tests.fakes import fake_pipeline_manager
+
+IDLE_S = 0.05
+
+
+class FakeWeights:
+    """Load/detach callbacks for a small module, counting calls."""
+
+    def __init__(self):
+        self.loads = 0
+        self.detaches = 0
+
+    def load(self) -> torch.nn.Module:
+        self.loads += 1
+        return torch.nn.Linear(4, 4)
+
+    def detach(self) -> None:
+        self.detaches += 1
+
+
+def _residency(idle_unload_s, keep_host_copy: bool = True) -> tuple[ModelResidency, FakeWeights]:
+    weights = FakeWeights()
+    residency = ModelResidency(idle_unload_s, keep_host_copy=keep_host_copy)
+    residency.register("mula", torch.device("cpu"), load=weights.load, detach=weights.detach)
+    return residency, weights
+
+
+def _wait_for_state(residency: ModelResidency, state: str, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while residency.get_status()["state"] != state:
+        assert time.monotonic() < deadline, f"still {residency.get_status()['state']}, wanted {state}"
+        time.sleep(0.01)
+
+
+def test_hold_loads_from_disk_and_keeps_models_resident_while_held():
+    residency, weights = _residency(IDLE_S)
+    assert residency.get_status()["state"] == "disk"
+
+    with residency.hold():
+        status = residency.get_status()
+        assert status["state"] == "device" and status["in_use"]
+        time.sleep(IDLE_S * 4)  # Longer than the idle window; nothing may unload mid-use
+        assert residency.is_on_device("mula")
+
+    status = residency.get_status()
+    assert weights.loads == 1
+    assert status["last_reload_source"] == "disk" and status["reloads_from_disk"] == 1
+    assert not status["in_use"]
+    residency.close()
+
+
+def test_idle_timer_parks_weights_in_host_memory_and_hold_brings_them_back():
+    residency, weights = _residency(IDLE_S)
+    with residency.hold():
+        pass
+    _wait_for_state(residency, "host")
+    assert residency.get_status()["offloads"] == 1
+
+    with residency.hold():
+        pass
+
+    status = residency.get_status()
+    assert weights.loads == 1  # Back from host RAM, not from disk
+    assert status["last_reload_source"] == "host" and status["reloads_from_host"] == 1
+    residency.close()
+
+
+def test_idle_timer_drops_weights_without_a_host_copy():
+    residency, weights = _residency(IDLE_S, keep_host_copy=False)
+    with residency.hold():
+        pass
+    _wait_for_state(residency, "disk")
+    assert weights.detaches == 1
+
+    with residency.hold():
+        pass
+
+    assert weights.loads == 2
+    assert residency.get_status()["reloads_from_disk"] == 2
+    residency.close()
+
+
+def test_a_new_hold_cancels_the_pending_idle_unload():
+    residency, _ = _residency(IDLE_S * 4)
+    with residency.hold():
+        pass
+    time.sleep(IDLE_S * 2)
+    with residency.hold():
+        time.sleep(IDLE_S * 3)  # Past the first timer's deadline
+    assert residency.get_status()["state"] == "device"
+    assert residency.get_status()["offloads"] == 0
+    residency.close()
+
+
+@pytest.mark.asyncio
+async def test_health_reports_unload_and_reload():
+    manager = fake_pipeline_manager()
+    manager.residency, _ = _residency(IDLE_S)
+    app = FastAPI()
+    app.include_router(system.router)
+    app.state.pipeline = manager
+    app.state.gpu_manager = GPUManager(device="cpu")
+
+    def generate():
+        manager.generate_sync(lyrics="[Verse]\nwake up", tags="pop", max_audio_length_ms=800, topk=1)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def residency() -> dict:
+            response = await client.get("/api/health")
+            assert response.status_code == 200
+            return response.json()["residency"]
+
+        assert (await residency())["state"] == "disk"
+
+        await asyncio.to_thread(generate)
+        status = await residency()
+        assert status["last_reload_source"] == "disk" and status["reloads_from_disk"] == 1
+
+        await asyncio.to_thread(_wait_for_state, manager.residency, "host")
+        status = await residency()
+        assert status["state"] == "host" and status["offloads"] == 1
+        assert status["idle_for_s"] is not None and status["idle_unload_s"] == IDLE_S
+
+        await asyncio.to_thread(generate)
+        status = await residency()
+        assert status["last_reload_source"] == "host" and status["reloads_from_host"] == 1
+    manager.residency.close()
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import shutil
+import time
+from pathlib import Path
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+from app.config import get_settings
+from app.models import GenerationJob, Track
+from app.models.rendition import Rendition
+from app.routers import tracks
+from app.services import rendition_cache
+from app.services.rendition_cache import RenditionCache
+from app.services.storage_reconciler import StorageReconciler
+from app.services.storage_service import StorageService
+
+
+async def _add_track(db, storage: StorageService) -> Track:
+    job = GenerationJob(lyrics="[Verse]\nrender me", tags="pop", status="completed")
+    db.add(job)
+    await db.flush()
+    output = storage.output_dir / "2026-01-01" / f"{job.id}.mp3"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(b"master")
+    track = Track(job_id=job.id, title="render me", tags="pop", lyrics=job.lyrics,
+                  output_path=str(output), output_url="/outputs/x.mp3", duration_ms=1000)
+    db.add(track)
+    await db.commit()
+    return track
+
+
+async def _add_rendition(db, renditions: RenditionCache, track_id: str, bitrate: str):
+    path = renditions.rendition_dir / track_id[:2] / f"{track_id}-{bitrate}.mp3"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"lossy")
+    db.add(Rendition(key=f"{track_id}:mp3:{bitrate}", track_id=track_id, format="mp3",
+                     bitrate=bitrate, path=str(path), size_bytes=5))
+    await db.commit()
+    return path
+
+
+def _copy_transcode(src, dest, codec, bitrate):
+    """transcode_audio without ffmpeg."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(src, dest)
+    return dest
+
+
+def _age(path, seconds: float) -> None:
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_track_deletes_its_rendition_files(session_factory):
+    settings = get_settings()
+    storage = StorageService(settings)
+    renditions = RenditionCache(session_factory, storage, settings)
+    app = FastAPI()
+    app.include_router(tracks.router)
+    app.state.storage, app.state.renditions = storage, renditions
+
+    async with session_factory() as db:
+        track = await _add_track(db, storage)
+        files = [await _add_rendition(db, renditions, track.id, bitrate) for bitrate in ("128k", "192k")]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.delete(f"/api/tracks/{track.id}")
+    renditions.close()
+
+    assert response.status_code == 200
+    assert not any(path.exists() for path in files)
+    assert not os.path.exists(track.output_path)
+
+
+@pytest.mark.asyncio
+async def test_reconciler_removes_rendition_files_without_rows(session_factory):
+    settings = get_settings().model_copy(update={"reconcile_files_per_s": 1_000_000})
+    storage = StorageService(settings)
+    renditions = RenditionCache(session_factory, storage, settings)
+    async with session_factory() as db:
+        track = await _add_track(db, storage)
+        kept = await _add_rendition(db, renditions, track.id, "128k")
+    orphan = kept.with_name(f"{track.id}-320k.mp3")  # Its row went with a deleted track
+    orphan.write_bytes(b"leaked")
+    young = kept.with_name(f"{track.id}-64k.mp3")  # Transcoded, row not written yet
+    young.write_bytes(b"fresh")
+    stale_dir = renditions.rendition_dir / "zz"
+    stale_dir.mkdir(parents=True, exist_ok=True)
+    for path in (kept, orphan):
+        _age(path, settings.reconcile_grace_s * 2)
+    renditions.close()
+
+    stats = await StorageReconciler(session_factory, storage, settings).run_once()
+
+    assert kept.exists() and young.exists()
+    assert not orphan.exists()
+    assert not stale_dir.exists()
+    assert stats.renditions.files == 2
+    assert stats.orphans_removed >= 1
+
+
+@pytest.mark.asyncio
+async def test_eviction_spares_the_rendition_just_rendered(session_factory, monkeypatch):
+    monkeypatch.setattr(rendition_cache, "transcode_audio", _copy_transcode)
+    settings = get_settings().model_copy(update={"rendition_cache_max_mb": 0})
+    storage = StorageService(settings)
+    renditions = RenditionCache(session_factory, storage, settings)
+    async with session_factory() as db:
+        track = await _add_track(db, storage)
+        older = await _add_rendition(db, renditions, track.id, "128k")
+
+    path = await renditions.get(track.id, Path(track.output_path), "mp3", "192k")
+    renditions.close()
+
+    assert path.exists()  # Over the limit on its own, but the caller is about to serve it
+    assert not older.exists()
+    async with session_factory() as db:
+        assert [entry.bitrate for entry in (await db.execute(select(Rendition))).scalars()] == ["192k"]
+
+
+@pytest.mark.asyncio
+async def test_evict_skips_renditions_being_transcoded(session_factory):
+    settings = get_settings().model_copy(update={"rendition_cache_max_mb": 0})
+    storage = StorageService(settings)
+    renditions = RenditionCache(session_factory, storage, settings)
+    async with session_factory() as db:
+        track = await _add_track(db, storage)
+        busy = await _add_rendition(db, renditions, track.id, "128k")
+        idle = await _add_rendition(db, renditions, track.id, "192k")
+    renditions._inflight[f"{track.id}:mp3:128k"] = asyncio.get_running_loop().create_future()
+
+    assert await renditions.evict() == 1
+    renditions.close()
+
+    assert busy.exists() and not idle.exists()
+
+
+@pytest.mark.asyncio
+async def test_a_rendition_evicted_before_serving_is_rendered_again(session_factory, monkeypatch):
+    monkeypatch.setattr(rendition_cache, "transcode_audio", _copy_transcode)
+    settings = get_settings()
+    storage = StorageService(settings)
+    renditions = RenditionCache(session_factory, storage, settings)
+    app = FastAPI()
+    app.include_router(tracks.router)
+    app.state.storage, app.state.renditions = storage, renditions
+    async with session_factory() as db:
+        track = await _add_track(db, storage)
+        cached = await _add_rendition(db, renditions, track.id, "128k")
+
+    get = renditions.get
+    lookups = []
+
+    async def get_then_lose_the_file(*args):
+        path = await get(*args)
+        lookups.append(path)
+        if len(lookups) == 1:
+            path.unlink()  # Another request's eviction got there first
+        return path
+
+    renditions.get = get_then_lose_the_file
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(f"/api/tracks/{track.id}/audio", params={"format": "mp3", "bitrate": "128k"})
+        os.unlink(track.output_path)
+        master = await client.get(f"/api/tracks/{track.id}/audio")
+    renditions.close()
+
+    assert response.status_code == 200
+    assert response.content == b"master"  # Transcoded afresh from the master
+    assert lookups == [cached, cached]
+    assert master.status_code == 404
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from app.config import get_settings
+from app.services.storage_backends import S3Backend, output_key
+from app.services.storage_service import StorageService
+from app.utils.peaks import peaks_path
+
+pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+BUCKET = "heartmula-test"
+AUDIO = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path):
+    for name, value in {
+        "AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing", "AWS_DEFAULT_REGION": "us-east-1",
+    }.items():
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        settings = get_settings().model_copy(update={
+            "storage_backend": "s3", "s3_bucket": BUCKET, "s3_region": "us-east-1",
+            "s3_multipart_chunk_mb": 5, "output_dir": str(tmp_path / "outputs"), "upload_dir": str(tmp_path / "uploads"),
+        })
+        storage = StorageService(settings)
+        storage.backend._client.create_bucket(Bucket=BUCKET)
+        yield storage
+
+
+def _output(storage: StorageService, name: str = "job.mp3"):
+    path = storage.output_dir / "2026-01-01" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(AUDIO)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_round_trip_through_the_bucket(s3):
+    backend: S3Backend = s3.backend
+    path = _output(s3)
+    peaks_path(path).write_bytes(b"peaks")
+
+    await s3.publish(path)
+    key = "2026-01-01/job.mp3"
+    assert await backend.size(key) == len(AUDIO)
+    assert await backend.size(output_key(peaks_path(path))) == len(b"peaks")
+    assert await backend.size("missing.mp3") is None
+    url = backend.presigned_url(key)
+    assert f"{BUCKET}" in url and "outputs/2026-01-01/job.mp3" in url and "Signature" in url
+
+    stream = await backend.open(key, "bytes=10-19")
+    assert (stream.size, stream.total) == (10, len(AUDIO))
+    assert stream.content_range == f"bytes 10-19/{len(AUDIO)}"
+    assert b"".join([chunk async for chunk in stream]) == AUDIO[10:20]
+    with pytest.raises(ValueError):
+        await backend.open(key, f"bytes={len(AUDIO) + 10}-")
+    assert await backend.open("missing.mp3") is None
+
+    path.unlink()
+    assert await s3.ensure_local(path)
+    assert path.read_bytes() == AUDIO
+
+    await s3.delete_output(path)
+    assert await backend.size(key) is None
+    assert await backend.size(output_key(peaks_path(path))) is None
+    assert not path.exists()
+    assert not await s3.ensure_local(path)
+
+
+@pytest.mark.asyncio
+async def test_large_upload_goes_up_in_parts(s3):
+    path = _output(s3, "big.mp3")
+    big = AUDIO * 200  # ~3.3 MB per copy; two copies cross the 5 MB part size
+    path.write_bytes(big * 2)
+
+    await s3.publish(path)
+
+    head = s3.backend._client.head_object(Bucket=BUCKET, Key="outputs/2026-01-01/big.mp3")
+    assert head["ContentLength"] == len(big) * 2
+    assert head["ETag"].strip('"').endswith("-2")  # Multipart ETags carry the part count
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_of_one_file_share_a_download(s3):
+    path = _output(s3)
+    await s3.publish(path)
+    path.unlink()
+    downloads = []
+    download = s3.backend.download
+
+    async def counting_download(key, dest):
+        downloads.append(key)
+        await download(key, dest)
+
+    s3.backend.download = counting_download
+    assert all(await asyncio.gather(*(s3.ensure_local(path) for _ in range(8))))
+
+    assert downloads == ["2026-01-01/job.mp3"]
+    assert path.read_bytes() == AUDIO
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_downloads_to_one_path_do_not_collide(s3):
+    path = _output(s3)
+    await s3.publish(path)
+    path.unlink()
+
+    await asyncio.gather(*(s3.backend.download("2026-01-01/job.mp3", path) for _ in range(8)))
+
+    assert path.read_bytes() == AUDIO
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import select, text, update
+from app.models import GenerationJob, Tag, Track
+from app.routers.tracks import list_tracks
+
+
+async def _add_track(db, title: str, tags: str) -> Track:
+    job = GenerationJob(lyrics=f"[Verse]\n{title}", tags=tags, status="completed")
+    db.add(job)
+    await db.flush()
+    track = Track(
+        job_id=job.id, title=title, tags=tags, lyrics=job.lyrics,
+        output_path=f"{title}.mp3", output_url=f"/audio/{title}.mp3", duration_ms=1000,
+    )
+    db.add(track)
+    await db.commit()
+    return track
+
+
+async def _search(db, search: str = None, tags: str = None) -> list[str]:
+    response = await list_tracks(db=db, search=search, tags=tags, favorite=None,
+                                 sort="relevance" if search else "title",
+                                 limit=20, cursor=None, offset=0, with_total=True)
+    return sorted(track.title for track in response.tracks)
+
+
+@pytest.mark.asyncio
+async def test_control_characters_in_tags_are_stored_not_rejected(session_factory):
+    async with session_factory() as db:
+        track = await _add_track(db, "formfeed", "lofi\x0c, chill")
+        await db.execute(update(Track).where(Track.id == track.id).values(tags='a\x01b, "quoted", back\\slash'))
+        await db.commit()
+
+        names = set((await db.execute(select(Tag.name))).scalars())
+        assert {"a\x01b", '"quoted"', "back\\slash"} <= names
+        assert await _search(db, tags="a\x01b") == ["formfeed"]
+
+
+@pytest.mark.asyncio
+async def test_search_survives_tracks_being_renumbered(session_factory):
+    async with session_factory() as db:
+        tracks = [await _add_track(db, title, "pop") for title in ("amber", "bronze", "cobalt", "denim")]
+        for track in tracks[:2]:
+            await db.delete(track)
+        await db.commit()
+        # What VACUUM may do to the implicit rowids of a table with a string key
+        await db.execute(text("UPDATE tracks SET rowid = 10 - rowid"))
+        await db.commit()
+
+        await _add_track(db, "ember", "pop")
+        assert await _search(db, "cobalt") == ["cobalt"]
+        assert await _search(db, "denim") == ["denim"]
+        assert await _search(db, "ember") == ["ember"]
+        assert await _search(db, "amber") == []
@@ -0,0 +1,131 @@
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import torch
+from app.config import get_settings
+from app.services.generation_cache import GenerationCache
+from app.services.job_queue import JobQueue
+from app.services.storage_service import StorageService
+from tests.fakes import fake_pipeline_manager
+
+
+def _generate(seed, lyrics: str = "[Verse]\nsame seed, same song") -> np.ndarray:
+    return fake_pipeline_manager().generate_sync(
+        lyrics=lyrics, tags="pop", max_audio_length_ms=2400, topk=8, cfg_scale=1.5, seed=seed,
+    ).samples
+
+
+def _job(name: str, seed: int, seed_source: str) -> dict:
+    return {
+        "lyrics": f"[Verse]\n{name}", "tags": "pop", "max_length_ms": 30000,
+        "seed": seed, "seed_source": seed_source,
+    }
+
+
+def test_same_seed_reproduces_the_output():
+    first = _generate(1234)
+    torch.rand(100)  # Whatever ran in between must not matter
+    np.testing.assert_array_equal(first, _generate(1234))
+
+
+def test_different_seeds_give_different_output():
+    assert not np.array_equal(_generate(1), _generate(2))
+
+
+def test_seeded_generation_leaves_the_global_rng_alone():
+    torch.manual_seed(7)
+    expected = torch.rand(3)
+    torch.manual_seed(7)
+    _generate(99)
+    assert torch.equal(torch.rand(3), expected)
+
+
+@pytest.mark.asyncio
+async def test_jobs_with_user_seeds_never_batch(session_factory):
+    queue = JobQueue(session_factory)
+    await queue.enqueue_many([
+        _job("user head", 5, "user"), _job("server", 7, "server"), _job("user other", 9, "user"),
+    ])
+
+    head = await queue.dequeue()
+    assert head.seed_source == "user"
+    assert await queue.dequeue_compatible(head, 4, 30000) == []
+
+    head = await queue.dequeue()
+    assert head.seed_source == "server"
+    assert await queue.dequeue_compatible(head, 4, 30000) == []
+    assert (await queue.get_job(head.id)).seed == 7  # Ran alone, so its seed still holds
+
+
+@pytest.mark.asyncio
+async def test_batched_jobs_drop_their_server_seeds(session_factory):
+    queue = JobQueue(session_factory)
+    await queue.enqueue_many([_job(f"server {i}", 100 + i, "server") for i in range(3)])
+
+    head = await queue.dequeue()
+    extra = await queue.dequeue_compatible(head, 4, 30000)
+
+    assert len(extra) == 2
+    assert head.seed is None
+    for job in [head, *extra]:
+        assert (await queue.get_job(job.id)).seed is None
+
+
+def test_cache_keys_only_on_seeds_the_user_asked_for():
+    settings = get_settings()
+    cache = GenerationCache(None, StorageService(settings), settings)
+
+    def job(seed, seed_source):
+        return _cache_job(seed, seed_source)
+
+    assert cache.key_for(job(1, "server")) == cache.key_for(job(2, "server"))
+    assert cache.key_for(job(1, "user")) != cache.key_for(job(2, "user"))
+    assert cache.key_for(job(1, "user")) != cache.key_for(job(1, "server"))
+
+
+def _cache_job(seed, seed_source, reuse_cached=None):
+    return SimpleNamespace(
+        id="job", lyrics="[Verse]\nretry me", tags="pop", max_length_ms=30000, temperature=1.0,
+        topk=50, cfg_scale=1.5, seed=seed, seed_source=seed_source, reuse_cached=reuse_cached,
+    )
+
+
+@pytest.fixture
+def cache(session_factory, tmp_path):
+    settings = get_settings().model_copy(update={
+        "output_dir": str(tmp_path / "outputs"), "upload_dir": str(tmp_path / "uploads"),
+        "cache_dir": str(tmp_path / "cache"), "generation_cache_enabled": True,
+    })
+    return GenerationCache(session_factory, StorageService(settings), settings)
+
+
+@pytest.mark.asyncio
+async def test_unseeded_requests_reuse_outputs_only_when_asked(cache, tmp_path):
+    output = tmp_path / "first.mp3"
+    output.write_bytes(b"audio")
+    await cache.store(_cache_job(7, "server"), output, 1000)
+
+    assert await cache.lookup(_cache_job(8, "server")) is None  # "Generate again" means a new variation
+    assert cache.misses == 0
+    entry = await cache.lookup(_cache_job(8, "server", reuse_cached=True))
+    assert entry is not None and entry.seed == 7
+    assert await cache.lookup(_cache_job(7, "user")) is None  # Seeded jobs always look, under their own key
+
+
+@pytest.mark.asyncio
+async def test_an_entry_evicted_after_lookup_is_a_miss(cache, tmp_path):
+    output = tmp_path / "first.mp3"
+    output.write_bytes(b"audio")
+    job = _cache_job(7, "user")
+    await cache.store(job, output, 1000)
+    entry = await cache.lookup(job)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    Path(entry.path).unlink()  # As evict() does between a worker's lookup and link
+    dest = tmp_path / "again.mp3"
+
+    assert await cache.link_into(entry, dest) is None
+    assert not dest.exists()
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert await cache.lookup(job) is None
@@ -0,0 +1,142 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+import pytest
+from app.config import get_settings
+from app.models import GenerationJob, Track
+from app.models.transcription import TranscriptionJob
+from app.services.storage_reconciler import StorageReconciler
+from app.services.storage_service import StorageService
+from app.utils.peaks import peaks_path
+
+PAST_DAY = "2026-01-01"
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return get_settings().model_copy(update={
+        "output_dir": str(tmp_path / "outputs"),
+        "upload_dir": str(tmp_path / "uploads"),
+        "rendition_dir": str(tmp_path / "renditions"),
+        "reconcile_files_per_s": 1_000_000,
+    })
+
+
+@pytest.fixture
+def storage(settings):
+    return StorageService(settings)
+
+
+@pytest.fixture
+def reconciler(session_factory, storage, settings):
+    return StorageReconciler(session_factory, storage, settings)
+
+
+def _write(path, content: bytes = b"audio", age_s: float = 0.0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if age_s:
+        then = time.time() - age_s
+        os.utime(path, (then, then))
+    return path
+
+
+async def _job(db, status: str) -> GenerationJob:
+    job = GenerationJob(lyrics=f"[Verse]\n{status}", tags="pop", status=status)
+    db.add(job)
+    await db.flush()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_orphaned_outputs_go_and_referenced_or_active_ones_stay(session_factory, storage, reconciler):
+    old = reconciler.grace_s * 2
+    day = storage.output_dir / PAST_DAY
+    async with session_factory() as db:
+        done = await _job(db, "completed")
+        pending = await _job(db, "pending")
+        running = await _job(db, "processing")
+        kept = _write(day / f"{done.id}.mp3", age_s=old)
+        db.add(Track(job_id=done.id, title="kept", tags="pop", lyrics=done.lyrics, output_path=str(kept),
+                     output_url="/outputs/x.mp3", duration_ms=1000))
+        await db.commit()
+    kept_peaks = _write(peaks_path(kept), b"peaks", age_s=old)
+    orphan = _write(day / "orphan-job.mp3", b"orphaned", age_s=old)
+    orphan_peaks = _write(peaks_path(orphan), b"peaks", age_s=old)
+    young = _write(day / "young-job.mp3")  # Written moments ago; its track may not exist yet
+    in_flight = [_write(day / f"{job.id}.mp3", age_s=old) for job in (pending, running)]
+
+    stats = await reconciler.run_once()
+
+    assert not orphan.exists() and not orphan_peaks.exists()
+    assert all(path.exists() for path in (kept, kept_peaks, young, *in_flight))
+    assert stats.orphans_removed == 2
+    assert stats.bytes_freed == len(b"orphaned") + len(b"peaks")
+    assert stats.outputs_by_date[PAST_DAY].files == 5
+    assert stats.missing_outputs == 0
+
+
+@pytest.mark.asyncio
+async def test_temp_files_count_as_temp_and_empty_past_days_go(storage, reconciler):
+    old = reconciler.grace_s * 2
+    day = storage.output_dir / PAST_DAY
+    temps = [
+        _write(day / ".job.mp3.1a2b3c.part", age_s=old),
+        _write(day / "job.peaks.tmp", age_s=old),
+        _write(storage.upload_dir / "upload.part", age_s=old),
+    ]
+    empty_past = storage.output_dir / "2025-12-31"
+    empty_past.mkdir(parents=True)
+    today = storage.output_dir / date.today().isoformat()
+    today.mkdir(parents=True)
+
+    stats = await reconciler.run_once()
+
+    assert not any(path.exists() for path in temps)
+    assert stats.temp_removed == 3 and stats.orphans_removed == 0
+    assert not day.exists() and not empty_past.exists()  # The first emptied by this very pass
+    assert today.exists()  # Today's outputs are still being written
+    assert stats.dirs_removed == 2
+    assert PAST_DAY not in stats.outputs_by_date
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_kept_only_while_their_transcription_is_queued(session_factory, storage, reconciler):
+    old = reconciler.grace_s * 2
+    queued = _write(storage.upload_dir / "queued.mp3", age_s=old)
+    running = _write(storage.upload_dir / "running.mp3", age_s=old)
+    finished = _write(storage.upload_dir / "finished.mp3", age_s=old)
+    unknown = _write(storage.upload_dir / "unknown.mp3", age_s=old)
+    fresh = _write(storage.upload_dir / "fresh.mp3")
+    async with session_factory() as db:
+        for path, status in ((queued, "pending"), (running, "processing"), (finished, "completed")):
+            db.add(TranscriptionJob(audio_path=str(path), filename=path.name, status=status))
+        await db.commit()
+
+    stats = await reconciler.run_once()
+
+    assert queued.exists() and running.exists() and fresh.exists()
+    assert not finished.exists() and not unknown.exists()
+    assert stats.orphans_removed == 2
+    assert stats.uploads.files == 3
+
+
+@pytest.mark.asyncio
+async def test_tracks_without_audio_are_counted_not_touched(session_factory, storage, reconciler):
+    day = storage.output_dir / PAST_DAY
+    async with session_factory() as db:
+        outputs = []
+        for name in ("present", "gone"):
+            job = await _job(db, "completed")
+            outputs.append(day / f"{job.id}.mp3")
+            db.add(Track(job_id=job.id, title=name, tags="pop", lyrics=job.lyrics,
+                         output_path=str(outputs[-1]), output_url=f"/outputs/{name}.mp3",
+                         duration_ms=1000, created_at=datetime.utcnow() - timedelta(hours=1)))
+        await db.commit()
+    present = _write(outputs[0], age_s=reconciler.grace_s * 2)
+
+    stats = await reconciler.run_once()
+
+    assert stats.missing_outputs == 1
+    assert present.exists()
+    assert stats.orphans_removed == 0
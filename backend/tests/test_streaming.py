@@ -0,0 +1,97 @@
+import asyncio
+import numpy as np
+import pytest
+import torch
+from app.services.audio_stream import AudioStreamHub
+from app.services.pipeline_manager import _seeded
+from app.utils.audio import DecodedAudio
+from tests.fakes import FakeGenPipeline, fake_pipeline_manager
+
+try:
+    from heartlib.pipelines.music_generation import HeartMuLaGenPipeline
+    reference_forward = HeartMuLaGenPipeline._forward
+except ImportError:
+    reference_forward = FakeGenPipeline._forward
+
+LYRICS = "[Verse]\nplay me while you write me"
+
+
+class CollectingSink:
+    active = True
+
+    def __init__(self):
+        self.chunks: list[DecodedAudio] = []
+
+    def write(self, audio: DecodedAudio) -> None:
+        self.chunks.append(audio)
+
+
+@pytest.mark.parametrize("cfg_scale", [1.0, 1.5])
+def test_single_job_generates_what_unbatched_forward_does(cfg_scale):
+    manager = fake_pipeline_manager()
+    pipeline = manager._gen_pipeline
+    preprocess_kwargs, forward_kwargs, _ = pipeline._sanitize_parameters(
+        max_audio_length_ms=4000, temperature=1.0, topk=8, cfg_scale=cfg_scale,
+    )
+    inputs = pipeline.preprocess({"lyrics": LYRICS, "tags": "pop"}, **preprocess_kwargs)
+    with _seeded(42, torch.device("cpu")):
+        expected = reference_forward(pipeline, inputs, **forward_kwargs)["frames"]
+
+    audio = manager.generate_sync(
+        lyrics=LYRICS, tags="pop", max_audio_length_ms=4000, topk=8, cfg_scale=cfg_scale, seed=42,
+    )
+
+    np.testing.assert_array_equal(audio.samples, manager._decode(expected).samples)
+
+
+def test_streamed_chunks_add_up_to_the_saved_audio():
+    manager = fake_pipeline_manager(stream_chunk_frames=4)
+    sink = CollectingSink()
+
+    audio = manager.generate_sync(
+        lyrics=LYRICS, tags="pop", max_audio_length_ms=4000, topk=8, seed=3, audio_sink=sink,
+    )
+
+    assert len(sink.chunks) > 1
+    streamed = np.concatenate([chunk.samples for chunk in sink.chunks])
+    np.testing.assert_array_equal(streamed, audio.samples)
+
+
+async def _drain(hub: AudioStreamHub, job_id: str, stream) -> bytes:
+    return b"".join([chunk async for chunk in hub.listen(job_id, stream)])
+
+
+@pytest.mark.asyncio
+async def test_listener_after_generation_gets_the_buffered_audio():
+    hub = AudioStreamHub()
+    stream = hub.open("job")
+    stream.write(DecodedAudio(samples=np.zeros((480, 2), dtype=np.float32)))
+    await asyncio.sleep(0)
+    hub.close("job")  # Generation done; the job is still encoding and saving
+
+    late = hub.attach("job", create=False)
+    assert late is stream
+    body = await asyncio.wait_for(_drain(hub, "job", late), timeout=5)
+    assert len(body) == 44 + 480 * 2 * 2  # WAV header + 16-bit stereo PCM
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_have_no_stream_to_wait_on():
+    hub = AudioStreamHub()
+    hub.open("job")
+    hub.close("job")
+    hub.discard("job")
+
+    assert hub.attach("job", create=False) is None
+
+
+@pytest.mark.asyncio
+async def test_discard_ends_listeners_of_a_job_that_never_starts():
+    hub = AudioStreamHub()
+    stream = hub.attach("job")
+    listener = asyncio.create_task(_drain(hub, "job", stream))
+    await asyncio.sleep(0)
+
+    hub.discard("job")  # Cancelled while pending
+
+    assert await asyncio.wait_for(listener, timeout=5) == b""
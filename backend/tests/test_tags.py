@@ -0,0 +1,32 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+from app.models import Tag, job_tags
+from app.schemas import GenerationRequest, TrackUpdateRequest
+from app.services.job_queue import JobQueue
+
+
+@pytest.mark.parametrize("tags", ["lofi\x0c, chill", "a\x01b", "pop\x00", "rock\x7f"])
+def test_request_tags_with_control_characters_are_rejected(tags):
+    with pytest.raises(ValidationError):
+        GenerationRequest(lyrics="[Verse]\nhello", tags=tags)
+    with pytest.raises(ValidationError):
+        TrackUpdateRequest(tags=tags)
+
+
+def test_request_tags_may_contain_whitespace():
+    assert GenerationRequest(lyrics="[Verse]\nhello", tags="lofi,\tchill\r\n").tags == "lofi,\tchill\r\n"
+    assert TrackUpdateRequest(tags="lofi, chill").tags == "lofi, chill"
+
+
+@pytest.mark.asyncio
+async def test_jobs_with_control_characters_in_tags_still_enqueue(session_factory):
+    # Rows written other than through the API go through the same triggers
+    queue = JobQueue(session_factory)
+    job = await queue.enqueue({"lyrics": "[Verse]\nhello", "tags": "lofi\x0c, Chill\t", "max_length_ms": 30000})
+
+    async with session_factory() as db:
+        names = (await db.execute(
+            select(Tag.name).join(job_tags, job_tags.c.tag_id == Tag.id).where(job_tags.c.job_id == job.id)
+        )).scalars()
+        assert set(names) == {"lofi\x0c", "chill"}
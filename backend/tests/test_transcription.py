@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import struct
+from pathlib import Path
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.config import get_settings
+from app.routers import transcription
+from app.services.event_broadcaster import EventBroadcaster
+from app.services.storage_service import StorageService
+from app.services.transcription_queue import TranscriptionQueue
+
+AUDIO = b"ID3" + bytes(range(256)) * 16
+
+
+def _storage(tmp_path) -> StorageService:
+    return StorageService(get_settings().model_copy(update={
+        "output_dir": str(tmp_path / "outputs"), "upload_dir": str(tmp_path / "uploads"),
+    }))
+
+
+async def _enqueue(queue: TranscriptionQueue, count: int) -> list[str]:
+    return [(await queue.enqueue(f"/uploads/{i}.mp3", f"{i}.mp3")).id for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_claimed_oldest_first(session_factory):
+    queue = TranscriptionQueue(session_factory)
+    ids = await _enqueue(queue, 5)
+
+    first = await queue.dequeue_batch(3)
+    second = await queue.dequeue_batch(3)
+
+    assert [job.id for job in first] == ids[:3]
+    assert [job.id for job in second] == ids[3:]
+    assert all(job.status == "processing" and job.started_at for job in first + second)
+    assert await queue.dequeue_batch(3) == []
+    assert await queue.count_pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_an_upload_enqueued_before_the_worker_waits_still_wakes_it(session_factory):
+    queue = TranscriptionQueue(session_factory)
+    assert await queue.dequeue_batch(8) == []
+    await _enqueue(queue, 1)  # Lands between the empty dequeue and the wait
+
+    await asyncio.wait_for(queue.wait_for_job(), timeout=1)
+
+    assert len(await queue.dequeue_batch(8)) == 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_interrupted_mid_transcription_are_requeued(session_factory):
+    queue = TranscriptionQueue(session_factory)
+    ids = await _enqueue(queue, 3)
+    await queue.dequeue_batch(2)
+    await queue.mark_completed(ids[0], "done before the crash")
+
+    assert await TranscriptionQueue(session_factory).recover_stale_jobs() == 1
+
+    job = await queue.get_job(ids[1])
+    assert job.status == "pending" and job.started_at is None
+    assert (await queue.get_job(ids[0])).status == "completed"
+    assert [job.id for job in await queue.dequeue_batch(8)] == ids[1:]
+
+
+@pytest.fixture
+def client_for(tmp_path):
+    def make(queue: TranscriptionQueue) -> tuple[httpx.AsyncClient, StorageService, EventBroadcaster]:
+        app = FastAPI()
+        app.include_router(transcription.router)
+        app.state.storage = _storage(tmp_path)
+        app.state.broadcaster = EventBroadcaster()
+        app.state.transcription_queue = queue
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        return client, app.state.storage, app.state.broadcaster
+
+    return make
+
+
+async def _upload(client: httpx.AsyncClient, content: bytes = AUDIO, name: str = "song.mp3") -> httpx.Response:
+    return await client.post("/api/transcribe", files={"file": (name, content, "audio/mpeg")})
+
+
+@pytest.mark.asyncio
+async def test_a_full_queue_answers_429_without_keeping_the_upload(session_factory, client_for):
+    queue = TranscriptionQueue(session_factory, max_pending=2)
+    client, storage, _ = client_for(queue)
+    async with client:
+        assert (await _upload(client, b"one")).status_code == 200
+        assert (await _upload(client, b"two")).status_code == 200
+        response = await _upload(client, b"three")
+
+    assert response.status_code == 429
+    assert await queue.count_pending() == 2
+    assert len(list(storage.upload_dir.iterdir())) == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_uploads_reuse_the_queued_then_finished_job(session_factory, client_for):
+    queue = TranscriptionQueue(session_factory)
+    client, storage, broadcaster = client_for(queue)
+    subscriber = broadcaster.subscribe(types=["transcription:completed"])
+    async with client:
+        first = (await _upload(client)).json()
+        again = (await _upload(client, name="renamed.mp3")).json()
+        assert again["job_id"] == first["job_id"]
+        assert again["status"] == "pending" and again["queue_position"] == 0
+        assert len(list(storage.upload_dir.iterdir())) == 1  # Still needed by the queued job
+
+        job = (await queue.dequeue_batch(1))[0]
+        await queue.mark_completed(job.id, "la la la")
+        await storage.delete_file(Path(job.audio_path))  # As the worker does
+        done = (await _upload(client)).json()
+        other = (await _upload(client, b"different audio")).json()
+
+    assert done["job_id"] == first["job_id"] and done["status"] == "completed"
+    assert other["job_id"] != first["job_id"]
+    other_upload = f"{hashlib.sha256(b'different audio').hexdigest()}.mp3"
+    assert [path.name for path in storage.upload_dir.iterdir()] == [other_upload]
+    event = await subscriber.get(timeout=1)
+    assert b"la la la" in event and first["job_id"].encode() in event
+    assert await queue.count_pending() == 1
+
+
+@pytest.mark.asyncio
+async def test_get_transcription_reports_status_and_lyrics(session_factory, client_for):
+    queue = TranscriptionQueue(session_factory)
+    client, _, _ = client_for(queue)
+    async with client:
+        job_id = (await _upload(client)).json()["job_id"]
+        pending = await client.get(f"/api/transcriptions/{job_id}")
+        await queue.dequeue_batch(1)
+        await queue.mark_completed(job_id, "[Verse]\nheard you")
+        completed = await client.get(f"/api/transcriptions/{job_id}")
+        missing = await client.get("/api/transcriptions/no-such-job")
+
+    assert pending.status_code == 200
+    assert pending.json()["status"] == "pending" and pending.json()["filename"] == "song.mp3"
+    assert pending.json()["duration_ms"] is None  # Not audio ffprobe or the header parser can read
+    body = completed.json()
+    assert body["status"] == "completed" and body["lyrics"] == "[Verse]\nheard you"
+    assert body["started_at"] and body["completed_at"]
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_probed_for_their_duration(session_factory, client_for):
+    queue = TranscriptionQueue(session_factory)
+    client, _, _ = client_for(queue)
+    fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)  # Mono 16 kHz, 16-bit
+    pcm = b"\x00" * 32000 * 3
+    wav = b"RIFF" + struct.pack("<I", 36 + len(pcm)) + b"WAVEfmt " + struct.pack("<I", 16) + fmt
+    wav += b"data" + struct.pack("<I", len(pcm)) + pcm
+    async with client:
+        job_id = (await _upload(client, wav, "voice.wav")).json()["job_id"]
+        response = await client.get(f"/api/transcriptions/{job_id}")
+
+    assert response.json()["duration_ms"] == 3000
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import socket
+import threading
+import httpx
+import pytest
+import pytest_asyncio
+import uvicorn
+from fastapi import FastAPI, File, UploadFile
+from app.config import get_settings
+from app.main import app as main_app
+from app.services.storage_service import StorageService
+from app.utils.body_limit import BodySizeLimit, MULTIPART_OVERHEAD_BYTES
+
+BOUNDARY = "heartmula-test-boundary"
+CHUNK = b"\x5a" * (1024 * 1024)
+UPLOAD_MB = 200
+RSS_BOUND_MB = 50  # Reading the whole upload into memory would take 200+
+LIMIT_MB = 20
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class RssSampler:
+    """Peak resident set size above the baseline at start, in MB."""
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "RssSampler":
+        self.baseline = self.peak = _rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float:
+        return (self.peak - self.baseline) / (1024 * 1024)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.peak = max(self.peak, _rss())
+
+
+def _multipart(mb: int) -> tuple:
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.wav\"\r\n"
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    async def body():
+        yield head
+        for _ in range(mb):
+            yield CHUNK
+        yield tail
+
+    return body(), len(head) + mb * len(CHUNK) + len(tail)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _upload_app(storage: StorageService) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimit, max_bytes=LIMIT_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES, paths=("/limited",))
+
+    @app.post("/upload")
+    @app.post("/limited")
+    async def upload(file: UploadFile = File(...)):
+        saved = await storage.save_upload(file, hash_content=True)
+        await storage.delete_file(saved.path)
+        return {"size": saved.size_bytes}
+
+    return app
+
+
+@pytest_asyncio.fixture
+async def upload_server():
+    storage = StorageService(get_settings().model_copy(update={"max_upload_size_mb": UPLOAD_MB + 1}))
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(_upload_app(storage), host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    yield f"http://127.0.0.1:{port}", storage
+    server.should_exit = True
+    await server_task
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="samples RSS from /proc")
+async def test_large_upload_streams_to_disk_in_bounded_memory(upload_server):
+    url, storage = upload_server
+    body, length = _multipart(UPLOAD_MB)
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", "Content-Length": str(length)}
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        with RssSampler() as rss:
+            response = await client.post(f"{url}/upload", content=body, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["size"] == UPLOAD_MB * len(CHUNK)
+    assert rss.peak_mb < RSS_BOUND_MB
+
+
+@pytest.mark.asyncio
+async def test_oversized_chunked_upload_is_cut_off_with_413(upload_server):
+    url, storage = upload_server
+    body, _ = _multipart(LIMIT_MB * 5)
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}  # No length: chunked
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        response = await client.post(f"{url}/limited", content=body, headers=headers)
+
+    assert response.status_code == 413
+    assert list(storage.upload_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_413_for_a_declared_length_carries_cors_headers():
+    body, _ = _multipart(1)
+    oversized = (get_settings().max_upload_size_mb + 1) * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+        "Content-Length": str(oversized),
+        "Origin": "http://localhost:3000",
+    }
+
+    # The limit answers before routing, so the app's lifespan isn't needed
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main_app), base_url="http://test") as client:
+        response = await client.post("/api/transcribe", content=body, headers=headers)
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
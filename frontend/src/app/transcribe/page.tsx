@@ -4,6 +4,7 @@ import { Header } from "@/components/layout/Header";
 import { UploadZone } from "@/components/transcription/UploadZone";
 import { TranscriptView } from "@/components/transcription/TranscriptView";
 import { sseManager } from "@/lib/sse";
+import { api } from "@/lib/api";
 
 export default function TranscribePage() {
   const [lyrics, setLyrics] = useState<string | null>(null);
@@ -20,10 +21,17 @@ export default function TranscribePage() {
     return unsub;
   }, [jobId]);
 
-  const handleJobCreated = (id: string) => {
+  const handleJobCreated = (id: string, status: string) => {
     setJobId(id);
     setLyrics(null);
     setIsProcessing(true);
+    // A repeated upload can be answered by an earlier, finished transcription
+    if (status === "completed") {
+      api.getTranscription(id).then((job) => {
+        setLyrics(job.lyrics);
+        setIsProcessing(false);
+      });
+    }
   };
 
   return (
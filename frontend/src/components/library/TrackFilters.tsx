@@ -4,6 +4,15 @@ import { Input } from "@/components/ui/input";
 import { Button } from "@/components/ui/button";
 import { cn } from "@/lib/utils";
 
+const SORTS = ["created_at", "title", "duration_ms"] as const;
+const SEARCH_SORTS = ["relevance", ...SORTS] as const;
+const SORT_LABELS: Record<(typeof SEARCH_SORTS)[number], string> = {
+  relevance: "Relevance",
+  created_at: "Date",
+  title: "Title",
+  duration_ms: "Duration",
+};
+
 export function TrackFilters() {
   const { search, setSearch, sortBy, setSortBy, showFavoritesOnly, setShowFavoritesOnly, total } = useLibraryStore();
 
@@ -25,7 +34,7 @@ export function TrackFilters() {
       </Button>
       <div className="flex items-center gap-1 text-xs text-muted-foreground">
         Sort:
-        {(["created_at", "title", "duration_ms"] as const).map((s) => (
+        {(search ? SEARCH_SORTS : SORTS).map((s) => (
           <Button
             key={s}
             variant="ghost"
@@ -33,7 +42,7 @@ export function TrackFilters() {
             className={cn("h-6 text-xs px-2", sortBy === s && "text-foreground bg-accent")}
             onClick={() => setSortBy(s)}
           >
-            {s === "created_at" ? "Date" : s === "title" ? "Title" : "Duration"}
+            {SORT_LABELS[s]}
           </Button>
         ))}
       </div>
@@ -4,7 +4,7 @@ import { usePlayerStore } from "@/stores/usePlayerStore";
 import { TrackCard } from "./TrackCard";
 
 export function TrackGrid() {
-  const { tracks, isLoading, toggleFavorite, deleteTrack, total, loadMore } = useLibraryStore();
+  const { tracks, isLoading, toggleFavorite, deleteTrack, cursor, loadMore } = useLibraryStore();
   const play = usePlayerStore((s) => s.play);
 
   if (isLoading && tracks.length === 0) {
@@ -37,7 +37,7 @@ export function TrackGrid() {
           />
         ))}
       </div>
-      {tracks.length < total && (
+      {cursor && (
         <div className="flex justify-center mt-4">
           <button
             className="text-sm text-muted-foreground hover:text-foreground"
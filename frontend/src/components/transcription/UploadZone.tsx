@@ -4,7 +4,7 @@ import { cn } from "@/lib/utils";
 import { api } from "@/lib/api";
 
 interface UploadZoneProps {
-  onJobCreated: (jobId: string) => void;
+  onJobCreated: (jobId: string, status: string) => void;
 }
 
 export function UploadZone({ onJobCreated }: UploadZoneProps) {
@@ -18,7 +18,7 @@ export function UploadZone({ onJobCreated }: UploadZoneProps) {
     setIsUploading(true);
     try {
       const result = await api.transcribe(file);
-      onJobCreated(result.job_id);
+      onJobCreated(result.job_id, result.status);
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Upload failed");
     } finally {
@@ -1,6 +1,7 @@
 "use client";
 import { useEffect, useRef, useCallback } from "react";
 import { usePlayerStore } from "@/stores/usePlayerStore";
+import { api } from "@/lib/api";
 import type WaveSurfer from "wavesurfer.js";
 
 export function useAudioPlayer(containerRef: React.RefObject<HTMLDivElement | null>) {
@@ -42,11 +43,22 @@ export function useAudioPlayer(containerRef: React.RefObject<HTMLDivElement | nu
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [containerRef]);
 
-  // Load track
+  // Load track: precomputed peaks let the audio stream instead of being
+  // downloaded and decoded up front just to draw the waveform
   useEffect(() => {
-    if (currentTrack && wavesurfer.current) {
-      wavesurfer.current.load(currentTrack.output_url);
-    }
+    const ws = wavesurfer.current;
+    if (!currentTrack || !ws) return;
+    let cancelled = false;
+    api.getTrackPeaks(currentTrack.id)
+      .then((peaks) => {
+        if (!cancelled) ws.load(currentTrack.output_url, [peaks], currentTrack.duration_ms / 1000);
+      })
+      .catch(() => {
+        if (!cancelled) ws.load(currentTrack.output_url);
+      });
+    return () => {
+      cancelled = true;
+    };
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [currentTrack?.id]);
 
@@ -31,6 +31,10 @@ export function useSSE() {
       sseManager.on("job:queued", (data) => {
         useQueueStore.getState().addJob(data as unknown as Job);
       }),
+      sseManager.on("jobs:queued", (data) => {
+        const { addJob } = useQueueStore.getState();
+        (data.jobs as unknown as Job[]).forEach((job) => addJob(job));
+      }),
       sseManager.on("job:started", (data) => {
         useQueueStore.getState().updateJobStatus(data.job_id as string, {
           status: "processing",
@@ -1,9 +1,13 @@
 import type {
   GenerationRequest,
   GenerationResponse,
+  BatchGenerationResponse,
   JobListResponse,
   TrackListResponse,
   TrackUpdateRequest,
+  TagListResponse,
+  TranscriptionResponse,
+  TranscriptionJob,
   SettingsUpdateRequest,
 } from "@/types/api";
 import type { Job, Track, UserSettings, HealthStatus, GpuStatus } from "@/types/models";
@@ -43,11 +47,24 @@ class ApiClient {
     });
   }
 
-  async getJobs(params?: { status?: string; limit?: number; offset?: number }): Promise<JobListResponse> {
+  async submitGenerationBatch(jobs: GenerationRequest[]): Promise<BatchGenerationResponse> {
+    return this.request("/api/generate/batch", {
+      method: "POST",
+      body: JSON.stringify({ jobs }),
+    });
+  }
+
+  async getJobs(params?: {
+    status?: string;
+    limit?: number;
+    cursor?: string;
+    withTotal?: boolean;
+  }): Promise<JobListResponse> {
     const query = new URLSearchParams();
     if (params?.status) query.set("status", params.status);
     if (params?.limit) query.set("limit", String(params.limit));
-    if (params?.offset) query.set("offset", String(params.offset));
+    if (params?.cursor) query.set("cursor", params.cursor);
+    if (params?.withTotal === false) query.set("with_total", "false");
     const qs = query.toString();
     return this.request(`/api/jobs${qs ? `?${qs}` : ""}`);
   }
@@ -67,7 +84,8 @@ class ApiClient {
     favorite?: boolean;
     sort?: string;
     limit?: number;
-    offset?: number;
+    cursor?: string;
+    withTotal?: boolean;
   }): Promise<TrackListResponse> {
     const query = new URLSearchParams();
     if (params?.search) query.set("search", params.search);
@@ -75,7 +93,8 @@ class ApiClient {
     if (params?.favorite !== undefined) query.set("favorite", String(params.favorite));
     if (params?.sort) query.set("sort", params.sort);
     if (params?.limit) query.set("limit", String(params.limit));
-    if (params?.offset) query.set("offset", String(params.offset));
+    if (params?.cursor) query.set("cursor", params.cursor);
+    if (params?.withTotal === false) query.set("with_total", "false");
     const qs = query.toString();
     return this.request(`/api/tracks${qs ? `?${qs}` : ""}`);
   }
@@ -95,8 +114,40 @@ class ApiClient {
     return `${this.base}${outputUrl}`;
   }
 
+  // Waveform peaks: interleaved (min, max) pairs scaled to -1..1
+  getTrackRenditionUrl(id: string, format?: "mp3" | "opus" | "aac", bitrate?: string): string {
+    const params = new URLSearchParams();
+    if (format) params.set("format", format);
+    if (bitrate) params.set("bitrate", bitrate);
+    const query = params.toString();
+    return `${this.base}/api/tracks/${id}/audio${query ? `?${query}` : ""}`;
+  }
+
+  async getTrackPeaks(id: string, resolution = 1000): Promise<Float32Array> {
+    const res = await fetch(`${this.base}/api/tracks/${id}/peaks?resolution=${resolution}`);
+    if (!res.ok) {
+      throw new ApiError(res.status, "Peaks not available");
+    }
+    const raw = new Int8Array(await res.arrayBuffer());
+    return Float32Array.from(raw, (v) => v / 127);
+  }
+
+  // Tags
+  async getTags(params?: {
+    scope?: "tracks" | "jobs";
+    prefix?: string;
+    limit?: number;
+  }): Promise<TagListResponse> {
+    const query = new URLSearchParams();
+    if (params?.scope) query.set("scope", params.scope);
+    if (params?.prefix) query.set("prefix", params.prefix);
+    if (params?.limit) query.set("limit", String(params.limit));
+    const qs = query.toString();
+    return this.request(`/api/tags${qs ? `?${qs}` : ""}`);
+  }
+
   // Transcription
-  async transcribe(file: File): Promise<{ job_id: string }> {
+  async transcribe(file: File): Promise<TranscriptionResponse> {
     const formData = new FormData();
     formData.append("file", file);
     const res = await fetch(`${this.base}/api/transcribe`, {
@@ -110,6 +161,10 @@ class ApiClient {
     return res.json();
   }
 
+  async getTranscription(id: string): Promise<TranscriptionJob> {
+    return this.request(`/api/transcriptions/${id}`);
+  }
+
   // System
   async getHealth(): Promise<HealthStatus> {
     return this.request("/api/health");
@@ -119,6 +174,10 @@ class ApiClient {
     return this.request("/api/gpu");
   }
 
+  async getGpus(): Promise<GpuStatus[]> {
+    return this.request("/api/gpus");
+  }
+
   // Settings
   async getSettings(): Promise<UserSettings> {
     return this.request("/api/settings");
@@ -8,6 +8,7 @@ class SSEManager {
   private maxReconnectDelay = 30000;
   private handlers = new Map<string, Set<SSEHandler>>();
   private url: string;
+  private lastEventId: string | null = null;
 
   constructor(url: string = "/api/events") {
     this.url = url;
@@ -16,7 +17,12 @@ class SSEManager {
   connect(): void {
     if (this.eventSource?.readyState === EventSource.OPEN) return;
 
-    this.eventSource = new EventSource(this.url);
+    // Resume where we left off; the server replays anything we missed
+    const sep = this.url.includes("?") ? "&" : "?";
+    const url = this.lastEventId
+      ? `${this.url}${sep}last_event_id=${encodeURIComponent(this.lastEventId)}`
+      : this.url;
+    this.eventSource = new EventSource(url);
 
     this.eventSource.onopen = () => {
       this.reconnectDelay = 1000;
@@ -30,6 +36,7 @@ class SSEManager {
     };
 
     this.eventSource.onmessage = (e) => {
+      if (e.lastEventId) this.lastEventId = e.lastEventId;
       try {
         const message = JSON.parse(e.data);
         this.dispatch(message.event, message.data);
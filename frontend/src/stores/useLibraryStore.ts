@@ -9,7 +9,7 @@ interface LibraryState {
   sortBy: string;
   showFavoritesOnly: boolean;
   isLoading: boolean;
-  offset: number;
+  cursor: string | null; // next page; null once everything is loaded
   limit: number;
 
   setSearch: (search: string) => void;
@@ -28,19 +28,19 @@ export const useLibraryStore = create<LibraryState>((set, get) => ({
   sortBy: "created_at",
   showFavoritesOnly: false,
   isLoading: false,
-  offset: 0,
+  cursor: null,
   limit: 20,
 
   setSearch: (search) => {
-    set({ search, offset: 0, tracks: [] });
+    set({ search, cursor: null, tracks: [] });
     get().fetchTracks();
   },
   setSortBy: (sortBy) => {
-    set({ sortBy, offset: 0, tracks: [] });
+    set({ sortBy, cursor: null, tracks: [] });
     get().fetchTracks();
   },
   setShowFavoritesOnly: (showFavoritesOnly) => {
-    set({ showFavoritesOnly, offset: 0, tracks: [] });
+    set({ showFavoritesOnly, cursor: null, tracks: [] });
     get().fetchTracks();
   },
 
@@ -53,16 +53,16 @@ export const useLibraryStore = create<LibraryState>((set, get) => ({
         sort: sortBy,
         favorite: showFavoritesOnly || undefined,
         limit,
-        offset: 0,
       });
-      set({ tracks: res.tracks, total: res.total, offset: limit });
+      set({ tracks: res.tracks, total: res.total ?? res.tracks.length, cursor: res.next_cursor });
     } finally {
       set({ isLoading: false });
     }
   },
 
   loadMore: async () => {
-    const { search, sortBy, showFavoritesOnly, limit, offset, tracks } = get();
+    const { search, sortBy, showFavoritesOnly, limit, cursor, tracks } = get();
+    if (!cursor) return;
     set({ isLoading: true });
     try {
       const res = await api.getTracks({
@@ -70,9 +70,10 @@ export const useLibraryStore = create<LibraryState>((set, get) => ({
         sort: sortBy,
         favorite: showFavoritesOnly || undefined,
         limit,
-        offset,
+        cursor,
+        withTotal: false,
       });
-      set({ tracks: [...tracks, ...res.tracks], total: res.total, offset: offset + limit });
+      set({ tracks: [...tracks, ...res.tracks], cursor: res.next_cursor });
     } finally {
       set({ isLoading: false });
     }
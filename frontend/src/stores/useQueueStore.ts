@@ -56,7 +56,7 @@ export const useQueueStore = create<QueueState>((set, get) => ({
   },
 
   fetchJobs: async () => {
-    const res = await api.getJobs({ limit: 50 });
+    const res = await api.getJobs({ limit: 50, withTotal: false });
     set({ jobs: res.jobs });
     const processing = res.jobs.find((j) => j.status === "processing");
     if (processing) {
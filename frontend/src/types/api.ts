@@ -7,6 +7,7 @@ export interface GenerationRequest {
   temperature?: number;
   topk?: number;
   cfg_scale?: number;
+  seed?: number;
 }
 
 export interface GenerationResponse {
@@ -16,14 +17,47 @@ export interface GenerationResponse {
   created_at: string;
 }
 
+export interface BatchGenerationResponse {
+  jobs: GenerationResponse[];
+}
+
 export interface JobListResponse {
   jobs: Job[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
 }
 
 export interface TrackListResponse {
   tracks: Track[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
+}
+
+export interface TagCount {
+  name: string;
+  count: number;
+}
+
+export interface TagListResponse {
+  tags: TagCount[];
+}
+
+export interface TranscriptionResponse {
+  job_id: string;
+  status: string;
+  queue_position: number;
+  created_at: string;
+}
+
+export interface TranscriptionJob {
+  id: string;
+  status: "pending" | "processing" | "completed" | "failed";
+  filename: string | null;
+  lyrics: string | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  completed_at: string | null;
 }
 
 export interface TrackUpdateRequest {
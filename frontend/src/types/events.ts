@@ -3,13 +3,17 @@ export type SSEEventType =
   | "model:loading_progress"
   | "model:ready"
   | "job:queued"
+  | "jobs:queued"
   | "job:started"
   | "job:progress"
   | "job:completed"
   | "job:failed"
   | "job:cancelled"
   | "gpu:status"
+  | "transcription:queued"
+  | "transcription:started"
   | "transcription:completed"
+  | "transcription:failed"
   | "heartbeat";
 
 export interface SSEMessage {
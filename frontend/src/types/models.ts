@@ -7,10 +7,13 @@ export interface Job {
   temperature: number;
   topk: number;
   cfg_scale: number;
+  seed: number | null;
+  seed_source?: "user" | "server" | null;
   output_path: string | null;
   output_url: string | null;
   duration_ms: number | null;
   error: string | null;
+  device?: string | null;
   progress: number | null;
   created_at: string;
   started_at: string | null;
@@ -40,18 +43,43 @@ export interface UserSettings {
   auto_save_tracks: boolean;
 }
 
+export interface GpuSchedule {
+  budget_gb: number | null;
+  reserved_gb: number;
+  running: string[];
+  queued: number;
+  evictions: number;
+  models: Record<string, { size_gb: number; resident: boolean; in_use: boolean }>;
+}
+
 export interface GpuStatus {
+  device: string;
   name: string;
   vram_total_gb: number;
   vram_used_gb: number;
   vram_free_gb: number;
   use_mmgp: boolean;
+  scheduler?: GpuSchedule | null;
 }
 
 export type ModelState = "unloaded" | "downloading" | "loading" | "ready" | "generating" | "error";
 
+export interface ResidencyStatus {
+  state: "device" | "host" | "disk" | "mixed";
+  modules: Record<string, string>;
+  in_use: boolean;
+  idle_for_s: number | null;
+  idle_unload_s: number | null;
+  last_reload_ms: number | null;
+  last_reload_source: "host" | "disk" | null;
+  reloads_from_disk: number;
+  reloads_from_host: number;
+  offloads: number;
+}
+
 export interface HealthStatus {
   status: string;
   model_state: ModelState;
   gpu_available: boolean;
+  residency: ResidencyStatus | null;
 }